@@ -287,7 +287,7 @@ class Routine:
         for r in self.rules:
             if isinstance(r, Substitution):
                 return "sub"
-            if isinstance(r, Positioning):
+            if isinstance(r, (Positioning, PairKerning)):
                 return "pos"
             if isinstance(r, Attachment):
                 return "pos"
@@ -295,7 +295,7 @@ class Routine:
                 return r.stage
 
     from .feaLib.Routine import asFea, asFeaAST, feaPreamble
-    from .shaperLib.Routine import apply_to_buffer
+    from .shaperLib.Routine import apply_to_buffer, could_apply
     from .xmlLib.Routine import toXML, fromXML
 
 
@@ -369,7 +369,7 @@ class Rule:
         """Computes any text that needs to go in the feature file header."""
         return []
 
-    from .shaperLib.Rule import would_apply_at_position, pre_post_context_matches
+    from .shaperLib.Rule import would_apply_at_position, would_apply_at_unmasked, pre_post_context_matches, compiled_slots, mark_unsafe_to_break
     from .xmlLib.Rule import fromXML, toXML, _makeglyphslots, _slotArray
 
 
@@ -600,6 +600,104 @@ class Positioning(Rule):
     from .xmlLib.Positioning import _toXML, fromXML
 
 
+class PairKerning(Rule):
+    """Represents pair positioning by glyph class, as a kerning matrix.
+
+    This is equivalent to one two-glyph ``Positioning`` rule for each
+    non-empty cell of the matrix, but is much more compact for large
+    class kerning tables.
+
+    Args:
+        first_classes: Dictionary mapping each glyph which can start a pair
+            to the number of its class (a row of the matrix).
+        second_classes: Dictionary mapping each glyph which can end a pair
+            to the number of its class (a column of the matrix).
+        matrix: A list of rows, one per first class; each row is a list
+            with one entry per second class, either ``None`` if there is no
+            kerning between the classes or a tuple of two ``ValueRecord``
+            objects for the first and second glyphs.
+    """
+
+    def __init__(
+        self,
+        first_classes=None,
+        second_classes=None,
+        matrix=None,
+        address=None,
+        languages=None,
+        flags=0,
+    ):
+        self.first_classes = first_classes or {}
+        self.second_classes = second_classes or {}
+        self.matrix = matrix or []
+        self.address = address
+        self.languages = languages
+        self.flags = flags
+        self.stage = "pos"
+
+    @property
+    def involved_glyphs(self):
+        return set(self.first_classes) | set(self.second_classes)
+
+    @property
+    def columns(self):
+        """The number of second classes."""
+        return max(
+            [len(row) for row in self.matrix]
+            + [max(self.second_classes.values(), default=-1) + 1]
+        )
+
+    def classGlyphs(self, classes, count=0):
+        """Turns ``first_classes`` or ``second_classes`` into a list of the
+        glyphs in each class, with at least ``count`` classes."""
+        count = max(count, max(classes.values(), default=-1) + 1)
+        glyphs = [[] for _ in range(count)]
+        for g, c in classes.items():
+            glyphs[c].append(g)
+        return glyphs
+
+    def addClassPair(self, first, second, vr1, vr2):
+        """Adds kerning between two lists of glyphs, making them classes
+        of the matrix if they are not already.
+
+        Kerning already present for a pair is kept, as the first of two
+        overlapping ``Positioning`` rules would win. If either list partly
+        overlaps an existing class, nothing is added and False is returned;
+        otherwise returns True."""
+        c1 = self._classFor(self.first_classes, first, len(self.matrix))
+        c2 = self._classFor(self.second_classes, second, self.columns)
+        if c1 is None or c2 is None:
+            return False
+        if c1 == len(self.matrix):
+            for g in first:
+                self.first_classes[g] = c1
+            self.matrix.append([None] * self.columns)
+        if c2 == self.columns:
+            for g in second:
+                self.second_classes[g] = c2
+            for row in self.matrix:
+                row.append(None)
+        if self.matrix[c1][c2] is None:
+            self.matrix[c1][c2] = (vr1, vr2)
+        return True
+
+    @staticmethod
+    def _classFor(classes, glyphs, count):
+        # The existing class holding exactly these glyphs, or a new one
+        existing = set(classes.get(g) for g in glyphs)
+        if existing == {None}:
+            return count
+        if len(existing) == 1:
+            c = existing.pop()
+            if sum(1 for x in classes.values() if x == c) == len(set(glyphs)):
+                return c
+        return None
+
+    from .feaLib.PairKerning import asFeaAST
+    from .shaperLib.PairKerning import shaper_inputs, _do_apply, would_apply_at_position
+    from .xmlLib.PairKerning import _toXML, fromXML
+
+
 class Attachment(Rule):
     """Represents an Attachment rule.
 
@@ -0,0 +1,27 @@
+# Code for converting a PairKerning object into feaLib statements
+import fontTools.feaLib.ast as feaast
+from fontFeatures.feaLib.Positioning import glyphref
+
+
+def classref(g):
+    return feaast.GlyphClass([feaast.GlyphName(x) for x in sorted(g)])
+
+
+def asFeaAST(self):
+    f = feaast.Block()
+    first = self.classGlyphs(self.first_classes, len(self.matrix))
+    second = self.classGlyphs(self.second_classes, self.columns)
+    for c1, row in enumerate(self.matrix):
+        for c2, values in enumerate(row):
+            if values is None or not first[c1] or not second[c2]:
+                continue
+            if len(first[c1]) == 1 and len(second[c2]) == 1:
+                # Bracket them, or it would be a specific pair rather than
+                # class kerning
+                glyphs1, glyphs2 = classref(first[c1]), classref(second[c2])
+            else:
+                glyphs1, glyphs2 = glyphref(first[c1]), glyphref(second[c2])
+            f.statements.append(
+                feaast.PairPosStatement(glyphs1, values[0], glyphs2, values[1])
+            )
+    return f
@@ -5,12 +5,14 @@ from fontFeatures.ttLib.Positioning import lookup_type as pos_lookup_type
 
 
 def lookup_type(rule):
-    from fontFeatures import Substitution, Positioning, Attachment, Chaining
+    from fontFeatures import Substitution, Positioning, PairKerning, Attachment, Chaining
 
     if isinstance(rule, Substitution):
         return sub_lookup_type(rule)
     if isinstance(rule, Positioning):
         return pos_lookup_type(rule)
+    if isinstance(rule, PairKerning):
+        return 2
     if isinstance(rule, Attachment):
         return rule.is_cursive
     if isinstance(rule, Chaining):
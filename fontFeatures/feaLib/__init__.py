@@ -158,11 +158,13 @@ class FeaUnparser:
 
     def add_class_pair_pos(self, location, glyphclass1, value1, glyphclass2, value2):
         location = "%s:%i:%i" % (location)
-        s = fontFeatures.Positioning(
-            glyphs=[glyphclass1, glyphclass2],
-            valuerecords=[value1, value2],
-            address=location,
-        )
+        # Consecutive class pairs share a kerning matrix where they can
+        rules = self.currentRoutine.rules
+        if rules and isinstance(rules[-1], fontFeatures.PairKerning):
+            if rules[-1].addClassPair(list(glyphclass1), list(glyphclass2), value1, value2):
+                return
+        s = fontFeatures.PairKerning(address=location)
+        s.addClassPair(list(glyphclass1), list(glyphclass2), value1, value2)
         self.currentRoutine.addRule(s)
 
     def add_cursive_pos(self, location, glyphclass, entryAnchor, exitAnchor):
@@ -50,6 +50,7 @@ anchors, and using an ``Attach`` statement like the following::
 """
 
 import fontFeatures
+from fontFeatures.glyphInfoCache import GlyphInfoCache
 
 GRAMMAR = """
 
@@ -90,8 +91,12 @@ class Attach:
     def action(self, parser, aFrom, aTo, attachtype):
         bases = {}
         marks = {}
+        info = GlyphInfoCache.for_font(parser.font)
+
         def _category(k):
-            return parser.fontfeatures.glyphclasses.get(k, parser.font[k].category)
+            if k in parser.fontfeatures.glyphclasses:
+                return parser.fontfeatures.glyphclasses[k]
+            return info.category(k)
 
         for k, v in parser.fontfeatures.anchors.items():
             if aFrom in v:
@@ -111,6 +111,7 @@ will take any glyph selector and display its contents on standard error.
 import re
 from glyphtools import get_glyph_metrics, bin_glyphs_by_metric
 from bidict import ValueDuplicationError
+from fontFeatures.glyphInfoCache import GlyphInfoCache
 
 import warnings
 
@@ -176,7 +177,7 @@ class DefineClass:
             truth = glyphname in parser.fontfeatures.anchors and anchor in parser.fontfeatures.anchors[glyphname]
         elif metric == "category":
             cat = predicate["value"]
-            truth = parser.font[glyphname].category == cat
+            truth = GlyphInfoCache.for_font(parser.font).category(glyphname) == cat
         elif metric == "hasglyph":
             truth = re.sub(predicate["value"]["replace"], predicate["value"]["with"], glyphname) in parser.font
         else:
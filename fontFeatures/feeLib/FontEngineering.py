@@ -42,6 +42,7 @@ The `SetCategory` verb sets a glyph's OpenType category::
 """
 
 import warnings
+from fontFeatures.glyphInfoCache import GlyphInfoCache
 
 
 GRAMMAR = """
@@ -62,6 +63,7 @@ class SetWidth:
                 glyph.width = glyph.width * width / 100
             else:
                 glyph.width = width
+        GlyphInfoCache.invalidate(parser.font)
         parser.font_modified = True
         return []
 
@@ -84,6 +86,7 @@ class DuplicateGlyphs:
             newglyph.category = oldglyph.category
             # XXX mark attachment class
             parser.font_modified = True
+        GlyphInfoCache.invalidate(parser.font)
         parser.glyphs = list(parser.font.keys())
         return []
 
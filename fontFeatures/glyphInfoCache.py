@@ -0,0 +1,99 @@
+"""
+glyphInfoCache
+==============
+
+Looking up a glyph's ID, advance width or category through a Babelfont
+font object is comparatively slow: the glyph order is rebuilt and searched
+linearly, and each glyph access constructs a glyph object. The shaper and
+several FEE verbs need this information over and over, so this module
+keeps it, per font, in compact arrays keyed by glyph name.
+"""
+from array import array
+import threading
+
+# Guards giving out category codes, so that threads meeting new
+# categories at once do not share a code. (A module-level lock, so that
+# fonts carrying a cache can still be pickled.)
+_category_lock = threading.Lock()
+
+
+class GlyphInfoCache:
+    """Glyph IDs, advance widths and categories of a font's glyphs.
+
+    Use :py:meth:`for_font` to get the cache shared by everyone working on
+    a font. Widths and categories are read from the font the first time a
+    glyph is asked about. If the font's glyphs are changed, call
+    :py:meth:`invalidate`.
+
+    Args:
+        font: A Babelfont ``Font`` object.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self.glyph_names = list(font.glyphOrder)
+        self.glyph_ids = {g: ix for ix, g in enumerate(self.glyph_names)}
+        self.widths = array("d", bytes(8 * len(self.glyph_ids)))
+        self.categories = array("B", bytes(len(self.glyph_ids)))
+        self._category_names = [None, None]  # 0 means not looked up yet
+        self._category_codes = {None: 1}
+
+    @classmethod
+    def for_font(klass, font):
+        """Returns the cache for the given font, creating it if necessary."""
+        cache = getattr(font, "_glyph_info_cache", None)
+        if cache is None:
+            cache = klass(font)
+            try:
+                font._glyph_info_cache = cache
+            except AttributeError:
+                pass  # Can't share it; fine.
+        return cache
+
+    @classmethod
+    def invalidate(klass, font):
+        """Forget what is known about the given font's glyphs."""
+        if getattr(font, "_glyph_info_cache", None) is not None:
+            font._glyph_info_cache = None
+
+    def gid(self, glyphname):
+        """Returns the glyph ID of the named glyph, or -1 if it is not in
+        the font."""
+        return self.glyph_ids.get(glyphname, -1)
+
+    def _load(self, ix, glyphname):
+        glyph = self.font[glyphname]
+        category = glyph.category
+        code = self._category_codes.get(category)
+        if code is None:
+            with _category_lock:
+                code = self._category_codes.get(category)
+                if code is None:
+                    code = len(self._category_names)
+                    self._category_names.append(category)
+                    self._category_codes[category] = code
+        self.widths[ix] = glyph.width
+        self.categories[ix] = code
+
+    def width(self, glyphname):
+        """Returns the advance width of the named glyph.
+
+        Raises ``KeyError`` if the glyph is not in the font."""
+        ix = self.glyph_ids.get(glyphname)
+        if ix is None:
+            return self.font[glyphname].width
+        if not self.categories[ix]:
+            self._load(ix, glyphname)
+        width = self.widths[ix]
+        return int(width) if width.is_integer() else width
+
+    def category(self, glyphname):
+        """Returns the category of the named glyph, as stored in the font.
+
+        Raises ``KeyError`` if the glyph is not in the font."""
+        ix = self.glyph_ids.get(glyphname)
+        if ix is None:
+            return self.font[glyphname].category
+        if not self.categories[ix]:
+            self._load(ix, glyphname)
+        return self._category_names[self.categories[ix]]
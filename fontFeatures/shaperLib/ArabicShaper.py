@@ -1,5 +1,5 @@
 from .BaseShaper import BaseShaper
-from youseedee import ucd_data
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, GENERAL_CATEGORY, JOINING_TYPE, JOINING_GROUP
 
 
 jts = {
@@ -33,6 +33,8 @@ state_table = [
 arabic_features = ['isol', 'fina', 'fin2', 'fin3', 'medi', 'med2', 'init']
 
 class ArabicShaper(BaseShaper):
+    masked_features = arabic_features
+
     def collect_features(self, shaper):
         # shaper.add_features("stch")
         shaper.add_features("ccmp", "locl")
@@ -46,25 +48,30 @@ class ArabicShaper(BaseShaper):
     def substitute_default(self):
         super().substitute_default()
         state = 0
-        prev_item = None
-        for item in self.buffer.items:
+        prev_ix = None
+        items = self.buffer.items
+        for ix, item in enumerate(items):
             item.arabic_joining = "NONE"
-            ucd = ucd_data(item.codepoint)
-            joining = ucd.get("Joining_Type")
+            props = unicode_properties(item.codepoint)
+            joining = props[JOINING_TYPE]
             if not joining:
-                if ucd.get("General_Category") in ["Mn", "Cf", "Em"]:
+                if props[GENERAL_CATEGORY] in ["Mn", "Cf", "Em"]:
                     joining = "T"
                 else:
                     joining = "U"
             if joining == "T": continue
             if joining == "C": joining = "D"  # Mongolian
-            if ucd.get("Joining_Group") == "ALAPH": joining = "ALAPH"
-            if ucd.get("Joining_Group") == "DALATH RISH": joining = "DALATH_RISH"
+            if props[JOINING_GROUP] == "ALAPH": joining = "ALAPH"
+            if props[JOINING_GROUP] == "DALATH RISH": joining = "DALATH_RISH"
             prev, this, state = state_table[state][jts[joining]]
-            if prev_item:
-              prev_item.arabic_joining = prev
+            if prev_ix is not None:
+              items[prev_ix].arabic_joining = prev
+              if prev != "none":
+                # The previous letter's form depends on this one
+                for j in range(prev_ix + 1, ix + 1):
+                  items[j].unsafe_to_break = True
             item.arabic_joining = this
-            prev_item = item
+            prev_ix = ix
         if self.buffer.script == "Mongolian":
             self.mongolian_variation_selectors()
         self.plan.msg("Assigned Arabic joining", self.buffer, serialize_options=["arabic_joining"])
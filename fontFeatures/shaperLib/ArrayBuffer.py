@@ -0,0 +1,513 @@
+"""A compact, array-backed alternative to :py:class:`Buffer`.
+
+An ``ArrayBuffer`` stores glyph IDs, codepoints, clusters, categories,
+feature mask bits and positions in parallel ``array`` columns instead of
+holding one ``BufferItem`` object per glyph. Items are handed out as
+lightweight ``ArrayBufferItem`` views onto a row of those columns, so the
+complex shapers - which expect ``BufferItem`` objects - work unchanged.
+
+Rows are never moved: the buffer keeps an array of row numbers giving the
+order of the glyph stream, so reordering, inserting and deleting items
+only touches that array. Copying an item (as multiple and ligature
+substitutions do) allocates a new row; call ``compact()`` to drop rows
+which are no longer part of the buffer.
+
+Position columns hold integers. Other values (the fractional values of
+an interpolated variable value record, say) are kept as they are in a
+per-row dictionary instead, as a ``Buffer`` would keep them.
+"""
+
+from array import array
+from collections.abc import MutableMapping, MutableSequence
+from fontFeatures.glyphInfoCache import GlyphInfoCache
+from fontFeatures.shaperLib.Buffer import Buffer, BufferItem
+
+NOT_IN_FONT = -1
+
+_SUBSTITUTED = 1
+_LIGATED = 2
+_MULTIPLIED = 4
+_PREPARED = 8  # Has a position, and substituted/ligated/multiplied flags
+_UNSAFE_TO_BREAK = 16
+
+_categories = [None, "base", "mark", "ligature", "component", "unknown"]
+_category_codes = {c: ix for ix, c in enumerate(_categories)}
+
+class _FeatureMasks(MutableMapping):
+    # Stands in for the ``feature_masks`` dictionary of a BufferItem. Each
+    # feature gets a bit; one column says whether the feature has a mask
+    # value for this item, the other holds the value.
+    __slots__ = ("_buffer", "_row")
+
+    def __init__(self, buf, row):
+        self._buffer = buf
+        self._row = row
+
+    def __getitem__(self, feature):
+        bit = self._buffer._feature_bits.get(feature)
+        if bit is None or not self._buffer._mask_set[self._row] & bit:
+            raise KeyError(feature)
+        return bool(self._buffer._mask_value[self._row] & bit)
+
+    def __setitem__(self, feature, value):
+        bit = self._buffer._feature_bit(feature)
+        self._buffer._mask_set[self._row] |= bit
+        if value:
+            self._buffer._mask_value[self._row] |= bit
+        else:
+            self._buffer._mask_value[self._row] &= ~bit
+
+    def __delitem__(self, feature):
+        bit = self._buffer._feature_bits.get(feature)
+        if bit is None or not self._buffer._mask_set[self._row] & bit:
+            raise KeyError(feature)
+        self._buffer._mask_set[self._row] &= ~bit
+        self._buffer._mask_value[self._row] &= ~bit
+
+    def __iter__(self):
+        is_set = self._buffer._mask_set[self._row]
+        return iter([f for f, bit in self._buffer._feature_bits.items() if is_set & bit])
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _Position:
+    # Stands in for the ``position`` ValueRecord of a BufferItem.
+    __slots__ = ("_buffer", "_row")
+
+    def __init__(self, buf, row):
+        self._buffer = buf
+        self._row = row
+
+    def _getter(column):
+        def get(self):
+            others = self._buffer._positions.get(self._row)
+            if others and column in others:
+                return others[column]
+            return getattr(self._buffer, column)[self._row]
+
+        def set(self, value):
+            buf, row = self._buffer, self._row
+            value = value or 0
+            if isinstance(value, int):
+                getattr(buf, column)[row] = value
+                others = buf._positions.get(row)
+                if others:
+                    others.pop(column, None)
+                    if not others:
+                        del buf._positions[row]
+            else:
+                getattr(buf, column)[row] = 0
+                buf._positions.setdefault(row, {})[column] = value
+
+        return property(get, set)
+
+    xPlacement = _getter("_x_placement")
+    yPlacement = _getter("_y_placement")
+    xAdvance = _getter("_x_advance")
+    yAdvance = _getter("_y_advance")
+    del _getter
+
+    def __repr__(self):
+        return "<%i %i %i %i>" % (
+            self.xPlacement,
+            self.yPlacement,
+            self.xAdvance,
+            self.yAdvance,
+        )
+
+
+class ArrayBufferItem(BufferItem):
+    """A view of one row of an :py:class:`ArrayBuffer`.
+
+    Behaves like a ``BufferItem``. Attributes which the buffer has no
+    column for (``syllable_index``, ``attach_chain`` and so on) are kept
+    in a per-row dictionary."""
+
+    __slots__ = ("_buffer", "_row")
+
+    def __init__(self, buf, row):
+        object.__setattr__(self, "_buffer", buf)
+        object.__setattr__(self, "_row", row)
+
+    def __getattr__(self, name):
+        if name in ArrayBufferItem.__slots__:
+            raise AttributeError(name)
+        extras = self._buffer._extras.get(self._row)
+        if extras is not None and name in extras:
+            return extras[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if hasattr(type(self), name):
+            object.__setattr__(self, name, value)
+        else:
+            self._buffer._extras.setdefault(self._row, {})[name] = value
+
+    def __delattr__(self, name):
+        try:
+            del self._buffer._extras[self._row][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __copy__(self):
+        return self._buffer._view(self._buffer._copy_row(self._row))
+
+    @property
+    def codepoint(self):
+        cp = self._buffer._codepoint[self._row]
+        return None if cp < 0 else cp
+
+    @codepoint.setter
+    def codepoint(self, value):
+        self._buffer._codepoint[self._row] = -1 if value is None else value
+
+    @property
+    def glyph(self):
+        gid = self._buffer._gid[self._row]
+        if gid == NOT_IN_FONT:
+            return self._buffer._names.get(self._row)
+        return GlyphInfoCache.for_font(self._buffer.font).glyph_names[gid]
+
+    @glyph.setter
+    def glyph(self, name):
+        self._buffer._set_glyph(self._row, name)
+
+    @property
+    def gid(self):
+        return self._buffer._gid[self._row]
+
+    @gid.setter
+    def gid(self, value):
+        # The glyph ID follows the glyph name; prep_glyph sets both.
+        pass
+
+    @property
+    def cluster(self):
+        return self._buffer._cluster[self._row]
+
+    @cluster.setter
+    def cluster(self, value):
+        self._buffer._cluster[self._row] = value
+
+    @property
+    def category(self):
+        code = self._buffer._category[self._row]
+        if not code:
+            raise AttributeError("category")
+        return (_categories[code], None)
+
+    @category.setter
+    def category(self, value):
+        name = value[0]
+        if name not in _category_codes:
+            _category_codes[name] = len(_categories)
+            _categories.append(name)
+        self._buffer._category[self._row] = _category_codes[name]
+
+    @property
+    def feature_masks(self):
+        return _FeatureMasks(self._buffer, self._row)
+
+    @feature_masks.setter
+    def feature_masks(self, masks):
+        self._buffer._mask_set[self._row] = 0
+        self._buffer._mask_value[self._row] = 0
+        fm = self.feature_masks
+        for feature, value in masks.items():
+            fm[feature] = value
+
+    @property
+    def position(self):
+        if not self._buffer._flags[self._row] & _PREPARED:
+            raise AttributeError("position")
+        return _Position(self._buffer, self._row)
+
+    @position.setter
+    def position(self, vr):
+        self._buffer._flags[self._row] |= _PREPARED
+        position = _Position(self._buffer, self._row)
+        position.xPlacement = vr.xPlacement
+        position.yPlacement = vr.yPlacement
+        position.xAdvance = vr.xAdvance
+        position.yAdvance = vr.yAdvance
+
+    def _flag(bit):
+        def get(self):
+            flags = self._buffer._flags[self._row]
+            if not flags & _PREPARED:
+                raise AttributeError()
+            return bool(flags & bit)
+
+        def set(self, value):
+            buf = self._buffer
+            if value:
+                buf._flags[self._row] |= bit | _PREPARED
+            else:
+                buf._flags[self._row] = (buf._flags[self._row] & ~bit) | _PREPARED
+
+        return property(get, set)
+
+    substituted = _flag(_SUBSTITUTED)
+    ligated = _flag(_LIGATED)
+    multiplied = _flag(_MULTIPLIED)
+    del _flag
+
+    @property
+    def unsafe_to_break(self):
+        return bool(self._buffer._flags[self._row] & _UNSAFE_TO_BREAK)
+
+    @unsafe_to_break.setter
+    def unsafe_to_break(self, value):
+        if value:
+            self._buffer._flags[self._row] |= _UNSAFE_TO_BREAK
+        else:
+            self._buffer._flags[self._row] &= ~_UNSAFE_TO_BREAK
+
+
+class _Items(MutableSequence):
+    # The ``items`` of an ArrayBuffer: a list-like view over its row order.
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buf):
+        self._buffer = buf
+
+    def __len__(self):
+        return len(self._buffer._order)
+
+    def __getitem__(self, key):
+        buf = self._buffer
+        if isinstance(key, slice):
+            return [buf._view(row) for row in buf._order[key]]
+        return buf._view(buf._order[key])
+
+    def __setitem__(self, key, value):
+        buf = self._buffer
+        if isinstance(key, slice):
+            buf._order[key] = array("l", [buf._row_for(x) for x in value])
+        else:
+            buf._order[key] = buf._row_for(value)
+
+    def __delitem__(self, key):
+        del self._buffer._order[key]
+
+    def insert(self, index, value):
+        buf = self._buffer
+        row = buf._row_for(value)
+        if not isinstance(value, ArrayBufferItem) and buf._order:
+            # A new item (e.g. a dotted circle) joins its neighbour's cluster
+            neighbour = buf._order[min(index, len(buf._order) - 1)]
+            buf._cluster[row] = buf._cluster[neighbour]
+        buf._order.insert(index, row)
+
+    def __iter__(self):
+        buf = self._buffer
+        return (buf._view(row) for row in buf._order)
+
+
+class ArrayBuffer(Buffer):
+    """A compact shaping buffer. See the module documentation.
+
+    This can be used anywhere a ``Buffer`` can, including with
+    ``Shaper.execute``."""
+
+    itemclass = ArrayBufferItem
+
+    def __init__(self, font, glyphs=[], unicodes=[], direction=None, script=None, language=None):
+        self.font = font
+        self._clear_rows()
+        super().__init__(
+            font,
+            glyphs=glyphs,
+            unicodes=unicodes,
+            direction=direction,
+            script=script,
+            language=language,
+        )
+
+    def _clear_rows(self):
+        self._order = array("l")
+        self._gid = array("l")
+        self._codepoint = array("l")
+        self._cluster = array("l")
+        self._category = array("B")
+        self._flags = array("B")
+        self._mask_set = array("Q")
+        self._mask_value = array("Q")
+        self._x_placement = array("l")
+        self._y_placement = array("l")
+        self._x_advance = array("l")
+        self._y_advance = array("l")
+        self._names = {}  # Glyph names of rows not in the font
+        self._extras = {}  # Other attributes, by row
+        self._positions = {}  # Position values which are not integers, by row
+        self._feature_bits = {}
+
+    @property
+    def items(self):
+        return _Items(self)
+
+    @items.setter
+    def items(self, items):
+        self._order = array("l", [self._row_for(x) for x in items])
+
+    def _view(self, row):
+        return ArrayBufferItem(self, row)
+
+    def _new_row(self, codepoint=None, cluster=0):
+        row = len(self._gid)
+        self._gid.append(NOT_IN_FONT)
+        self._codepoint.append(-1 if codepoint is None else codepoint)
+        self._cluster.append(cluster)
+        self._category.append(0)
+        self._flags.append(0)
+        self._mask_set.append(0)
+        self._mask_value.append(0)
+        self._x_placement.append(0)
+        self._y_placement.append(0)
+        self._x_advance.append(0)
+        self._y_advance.append(0)
+        return row
+
+    def _copy_row(self, row):
+        new = len(self._gid)
+        for column in self._columns():
+            column.append(column[row])
+        if row in self._names:
+            self._names[new] = self._names[row]
+        if row in self._extras:
+            self._extras[new] = dict(self._extras[row])
+        if row in self._positions:
+            self._positions[new] = dict(self._positions[row])
+        return new
+
+    def _columns(self):
+        return [
+            self._gid,
+            self._codepoint,
+            self._cluster,
+            self._category,
+            self._flags,
+            self._mask_set,
+            self._mask_value,
+            self._x_placement,
+            self._y_placement,
+            self._x_advance,
+            self._y_advance,
+        ]
+
+    def _row_for(self, item):
+        # Rows of our own views are used directly; anything else (a plain
+        # BufferItem, or a view of some other buffer) is copied in.
+        if isinstance(item, ArrayBufferItem) and item._buffer is self:
+            return item._row
+        row = self._new_row(item.codepoint)
+        view = self._view(row)
+        for k, v in vars(item).items():
+            setattr(view, k, v)
+        if isinstance(item, ArrayBufferItem):
+            for attr in ["glyph", "cluster", "feature_masks", "unsafe_to_break"]:
+                setattr(view, attr, getattr(item, attr))
+            for attr in ["category", "position", "substituted", "ligated", "multiplied"]:
+                if hasattr(item, attr):
+                    setattr(view, attr, getattr(item, attr))
+            extras = item._buffer._extras.get(item._row)
+            if extras:
+                self._extras[row] = dict(extras)
+        return row
+
+    def _set_glyph(self, row, name):
+        gid = GlyphInfoCache.for_font(self.font).gid(name) if name else NOT_IN_FONT
+        self._gid[row] = gid
+        if gid == NOT_IN_FONT:
+            self._names[row] = name
+        else:
+            self._names.pop(row, None)
+
+    def _feature_bit(self, feature):
+        if feature not in self._feature_bits:
+            if len(self._feature_bits) >= 64:
+                raise ValueError("Too many masked features in one buffer")
+            self._feature_bits[feature] = 1 << len(self._feature_bits)
+        return self._feature_bits[feature]
+
+    def store_glyphs(self, glyphs):
+        self._clear_rows()
+        for ix, g in enumerate(glyphs):
+            row = self._new_row(cluster=ix)
+            self._order.append(row)
+            view = self._view(row)
+            view.glyph = g
+            view.prep_glyph(self.font)
+        self.clear_mask_cache()
+
+    def store_unicode(self, unistring):
+        self._clear_rows()
+        for ix, char in enumerate(unistring):
+            self._order.append(self._new_row(ord(char), cluster=ix))
+        self.clear_mask_cache()
+
+    def unsafe_to_break(self, start, end):
+        start, end = max(start, 0), min(end, len(self.mask))
+        if end - start < 2:
+            return
+        flags, order = self._flags, self._order
+        for ix in range(self.mask[start] + 1, self.mask[end - 1] + 1):
+            flags[order[ix]] |= _UNSAFE_TO_BREAK
+
+    def compact(self):
+        """Drop rows which are no longer in the buffer, so that the columns
+        hold exactly the glyph stream, in order. Any items handed out
+        before compacting are no longer valid."""
+        order = self._order
+        for name in [
+            "_gid",
+            "_codepoint",
+            "_cluster",
+            "_category",
+            "_flags",
+            "_mask_set",
+            "_mask_value",
+            "_x_placement",
+            "_y_placement",
+            "_x_advance",
+            "_y_advance",
+        ]:
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[row] for row in order]))
+        self._names = {new: self._names[row] for new, row in enumerate(order) if row in self._names}
+        self._extras = {new: self._extras[row] for new, row in enumerate(order) if row in self._extras}
+        self._positions = {new: self._positions[row] for new, row in enumerate(order) if row in self._positions}
+        self._order = array("l", range(len(order)))
+        self.clear_mask_cache()
+
+    def as_arrays(self):
+        """Returns the glyph stream as a dictionary of arrays.
+
+        The keys are ``gid``, ``codepoint``, ``cluster``, ``x_placement``,
+        ``y_placement``, ``x_advance`` and ``y_advance``. Glyphs which are
+        not in the font have a gid of -1, and items without a codepoint
+        have a codepoint of -1. If any positions are not integers, the
+        position columns are given as lists instead."""
+        self.compact()
+        arrays = {
+            "gid": self._gid,
+            "codepoint": self._codepoint,
+            "cluster": self._cluster,
+            "x_placement": self._x_placement,
+            "y_placement": self._y_placement,
+            "x_advance": self._x_advance,
+            "y_advance": self._y_advance,
+        }
+        if self._positions:
+            for key in ["x_placement", "y_placement", "x_advance", "y_advance"]:
+                column = "_" + key
+                arrays[key] = [
+                    self._positions.get(row, {}).get(column, value)
+                    for row, value in enumerate(arrays[key])
+                ]
+        return arrays
@@ -1,39 +1,155 @@
-import logging
+from fontFeatures.shaperLib.Trace import RuleTested
+from fontFeatures.glyphInfoCache import GlyphInfoCache
 from fontFeatures import Rule
 
 
 def shaper_inputs(self):
     return [self.bases.keys(), self.marks.keys()]
 
-def find_base_backwards(self, buf, ix):
-    start_ix = ix
-    ix = ix - 1
-    while ix >= 0:
-        if buf[ix].glyph in self.bases.keys():
-            # Check for unhelpful stuff in between
-            my_category = buf[ix].category[0]
-            for i in range(ix+1, start_ix):
-                if buf[i].category[0] == my_category or buf[i].category[0] == "unknown":
-                    # Oops, we skipped over another %s to get here
-                    return None
-            return ix
-        ix = ix - 1
-    return None
 
-def would_apply_at_position(self, buf, ix, namedclasses={}):
-    from fontFeatures.shaperLib.Rule import _expand_slot
+class AnchorIndex:
+    """An attachment rule's glyphs and anchors, ready for shaping.
+
+    ``marks`` and ``bases`` are frozensets of glyph names, with named
+    classes expanded. Anchors are kept in lists indexed by glyph ID, with
+    a dictionary by name for glyphs which are not in the font."""
+
+    def __init__(self, rule, font, namedclasses={}):
+        info = GlyphInfoCache.for_font(font)
+        self.info = info
+        self.mark_anchors, self.mark_anchors_by_name = self._anchors(rule.marks, namedclasses)
+        self.base_anchors, self.base_anchors_by_name = self._anchors(rule.bases, namedclasses)
+        self.marks = frozenset(self.mark_anchors_by_name)
+        self.bases = frozenset(self.base_anchors_by_name)
+
+    def _anchors(self, anchors, namedclasses):
+        from fontFeatures.shaperLib.Rule import _expand_slot
+
+        by_gid = [None] * len(self.info.glyph_ids)
+        by_name = {}
+        for key, anchor in anchors.items():
+            for g in _expand_slot([key], namedclasses):
+                if g in by_name:
+                    continue
+                by_name[g] = anchor
+                gid = self.info.gid(g)
+                if gid != -1:
+                    by_gid[gid] = anchor
+        return by_gid, by_name
+
+    def mark_anchor(self, item):
+        gid = getattr(item, "gid", -1)
+        if gid is not None and gid >= 0:
+            return self.mark_anchors[gid]
+        return self.mark_anchors_by_name.get(item.glyph)
+
+    def base_anchor(self, item):
+        gid = getattr(item, "gid", -1)
+        if gid is not None and gid >= 0:
+            return self.base_anchors[gid]
+        return self.base_anchors_by_name.get(item.glyph)
+
+
+def anchor_index(self, font, namedclasses={}):
+    """Returns the rule's :py:class:`AnchorIndex` for the font, building
+    it if the rule's glyphs, the named classes or the font's glyphs have
+    changed. (Anchors moved without adding or removing glyphs are not
+    noticed; delete the rule's ``_anchor_index`` attribute.)"""
+    from fontFeatures.shaperLib.Rule import _class_signature
+
+    refs = [g[1:] for g in list(self.marks) + list(self.bases) if g.startswith("@")]
+    key = (
+        len(self.marks),
+        len(self.bases),
+        GlyphInfoCache.for_font(font),
+        _class_signature(namedclasses, refs),
+    )
+    cached = self.__dict__.get("_anchor_index")
+    if cached and cached[0] == key and cached[1] is namedclasses:
+        return cached[2]
+    index = AnchorIndex(self, font, namedclasses)
+    self._anchor_index = (key, namedclasses, index)
+    return index
 
-    logging.getLogger("fontFeatures.shaperLib").debug("Testing if %s would apply at position %i" % (self.asFea(), ix))
-    marks = _expand_slot(self.marks.keys(), namedclasses)
-    bases = _expand_slot(self.bases.keys(), namedclasses)
+
+class _BufferScan:
+    # One pass over the visible glyphs of a buffer, recording for each
+    # position where the next glyph of the same category is and where the
+    # last glyph of unknown category was, so that finding a mark's base
+    # costs the same however far back it is.
+
+    def __init__(self, buf):
+        self.mask = buf.mask
+        self.length = len(buf.items)
+        self.items = buf[0 : len(buf)]
+        count = len(self.items)
+        self.next_same = [count] * count
+        self.last_unknown = [-1] * count
+        last = {}
+        unknown = -1
+        for i, item in enumerate(self.items):
+            category = item.category[0]
+            self.last_unknown[i] = unknown
+            if category in last:
+                self.next_same[last[category]] = i
+            last[category] = i
+            if category == "unknown":
+                unknown = i
+        self.last_in = {}
+
+    def last_glyph_in(self, glyphs):
+        # For each position, the last earlier position holding one of the
+        # glyphs, or -1
+        cached = self.last_in.get(id(glyphs))
+        if cached and cached[0] is glyphs:
+            return cached[1]
+        result = []
+        last = -1
+        for i, item in enumerate(self.items):
+            result.append(last)
+            if item.glyph in glyphs:
+                last = i
+        self.last_in[id(glyphs)] = (glyphs, result)
+        return result
+
+
+def _scan(buf):
+    scan = buf.__dict__.get("_attachment_scan")
+    if scan is None or scan.mask is not buf.mask or scan.length != len(buf.items):
+        scan = _BufferScan(buf)
+        buf._attachment_scan = scan
+    return scan
+
+
+def find_base_backwards(self, buf, ix, namedclasses={}):
+    """Returns the position of the glyph the mark at ``ix`` attaches to:
+    the nearest earlier glyph in the rule's bases, provided that no glyph
+    of the same category, and no glyph of unknown category, lies between
+    them. Returns None if there isn't one."""
+    scan = _scan(buf)
+    bases = anchor_index(self, buf.font, namedclasses).bases
+    base_ix = scan.last_glyph_in(bases)[ix]
+    if base_ix == -1:
+        return None
+    if scan.next_same[base_ix] < ix or scan.last_unknown[ix] > base_ix:
+        # Oops, we skipped over another glyph of its kind to get here
+        return None
+    return base_ix
+
+def would_apply_at_position(self, buf, ix, namedclasses={}):
+    index = anchor_index(self, buf.font, namedclasses)
+    marks, bases = index.marks, index.bases
 
     if self.is_cursive:
         if ix == 0:
-            logging.getLogger("fontFeatures.shaperLib").debug(" * No, it has no adjacent glyph")
+            if buf.trace:
+                buf.trace(RuleTested(self, ix, False, "it has no adjacent glyph"))
             return False
         if buf[ix].glyph in marks and buf[ix-1].glyph in bases:
-            logging.getLogger("fontFeatures.shaperLib").debug(" * No, %s/%s is not a pair" % (buf[ix].glyph, buf[ix-1].glyph))
-        logging.getLogger("fontFeatures.shaperLib").debug(" * Yes, %s/%s is a pair" % (buf[ix].glyph, buf[ix-1].glyph))
+            if buf.trace:
+                buf.trace(RuleTested(self, ix, False, "%s/%s is not a pair", buf[ix].glyph, buf[ix-1].glyph))
+        if buf.trace:
+            buf.trace(RuleTested(self, ix, True, "%s/%s is a pair", buf[ix].glyph, buf[ix-1].glyph))
         return True
 
 
@@ -42,25 +158,26 @@ def would_apply_at_position(self, buf, ix, namedclasses={}):
     # so we search backwards for the preceding base glyph
     # XXX mark to mark
     if buf[ix].glyph not in marks:
-        logging.getLogger("fontFeatures.shaperLib").debug(" * No, %s is not in our mark list" % (buf[ix].glyph))
+        if buf.trace:
+            buf.trace(RuleTested(self, ix, False, "%s is not in our mark list", buf[ix].glyph))
         return False
-    base_ix = find_base_backwards(self, buf, ix)
+    base_ix = find_base_backwards(self, buf, ix, namedclasses)
     if base_ix is None:
-        logging.getLogger("fontFeatures.shaperLib").debug(" * No, I couldn't find a base glyph")
-        return False
-    if buf[base_ix].glyph not in bases:
-        logging.getLogger("fontFeatures.shaperLib").debug(" * No, %s is not in our base list" % buf[base_ix].glyph)
+        if buf.trace:
+            buf.trace(RuleTested(self, ix, False, "I couldn't find a base glyph"))
         return False
-    logging.getLogger("fontFeatures.shaperLib").debug(" * Yes, attaching mark %s/%i to %s/%i" % (buf[ix].glyph, ix, buf[base_ix].glyph, base_ix))
+    if buf.trace:
+        buf.trace(RuleTested(self, ix, True, "attaching mark %s/%i to %s/%i", buf[ix].glyph, ix, buf[base_ix].glyph, base_ix))
     return True
 
-def _do_apply_cursive(self, buf, ix):
-    mark = buf[ix].glyph
-    base = buf[ix - 1].glyph
-    if mark not in self.marks or base not in self.bases:
+def _do_apply_cursive(self, buf, ix, index):
+    exit = index.mark_anchor(buf[ix])
+    entry = index.base_anchor(buf[ix - 1])
+    if exit is None or entry is None:
         return
-    exit_x, exit_y = self.marks.get(mark, (0,0))
-    entry_x, entry_y = self.bases.get(base, (0,0))
+    buf.unsafe_to_break(ix - 1, ix + 1)
+    exit_x, exit_y = exit[0], exit[1]
+    entry_x, entry_y = entry[0], entry[1]
     d = exit_x + (buf[ix-1].position.xPlacement or 0)
     buf[ix-1].position.xAdvance = (buf[ix-1].position.xAdvance or 0) - d
     buf[ix-1].position.xPlacement = (buf[ix-1].position.xPlacement or 0) - d
@@ -79,15 +196,17 @@ def _do_apply_cursive(self, buf, ix):
 
 
 def _do_apply(self, buf, ix, namedclasses={}):
+    index = anchor_index(self, buf.font, namedclasses)
     if self.is_cursive:
-        return _do_apply_cursive(self, buf, ix)
-    from fontFeatures import ValueRecord
-    base_ix = find_base_backwards(self, buf, ix)
-    mark = buf[ix].glyph
-    base = buf[base_ix].glyph
-    xpos = self.bases[base][0] - self.marks[mark][0]
-    ypos = self.bases[base][1] - self.marks[mark][1]
-    buf[ix].position.xPlacement = xpos
-    buf[ix].position.yPlacement = ypos
+        return _do_apply_cursive(self, buf, ix, index)
+    base_ix = find_base_backwards(self, buf, ix, namedclasses)
+    # Anchors may carry a contour point after the coordinates
+    base = index.base_anchor(buf[base_ix])
+    mark = index.mark_anchor(buf[ix])
+    base_x, base_y = base[0], base[1]
+    mark_x, mark_y = mark[0], mark[1]
+    buf.unsafe_to_break(base_ix, ix + 1)
+    buf[ix].position.xPlacement = base_x - mark_x
+    buf[ix].position.yPlacement = base_y - mark_y
     buf[ix].attach_type = "mark"
     buf[ix].attach_chain = base_ix - ix
@@ -1,8 +1,11 @@
 from fontFeatures.shaperLib.Buffer import Buffer, BufferItem
 from copy import copy
 import unicodedata
-from youseedee import ucd_data
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, GENERAL_CATEGORY
 from fontFeatures import RoutineReference
+from fontFeatures.shaperLib.Trace import RoutineStart, RoutineEnd
+from fontFeatures.shaperLib.Compiler import compile_routine
+from fontFeatures.shaperLib.FastPath import apply_fast_path
 
 
 
@@ -21,6 +24,11 @@ def _is_default_ignorable(c):
 
 
 class BaseShaper:
+    # Whether words separated by spaces can be shaped on their own, and
+    # which features this shaper may mask off on spaces (see WordCache)
+    shapes_words_independently = True
+    masked_features = []
+
     def __init__(self, plan, font, buf, features=[]):
         self.plan = plan
         self.font = font
@@ -28,7 +36,7 @@ class BaseShaper:
         self.features = features
 
     def shape(self):
-        self.plan.fontfeatures.resolveAllRoutines()
+        # Routines are resolved when the shape plan is made
         # self.buffer.set_unicode_props()
         # self.insert_dotted_circles()
         # self.buffer.form_clusters()
@@ -66,8 +74,8 @@ class BaseShaper:
 
         # Some fix-ups from hb-ot-shape-normalize
         for item in self.buffer.items:
-            if ucd_data(item.codepoint)[
-                "General_Category"
+            if unicode_properties(item.codepoint)[
+                GENERAL_CATEGORY
             ] == "Zs" and self.font.glyphForCodepoint(0x20, False):
                 item.codepoint = 0x20
                 # Harfbuzz adjusts the width here, in _hb_ot_shape_fallback_spaces
@@ -88,65 +96,96 @@ class BaseShaper:
         #         i.position.xAdvance = 0
         # zero width default ignorables
         self.zero_width_default_ignorables()
-        for i in range(0,len(self.buffer.items)):
-            self.propagate_attachment_offsets(i)
+        self.propagate_attachment_offsets()
 
-    def propagate_attachment_offsets(self, i):
-        if not hasattr(self.buffer.items[i], "attach_type"):
-            return
-        attach_type = self.buffer.items[i].attach_type
-        attach_chain = self.buffer.items[i].attach_chain
-        if not attach_chain:
-            return
-        self.buffer.items[i].attach_chain = None
-        j = i + attach_chain
-        if j >= len(self.buffer.items):
-            return
-        self.propagate_attachment_offsets(j)
-        if attach_type == "cursive":
-            self.buffer.items[i].position.yPlacement = (self.buffer.items[i].position.yPlacement or 0) + (self.buffer.items[j].position.yPlacement or 0) # XXX Horizontal only
-        else:
-            self.buffer.items[i].position.xPlacement += self.buffer.items[j].position.xPlacement or 0
-            self.buffer.items[i].position.yPlacement += self.buffer.items[j].position.yPlacement or 0
-            assert j < i
-            if self.buffer.direction == "LTR":
-                for k in range(j,i):
-                    self.buffer.items[i].position.xPlacement -= self.buffer.items[k].position.xAdvance
-                    self.buffer.items[i].position.yPlacement -= self.buffer.items[k].position.yAdvance or 0
-            else:
-                for k in range(j+1,i+1):
-                    self.buffer.items[i].position.xPlacement += self.buffer.items[k].position.xAdvance
-                    self.buffer.items[i].position.yPlacement += self.buffer.items[k].position.yAdvance or 0
+    def propagate_attachment_offsets(self):
+        """Turns the offsets of attached glyphs, which are relative to the
+        glyph they are attached to, into offsets from their own pen
+        position.
 
+        Each glyph must be resolved after the glyph it is attached to, so
+        chains are followed to their ends and then resolved back towards
+        their starts. The advances between a mark and its base are taken
+        from a prefix sum over the buffer."""
+        items = self.buffer.items
+        count = len(items)
+        x_advances = y_advances = None
+        for start in range(count):
+            # Follow the chain of attachments from this glyph
+            path = []
+            i = start
+            while True:
+                item = items[i]
+                if not hasattr(item, "attach_type") or not item.attach_chain:
+                    break
+                j = i + item.attach_chain
+                item.attach_chain = None
+                if j < 0 or j >= count:
+                    break
+                path.append((i, item.attach_type, j))
+                i = j
+            for i, attach_type, j in reversed(path):
+                position, parent = items[i].position, items[j].position
+                if attach_type == "cursive":
+                    position.yPlacement = (position.yPlacement or 0) + (parent.yPlacement or 0) # XXX Horizontal only
+                    continue
+                assert j < i
+                position.xPlacement += parent.xPlacement or 0
+                position.yPlacement += parent.yPlacement or 0
+                if x_advances is None:
+                    x_advances, y_advances = self._advance_sums()
+                if self.buffer.direction == "LTR":
+                    position.xPlacement -= x_advances[i] - x_advances[j]
+                    position.yPlacement -= y_advances[i] - y_advances[j]
+                else:
+                    position.xPlacement += x_advances[i + 1] - x_advances[j + 1]
+                    position.yPlacement += y_advances[i + 1] - y_advances[j + 1]
+
+    def _advance_sums(self):
+        # Running totals of the advances; element k is the sum of the
+        # advances of the glyphs before position k
+        x_advances, y_advances = [0], [0]
+        x = y = 0
+        for item in self.buffer.items:
+            x += item.position.xAdvance or 0
+            y += item.position.yAdvance or 0
+            x_advances.append(x)
+            y_advances.append(y)
+        return x_advances, y_advances
 
     def _run_stage(self, current_stage):
         self.plan.msg("Running %s stage" % current_stage)
-        self.plan.fontfeatures.hoist_languages()
-        for stage in self.plan.stages:
-            lookups = []
+        shape_plan = self.plan.shape_plan
+        namedclasses = self.plan.fontfeatures.namedClasses
+        # Glyphs may have been changed since the last time we looked
+        self.buffer.clear_glyph_digest()
+        for stage, lookups in zip(shape_plan.stages, shape_plan.lookups):
             if isinstance(stage, list):  # Features
-                for f in stage:
-                    if f not in self.plan.fontfeatures.features:
-                        continue
-
-                    routines = self.plan.fontfeatures.features[f]
-                    routines = [x.routine if isinstance(x, RoutineReference) else x for x in routines]
-                    lookups.extend(
-                        [(routine, f) for routine in self._filter_by_lang(routines)]
-                    )
                 self.plan.msg("Processing features: %s" % ",".join(stage))
+                tracing = self.plan.tracing
+                profiler = self.plan.profiler
                 for r, feature in lookups:
-                    self.plan.msg(
-                        "Before %s (%s)" % (r.name, feature), buffer=self.buffer
-                    )
-                    r.apply_to_buffer(self.buffer, stage=current_stage, feature=feature, namedclasses=self.plan.fontfeatures.namedClasses)
-                    self.plan.msg(
-                        "After %s (%s)" % (r.name, feature), buffer=self.buffer
-                    )
+                    if not r.could_apply(self.buffer, namedclasses):
+                        continue
+                    if tracing:
+                        self.plan.emit(RoutineStart(r, feature, self.buffer))
+                    if profiler:
+                        stats = profiler.start(r, feature, self.buffer)
+                    if apply_fast_path(r, self.buffer, stage=current_stage, feature=feature, namedclasses=namedclasses):
+                        pass
+                    elif self.plan.compile_routines:
+                        compile_routine(r, namedclasses).apply_to_buffer(self.buffer, stage=current_stage, feature=feature)
+                    else:
+                        r.apply_to_buffer(self.buffer, stage=current_stage, feature=feature, namedclasses=namedclasses)
+                    if profiler:
+                        profiler.stop(stats, self.buffer)
+                    if tracing:
+                        self.plan.emit(RoutineEnd(r, feature, self.buffer))
             else:
                 # It's a pause. We only support GSUB pauses.
                 if current_stage == "sub":
-                    stage(current_stage)
+                    lookups(self, current_stage)
+                    self.buffer.clear_glyph_digest()
 
     def _filter_by_lang(self, routines):
         script = self.script_to_opentype.get(self.buffer.script,"DFLT")
@@ -179,6 +218,14 @@ class BaseShaper:
     def would_substitute(self, feature, subbuffer_items):
         if not feature in self.plan.fontfeatures.features:
             return False
+        # The answer depends only on the glyphs, so remember it in the plan
+        cache = self.plan.shape_plan.cache.setdefault("would_substitute", {})
+        key = (feature, tuple(item.glyph for item in subbuffer_items))
+        if key not in cache:
+            cache[key] = self._would_substitute(feature, subbuffer_items)
+        return cache[key]
+
+    def _would_substitute(self, feature, subbuffer_items):
         subbuffer = Buffer(
             self.buffer.font,
             direction=self.buffer.direction,
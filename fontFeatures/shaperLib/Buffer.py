@@ -1,7 +1,9 @@
 from dataclasses import dataclass
 from fontFeatures import ValueRecord
+from fontFeatures.glyphInfoCache import GlyphInfoCache
 from glyphtools import get_glyph_metrics
-from youseedee import ucd_data
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, SCRIPT, GENERAL_CATEGORY
+from bisect import bisect_left
 import sys
 import warnings
 
@@ -24,6 +26,11 @@ class BufferItem:
     # position: ValueRecord
     # category: str
 
+    # Set when a rule which applied looked at this glyph and the one
+    # before it, so the text cannot be broken before this glyph without
+    # shaping it again (HarfBuzz's UNSAFE_TO_BREAK)
+    unsafe_to_break = False
+
     def __repr__(self):
         s = ""
         if self.glyph:
@@ -63,17 +70,15 @@ class BufferItem:
         self.prep_glyph(font)
 
     def prep_glyph(self, font):
-        if self.glyph in font.glyphOrder:
-            self.gid = font.glyphOrder.index(self.glyph)
-        else:
-            self.gid = -1 # ?
+        info = GlyphInfoCache.for_font(font)
+        self.gid = info.gid(self.glyph)
         self.substituted = False
         self.ligated = False
         self.multiplied = False
         self.recategorize(font)
         try:
             self.position = ValueRecord(xAdvance=0)
-            self.position.xAdvance=font[self.glyph].width
+            self.position.xAdvance = info.width(self.glyph)
         except Exception as e:
             if "pytest" in sys.modules:
                 # We tolerate broken fonts in pytest
@@ -83,7 +88,7 @@ class BufferItem:
 
     def recategorize(self, font):
         try:
-            self.category = (font[self.glyph].category, None)
+            self.category = (GlyphInfoCache.for_font(font).category(self.glyph), None)
             if not self.category[0]:
                 self.category = ("unknown", None)
         except Exception as e:
@@ -95,7 +100,7 @@ class BufferItem:
             # Now what?
             self.category = ("unknown", None)
             return
-        genCat = ucd_data(self.codepoint).get("General_Category", "L")
+        genCat = unicode_properties(self.codepoint)[GENERAL_CATEGORY] or "L"
         if genCat[0] == "M":
             self.category = ("mark", None)
         elif genCat == "Ll":
@@ -109,6 +114,98 @@ class BufferItem:
         _add_value_records(self.position, vr2)
 
 
+def _make_filter(flags, markFilteringSet, markAttachmentSet, feature):
+    ignored = set()
+    if flags & 0x2:  # IgnoreBases
+        ignored.add("base")
+    if flags & 0x4:  # IgnoreLigatures
+        ignored.add("ligature")
+    if flags & 0x8:  # IgnoreMarks
+        ignored.add("mark")
+    if not (flags & 0x10):
+        markFilteringSet = None
+    if not (flags & 0xFF00):
+        markAttachmentSet = None
+    if not (ignored or flags & 0x10 or flags & 0xFF00 or feature):
+        return None
+
+    def keep(item):
+        category = item.category[0]
+        if category in ignored:
+            return False
+        if category == "mark":
+            if flags & 0x10 and item.glyph not in markFilteringSet:
+                return False
+            if flags & 0xFF00 and item.glyph not in markAttachmentSet:
+                return False
+        if feature and item.feature_masks.get(feature):
+            return False
+        return True
+
+    return keep
+
+
+class SkippyIter:
+    """Walks a buffer's items forwards and backwards by unmasked position,
+    skipping the items which a lookup with the given flags, mark filtering
+    set and mark attachment set would not see. No mask is built, so this
+    is cheap to use for lookups other than the current one.
+
+    Get one from :py:meth:`Buffer.skippy_iter`."""
+
+    def __init__(self, buf, flags=0, markFilteringSet=None, markAttachmentSet=None, feature=None):
+        self.items = buf.items
+        self.keep = _make_filter(flags or 0, markFilteringSet, markAttachmentSet, feature)
+
+    def visible(self, ix):
+        """Returns whether the item at position ``ix`` is seen."""
+        return 0 <= ix < len(self.items) and (not self.keep or self.keep(self.items[ix]))
+
+    def next(self, ix):
+        """Returns the position of the next visible item after ``ix``, or
+        None."""
+        items, keep = self.items, self.keep
+        ix = ix + 1
+        while ix < len(items):
+            if not keep or keep(items[ix]):
+                return ix
+            ix = ix + 1
+        return None
+
+    def prev(self, ix):
+        """Returns the position of the last visible item before ``ix``, or
+        None."""
+        items, keep = self.items, self.keep
+        ix = ix - 1
+        while ix >= 0:
+            if not keep or keep(items[ix]):
+                return ix
+            ix = ix - 1
+        return None
+
+    def match(self, ix, slots):
+        """Matches the visible glyphs from position ``ix`` (which should be
+        visible) onwards against a list of sets of glyph names. Returns the
+        position of the last glyph matched, or None if they don't match."""
+        items = self.items
+        for n, slot in enumerate(slots):
+            if n:
+                ix = self.next(ix)
+            if ix is None or ix >= len(items) or items[ix].glyph not in slot:
+                return None
+        return ix
+
+    def match_backwards(self, ix, slots):
+        """Returns whether the visible glyphs before position ``ix`` match
+        a list of sets of glyph names, the last set being nearest ``ix``."""
+        items = self.items
+        for slot in reversed(slots):
+            ix = self.prev(ix)
+            if ix is None or items[ix].glyph not in slot:
+                return False
+        return True
+
+
 class Buffer:
     itemclass = BufferItem
 
@@ -119,10 +216,17 @@ class Buffer:
         self.language = language
         self.fallback_mark_positioning = False
         self.fallback_glyph_classes = False
+        self.trace = None
+        self.profile = None
         self.items = []
         self.mask = []
         self.flags = 0
+        self.markFilteringSet = None
+        self.markAttachmentSet = None
         self.current_feature_mask = None
+        self._mask_cache = {}
+        self._dirty = []
+        self._glyph_digest = None
         if glyphs:
             self.store_glyphs(glyphs)
             self.clear_mask()
@@ -132,15 +236,19 @@ class Buffer:
 
     def store_glyphs(self, glyphs):
         self.items = [self.itemclass.new_glyph(g, self.font) for g in glyphs]
+        self.clear_mask_cache()
+        self.clear_glyph_digest()
 
     def store_unicode(self, unistring):
         self.items = [self.itemclass.new_unicode(ord(char)) for char in unistring ]
+        self.clear_mask_cache()
+        self.clear_glyph_digest()
 
     def guess_segment_properties(self):
         for u in self.items:
             # Guess segment properties
             if not self.script:
-                thisScript = ucd_data(u.codepoint)["Script"]
+                thisScript = unicode_properties(u.codepoint)[SCRIPT] or "Unknown"
                 if thisScript not in ["Common", "Unknown", "Inherited"]:
                     self.script = thisScript
         if not self.direction:
@@ -151,6 +259,7 @@ class Buffer:
         glyphs = []
         for u in self.items:
             u.map_to_glyph(self.font)
+        self.clear_glyph_digest()
         self.clear_mask()
 
     @property
@@ -171,24 +280,59 @@ class Buffer:
 
     def __setitem__(self, key, value):
         indexed = self.mask[key]
+        start, old_end = indexed[0], indexed[-1] + 1
+        old_length = len(self.items)
         if len(indexed) == 1:  # Easy
             self.items[indexed[0] : indexed[0] + 1] = value
-            return
-        if len(value) == 1:  # Also easy
+        elif len(value) == 1:  # Also easy
             self.items[indexed[0]] = value[0]
             for i in reversed(indexed[1:]):
                 del self.items[i]
-            return
         else:
             raise ValueError("Too hard :-(")
+        self._dirty.extend(value)
+        if self._glyph_digest is not None:
+            self._glyph_digest.update(v.glyph for v in value)
+        self._splice_mask(start, old_end, old_end + len(self.items) - old_length)
 
     def __len__(self):
         return len(self.mask)
 
+    def mark_changed(self, key):
+        """Tell the buffer that the item at (masked) position ``key`` was
+        changed in place, e.g. by substituting its glyph."""
+        ix = self.mask[key]
+        self._dirty.append(self.items[ix])
+        if self._glyph_digest is not None:
+            self._glyph_digest.add(self.items[ix].glyph)
+        self._splice_mask(ix, ix + 1, ix + 1)
+
     def update(self):
-        for g in self.items:
+        """Bring categories and the mask up to date after items have been
+        changed through ``__setitem__`` or ``mark_changed``. Only the
+        changed items are looked at."""
+        dirty, self._dirty = self._dirty, []
+        recategorized = False
+        for g in dirty:
+            before = g.category
             g.recategorize(self.font)
-        self.recompute_mask()
+            recategorized = recategorized or g.category != before
+        if recategorized:
+            self.recompute_mask()
+
+    def glyph_digest(self):
+        """Returns a set which contains every glyph in the buffer. It may
+        also contain glyphs which have since been substituted away.
+
+        Changes made through ``__setitem__`` and ``mark_changed`` are
+        tracked; call ``clear_glyph_digest()`` after changing glyphs in
+        any other way."""
+        if self._glyph_digest is None:
+            self._glyph_digest = set(item.glyph for item in self.items)
+        return self._glyph_digest
+
+    def clear_glyph_digest(self):
+        self._glyph_digest = None
 
     def clear_mask(self):
         self.flags = 0
@@ -196,54 +340,116 @@ class Buffer:
         self.current_feature_mask = None
         self.recompute_mask()
 
+    def clear_mask_cache(self):
+        """Forget cached masks. Call this after changing ``items`` (or the
+        items' categories or feature masks) directly."""
+        self._mask_cache = {}
+
     def set_mask(self, flags, markFilteringSet=None, markAttachmentSet=None):
         self.flags = flags
         self.markFilteringSet = markFilteringSet
         self.markAttachmentSet = markAttachmentSet
-        self.recompute_mask()
+        self._use_cached_mask()
+
+    def _mask_key(self):
+        return (
+            self.flags or 0,
+            id(self.markFilteringSet),
+            id(self.markAttachmentSet),
+            self.current_feature_mask,
+        )
+
+    def _use_cached_mask(self):
+        cached = self._mask_cache.get(self._mask_key())
+        if (
+            cached
+            and cached[0] is self.markFilteringSet
+            and cached[1] is self.markAttachmentSet
+        ):
+            self.mask = cached[2]
+        else:
+            self._compute_mask()
 
     def recompute_mask(self):
-        mask = range(0, len(self.items))
+        self.clear_mask_cache()
+        self._compute_mask()
+
+    def _compute_mask(self):
         self.flags = self.flags or 0
-        if self.flags & 0x2:  # IgnoreBases
-            mask = list(filter(lambda ix: self.items[ix].category[0] != "base", mask))
-        if self.flags & 0x4:  # IgnoreLigatures
-            mask = list(
-                filter(lambda ix: self.items[ix].category[0] != "ligature", mask)
-            )
-        if self.flags & 0x8:  # IgnoreMarks
-            mask = list(filter(lambda ix: self.items[ix].category[0] != "mark", mask))
-        if self.flags & 0x10:  # UseMarkFilteringSet
-            mask = list(
-                filter(
-                    lambda ix: self.items[ix].category[0] != "mark"
-                    or self.items[ix].glyph in self.markFilteringSet,
-                    mask,
-                )
-            )
-        if self.flags & 0xFF00:  # MarkAttachmentType
-            mask = list(
-                filter(
-                    lambda ix: self.items[ix].category[0] != "mark"
-                    or self.items[ix].glyph in self.markAttachmentSet,
-                    mask,
-                )
-            )
-
-        if self.current_feature_mask:
-            feature = self.current_feature_mask
-            mask = list(
-                filter(
-                    lambda ix: (feature not in self.items[ix].feature_masks)
-                        or (not self.items[ix].feature_masks[feature]),
-                    mask
-                )
-            )
+        keep = self._mask_filter()
+        if keep:
+            mask = [ix for ix, item in enumerate(self.items) if keep(item)]
+        else:
+            mask = range(0, len(self.items))
+        self._set_current_mask(mask)
+
+    def _set_current_mask(self, mask):
         self.mask = mask
+        self._mask_cache[self._mask_key()] = (
+            self.markFilteringSet,
+            self.markAttachmentSet,
+            mask,
+        )
+
+    def _mask_filter(self):
+        # Returns a predicate saying whether an item is visible under the
+        # current flags and feature, or None if everything is visible.
+        return _make_filter(
+            self.flags,
+            self.markFilteringSet,
+            self.markAttachmentSet,
+            self.current_feature_mask,
+        )
+
+    def masked_index(self, ix):
+        """Returns the masked position of the item at unmasked position
+        ``ix``, or None if the current mask hides it."""
+        mask = self.mask
+        masked = bisect_left(mask, ix)
+        if masked < len(mask) and mask[masked] == ix:
+            return masked
+        return None
+
+    def skippy_iter(self, flags=0, markFilteringSet=None, markAttachmentSet=None):
+        """Returns a :py:class:`SkippyIter` which skips the items a lookup
+        with the given flags would not see. The current feature mask is
+        honoured too."""
+        return SkippyIter(self, flags, markFilteringSet, markAttachmentSet, self.current_feature_mask)
+
+    def _splice_mask(self, start, old_end, new_end):
+        # Items start:old_end have been replaced by items start:new_end;
+        # refilter just those and shift the rest of the mask along.
+        self.clear_mask_cache()
+        keep = self._mask_filter()
+        if not keep:
+            self._set_current_mask(range(0, len(self.items)))
+            return
+        mask = self.mask
+        lo = bisect_left(mask, start)
+        hi = bisect_left(mask, old_end)
+        middle = [ix for ix in range(start, new_end) if keep(self.items[ix])]
+        delta = new_end - old_end
+        if delta:
+            tail = [ix + delta for ix in mask[hi:]]
+        else:
+            tail = list(mask[hi:])
+        self._set_current_mask(list(mask[:lo]) + middle + tail)
 
     def set_feature_mask(self, feature):
         self.current_feature_mask = feature
-        self.recompute_mask()
+        self._use_cached_mask()
+
+    def unsafe_to_break(self, start, end):
+        """Marks the items from (masked) position ``start`` up to, but not
+        including, ``end`` as depending on each other: each of them apart
+        from the first, and any item the mask hides between them, gets
+        its ``unsafe_to_break`` flag set."""
+        start, end = max(start, 0), min(end, len(self.mask))
+        if end - start < 2:
+            return
+        items = self.items
+        for ix in range(self.mask[start] + 1, self.mask[end - 1] + 1):
+            items[ix].unsafe_to_break = True
 
     def move_item(self, src, dest):
         self.items[dest:dest] = [ self.items.pop(src) ]
@@ -251,9 +457,12 @@ class Buffer:
     def merge_clusters(self, start, end):
         pass  # XXX
 
-    def serialize(self, additional = None, position=True, names=True, ned=False):
+    def serialize(self, additional = None, position=True, names=True, ned=False, flags=False):
         """Serialize a buffer to a string.
 
+    If ``flags`` is true, glyphs which are unsafe to break before are
+    marked with ``#1``, as ``hb-shape --show-flags`` does.
+
     Returns:
         The contents of the given buffer in a string format similar to
         that used by ``hb-shape``.
@@ -292,6 +501,8 @@ class Buffer:
                         position.yPlacement or 0,
                     )
                 outs[-1] = outs[-1] + "+%i" % (position.xAdvance)
+            if flags and info.unsafe_to_break:
+                outs[-1] = outs[-1] + "#1"
             relevant = list(filter(lambda a: hasattr(info,a), additional))
             if relevant:
                 outs[-1] = outs[-1] + "(%s)" % ",".join(
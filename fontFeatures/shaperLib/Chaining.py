@@ -1,21 +1,17 @@
 def shaper_inputs(self):
     return self.input
 
-def __find_masked_ix(buf, ix):
-    # This probably could be done better...
-    for i in range(len(buf.items)):
-        if buf.mask[i] == ix: return i
-    return -1
-
 def _do_apply(self, buf, ix, namedclasses={}):
-    from fontFeatures import RoutineReference
+    from fontFeatures import RoutineReference, Substitution, Positioning, Chaining
     # Save buffer mask
     flags = buf.flags
     markFilteringSet = buf.markFilteringSet
+    markAttachmentSet = buf.markAttachmentSet
 
     if ix + len(self.lookups) -1 > len(buf.mask):
         return
 
+    self.mark_unsafe_to_break(buf, ix)
     old_unmasked_indexes = [ buf.mask[ix+i] for i in range(len(self.lookups)) ]
     for i,lookups in enumerate(self.lookups):
         if not lookups:
@@ -23,14 +19,22 @@ def _do_apply(self, buf, ix, namedclasses={}):
         for routine in lookups:
             assert isinstance(routine, RoutineReference)
             routine = routine.routine
-            # Adjust mask and recompute index?
             unmasked_ix = old_unmasked_indexes[i]
             for rule in routine.rules:
-                buf.set_mask(rule.flags, routine.markFilteringSet)
-                newix = __find_masked_ix(buf, unmasked_ix)
-                if rule.would_apply_at_position(buf,newix, namedclasses) and rule._do_apply(buf, newix):
+                if isinstance(rule, (Substitution, Positioning, Chaining)):
+                    # Check whether it applies without building its mask
+                    skippy = buf.skippy_iter(rule.flags, routine.markFilteringSet, routine.markAttachmentSet)
+                    if not rule.would_apply_at_unmasked(buf, unmasked_ix, skippy, namedclasses):
+                        continue
+                    buf.set_mask(rule.flags, routine.markFilteringSet, routine.markAttachmentSet)
+                    newix = buf.masked_index(unmasked_ix)
+                else:
+                    buf.set_mask(rule.flags, routine.markFilteringSet, routine.markAttachmentSet)
+                    newix = buf.masked_index(unmasked_ix)
+                    if newix is None or not rule.would_apply_at_position(buf, newix, namedclasses):
+                        continue
+                if rule._do_apply(buf, newix):
                     break
 
-    buf.set_mask(flags, markFilteringSet)
+    buf.set_mask(flags, markFilteringSet, markAttachmentSet)
     return len(self.input) - 1
-
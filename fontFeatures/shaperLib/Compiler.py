@@ -0,0 +1,305 @@
+"""Compiles routines into specialised Python code for the shaper.
+
+The interpreter in :py:mod:`fontFeatures.shaperLib.Routine` asks each
+generic rule object whether it applies at each position. For the common
+rule types - substitutions, positioning and the input/context matching
+of chaining rules - this module instead generates a matching function and
+an application function per rule, with the glyph sets as constants and
+the slot checks unrolled, and compiles them with ``compile()``. Rules it
+does not know how to specialise (attachments, and the application step
+of chaining rules) fall back to the interpreter.
+
+Use it by creating the shaper with
+``Shaper(ff, font, compile_routines=True)``.
+Compiled routines produce the same results as the interpreter, except
+that ``RuleTested`` trace events are not emitted.
+"""
+from copy import copy
+from fontFeatures.shaperLib.Rule import _expand_slot, _class_signature, _slot_refs
+from fontFeatures.shaperLib.Routine import _first_glyph_index
+from fontFeatures.shaperLib.Trace import RuleMatched
+
+
+def compile_routine(routine, namedclasses={}):
+    """Returns a :py:class:`CompiledRoutine` for the routine, compiling it
+    if it has not been compiled before or its rules have changed since.
+
+    As with the interpreter's caches, rules added or removed and changes
+    to named classes are noticed, but rules edited in place are not;
+    delete the routine's ``_compiled_routine`` attribute to recompile."""
+    cached = routine.__dict__.get("_compiled_routine")
+    if (
+        cached
+        and cached.rules is routine.rules
+        and cached.rule_count == len(routine.rules)
+        and cached.namedclasses is namedclasses
+        and cached.signature == _class_signature(namedclasses, cached.refs)
+    ):
+        return cached
+    compiled = CompiledRoutine(routine, namedclasses)
+    routine._compiled_routine = compiled
+    return compiled
+
+
+class _RuleSource:
+    # Builds the source of the matching and application functions for one
+    # rule, collecting the constants they refer to.
+
+    def __init__(self, k, rule, namedclasses, constants):
+        self.k = k
+        self.rule = rule
+        self.namedclasses = namedclasses
+        self.constants = constants
+        self.lines = []
+
+    def constant(self, name, value):
+        name = "%s_%i" % (name, self.k)
+        self.constants[name] = value
+        return name
+
+    def matcher(self):
+        r = self.rule
+        coverage = r.shaper_inputs()
+        inputs = r.compiled_slots("input", coverage, self.namedclasses)
+        pre = post = []
+        if getattr(r, "precontext", None):
+            pre = r.compiled_slots("precontext", r.precontext, self.namedclasses)
+        if getattr(r, "postcontext", None):
+            post = r.compiled_slots("postcontext", r.postcontext, self.namedclasses)
+        checks = []
+        for j, slot in enumerate(pre):
+            checks.append(("i - %i" % (len(pre) - j), slot))
+        for j, slot in enumerate(inputs):
+            checks.append(("i + %i" % j if j else "i", slot))
+        for j, slot in enumerate(post):
+            checks.append(("i + %i" % (len(inputs) + j), slot))
+        lines = [
+            "def match_%i(buf, items, mask, i):" % self.k,
+            "    if i < %i or i + %i > len(mask):" % (len(pre), len(inputs) + len(post)),
+            "        return False",
+        ]
+        for j, (position, slot) in enumerate(checks):
+            lines.append(
+                "    if items[mask[%s]].glyph not in %s:"
+                % (position, self.constant("S%i" % j, slot))
+            )
+            lines.append("        return False")
+        lines.append("    return True")
+        return lines
+
+    def unsafe_to_break(self):
+        r = self.rule
+        before = len(getattr(r, "precontext", None) or [])
+        after = len(r.shaper_inputs()) + len(getattr(r, "postcontext", None) or [])
+        if before + after < 2:
+            return []
+        return ["    buf.unsafe_to_break(i - %i, i + %i)" % (before, after)]
+
+    def single_substitution(self):
+        r = self.rule
+        replacements = _expand_slot(r.replacement[0], self.namedclasses)
+        lines = [
+            "def apply_%i(buf, i):" % self.k,
+            "    item = buf.items[buf.mask[i]]",
+        ] + self.unsafe_to_break()
+        if len(replacements) == 1:
+            lines.append("    item.glyph = %s" % self.constant("R", replacements[0]))
+        else:
+            mapping = {}
+            inputs = _expand_slot(r.input[0], self.namedclasses)
+            for g, replacement in zip(inputs, replacements):
+                mapping.setdefault(g, replacement)
+            lines.append("    item.glyph = %s[item.glyph]" % self.constant("M", mapping))
+        lines.extend([
+            "    item.prep_glyph(buf.font)",
+            "    buf.mark_changed(i)",
+        ])
+        return lines
+
+    def substitution(self):
+        r = self.rule
+        input_count, replacement_count = len(r.input), len(r.replacement)
+        lines = [
+            "def apply_%i(buf, i):" % self.k,
+        ] + self.unsafe_to_break() + [
+            "    template = buf[i]",
+            "    new = []",
+        ]
+        for g in r.replacement:
+            lines.extend([
+                "    g = copy(template)",
+                "    g.glyph = %r" % g[0],
+                "    g.prep_glyph(buf.font)",
+                "    g.substituted = True",
+            ])
+            if replacement_count > 1 and input_count == 1:
+                lines.append("    g.multiplied = True")
+            if replacement_count == 1 and input_count > 1:
+                lines.append("    g.ligated = True")
+            lines.append("    new.append(g)")
+        lines.append("    buf[i : i + %i] = new" % input_count)
+        if replacement_count > 1:
+            lines.append("    return %i" % (replacement_count - 1))
+        return lines
+
+    def positioning(self):
+        r = self.rule
+        lines = [
+            "def apply_%i(buf, i):" % self.k,
+        ] + self.unsafe_to_break() + [
+            "    items = buf.items",
+            "    mask = buf.mask",
+        ]
+        for j, vr in enumerate(r.valuerecords[: len(r.glyphs)]):
+            lines.append(
+                "    items[mask[i + %i]].add_position(%s)"
+                % (j, self.constant("V%i" % j, vr))
+            )
+        if r.valuerecords[-1]:
+            lines.append("    return %i" % (len(r.glyphs) - 1))
+        return lines
+
+
+class CompiledRoutine:
+    """A routine compiled to Python code. See the module documentation.
+
+    Attributes:
+        routine: The routine this was compiled from.
+        source: The generated Python source.
+    """
+
+    def __init__(self, routine, namedclasses={}):
+        from fontFeatures import Substitution, Positioning, Chaining
+
+        self.routine = routine
+        self.rules = routine.rules
+        self.rule_count = len(routine.rules)
+        self.namedclasses = namedclasses
+        self.refs = set()
+        for r in routine.rules:
+            self.refs |= _slot_refs(r)
+        self.signature = _class_signature(namedclasses, self.refs)
+
+        constants = {"copy": copy}
+        source = []
+        specialised = []
+        for k, r in enumerate(routine.rules):
+            builder = _RuleSource(k, r, namedclasses, constants)
+            match = apply = False
+            if isinstance(r, (Substitution, Positioning, Chaining)) and r.shaper_inputs():
+                source.extend(builder.matcher())
+                match = True
+            if isinstance(r, Substitution) and r.replacement:
+                if len(r.input) == 1 and len(r.replacement) == 1:
+                    source.extend(builder.single_substitution())
+                else:
+                    source.extend(builder.substitution())
+                apply = True
+            elif isinstance(r, Positioning) and r.glyphs and r.valuerecords:
+                source.extend(builder.positioning())
+                apply = True
+            specialised.append((match, apply))
+        self.source = "\n".join(source) + "\n"
+        exec(compile(self.source, "<routine %s>" % routine.name, "exec"), constants)
+
+        entries = {}
+        for k, r in enumerate(routine.rules):
+            match, apply = specialised[k]
+            entries[id(r)] = (
+                r,
+                r.stage,
+                r.flags,
+                constants["match_%i" % k] if match else self._interpreted_match(r),
+                constants["apply_%i" % k] if apply else self._interpreted_apply(r),
+            )
+        self.entries = [entries[id(r)] for r in routine.rules]
+
+        # If all rules share their flags, dispatch on the first glyph as
+        # the interpreter does
+        self.index = self.anywhere = None
+        if len(set(r.flags for r in routine.rules)) == 1:
+            index, anywhere = _first_glyph_index(routine, namedclasses)
+            self.index = {
+                g: [entries[id(r)] for r in rules] for g, rules in index.items()
+            }
+            self.anywhere = [entries[id(r)] for r in anywhere]
+
+    def _interpreted_match(self, rule):
+        namedclasses = self.namedclasses
+
+        def match(buf, items, mask, i):
+            return rule.would_apply_at_position(buf, i, namedclasses=namedclasses)
+
+        return match
+
+    def _interpreted_apply(self, rule):
+        namedclasses = self.namedclasses
+
+        def apply(buf, i):
+            return rule._do_apply(buf, i, namedclasses=namedclasses)
+
+        return apply
+
+    def apply_to_buffer(self, buf, stage=None, feature=None):
+        """Applies the routine to the buffer, as ``Routine.apply_to_buffer``
+        does."""
+        routine = self.routine
+        buf.clear_mask_cache()
+        buf.set_mask(routine.flags, routine.markFilteringSet, routine.markAttachmentSet)
+        if feature:
+            buf.set_feature_mask(feature)
+        if self.index is not None:
+            return self._apply_dispatched(buf, stage)
+        stats = buf.profile
+        i = 0
+        while i < len(buf):
+            if stats:
+                stats.positions += 1
+            for r, rule_stage, flags, match, apply in self.entries:
+                if stage and rule_stage != stage:
+                    continue
+                if stats:
+                    stats.rules_tested += 1
+                buf.set_mask(flags, routine.markFilteringSet, routine.markAttachmentSet)
+                if match(buf, buf.items, buf.mask, i):
+                    if stats:
+                        stats.rules_matched += 1
+                    if buf.trace:
+                        buf.trace(RuleMatched(r, i))
+                    delta = apply(buf, i)
+                    buf.update()
+                    if delta:
+                        i = i + delta
+                    break
+            i = i + 1
+
+    def _apply_dispatched(self, buf, stage):
+        routine = self.routine
+        index, anywhere = self.index, self.anywhere
+        mask = (self.entries[0][2], routine.markFilteringSet, routine.markAttachmentSet)
+        buf.set_mask(*mask)
+        stats = buf.profile
+        i = 0
+        while i < len(buf.mask):
+            if stats:
+                stats.positions += 1
+            items = buf.items
+            for r, rule_stage, flags, match, apply in index.get(items[buf.mask[i]].glyph, anywhere):
+                if stage and rule_stage != stage:
+                    continue
+                if stats:
+                    stats.rules_tested += 1
+                if match(buf, items, buf.mask, i):
+                    if stats:
+                        stats.rules_matched += 1
+                    if buf.trace:
+                        buf.trace(RuleMatched(r, i))
+                    delta = apply(buf, i)
+                    buf.update()
+                    if (buf.flags, buf.markFilteringSet, buf.markAttachmentSet) != mask:
+                        # A chained lookup left its own mask behind
+                        buf.set_mask(*mask)
+                    if delta:
+                        i = i + delta
+                    break
+            i = i + 1
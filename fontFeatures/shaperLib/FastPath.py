@@ -0,0 +1,380 @@
+"""Vectorised application of simple routines to array-backed buffers.
+
+Many routines are nothing more than one-to-one substitutions (``smcp``,
+``onum``, ``locl``), context-free single or pair positioning, or kerning
+matrices. When a routine is like that, its effect on an
+:py:class:`ArrayBuffer` can be worked out for the whole glyph stream at
+once: a glyph-ID to glyph-ID table for substitutions, and glyph-ID (or
+glyph-ID pair, or class pair) to adjustment tables for positioning,
+applied with NumPy to the buffer's columns at the positions left visible
+by the lookup flags and feature mask.
+
+The shaper does this automatically for array-backed buffers when NumPy is
+installed and tracing is off; otherwise routines are applied as usual.
+The results are the same as the interpreter's.
+"""
+from fontFeatures.glyphInfoCache import GlyphInfoCache
+from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer, _PREPARED, _UNSAFE_TO_BREAK, _category_codes, _categories
+from fontFeatures.shaperLib.Rule import _expand_slot, _class_signature, _slot_refs
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Flags which make visibility depend on a glyph's category or mark sets
+_CATEGORY_FLAGS = 0x2 | 0x4 | 0x8 | 0x10 | 0xFF00
+
+# Pair positioning tables larger than this aren't worth building
+MAX_PAIRS = 1000000
+
+
+class _Unsuitable(Exception):
+    pass
+
+
+def fast_path_for(routine, buf, namedclasses={}):
+    """Returns a table which applies the routine to the buffer in one step,
+    or None if the routine (or buffer) does not qualify.
+
+    The table is kept on the routine, and rebuilt under the same
+    conditions as the routine's other caches, or when the font's
+    :py:class:`GlyphInfoCache` is invalidated."""
+    if numpy is None or not isinstance(buf, ArrayBuffer):
+        return None
+    info = GlyphInfoCache.for_font(buf.font)
+    cached = routine.__dict__.get("_fast_path")
+    if (
+        cached
+        and cached[0] is routine.rules
+        and cached[1] == len(routine.rules)
+        and cached[2] is namedclasses
+        and cached[3] is info
+        and cached[5] == _class_signature(namedclasses, cached[4])
+    ):
+        return cached[6]
+    refs = set()
+    for r in routine.rules:
+        refs |= _slot_refs(r)
+    try:
+        table = _build(routine, info, namedclasses)
+    except _Unsuitable:
+        table = None
+    routine._fast_path = (
+        routine.rules,
+        len(routine.rules),
+        namedclasses,
+        info,
+        refs,
+        _class_signature(namedclasses, refs),
+        table,
+    )
+    return table
+
+
+def apply_fast_path(routine, buf, stage=None, feature=None, namedclasses={}):
+    """Applies the routine to the buffer as ``Routine.apply_to_buffer``
+    would, if it can be done in one step. Returns False, having changed
+    nothing, if not."""
+    if buf.trace:
+        return False
+    table = fast_path_for(routine, buf, namedclasses)
+    if table is None:
+        return False
+    return table.apply(buf, stage, feature)
+
+
+def _build(routine, info, namedclasses):
+    from fontFeatures import Substitution, Positioning, PairKerning
+
+    rules = routine.rules
+    if not rules or len(set(r.flags for r in rules)) != 1:
+        raise _Unsuitable
+    if all(isinstance(r, PairKerning) for r in rules):
+        return _PairKerning(routine, info, namedclasses)
+    for r in rules:
+        if getattr(r, "precontext", None) or getattr(r, "postcontext", None):
+            raise _Unsuitable
+    if all(isinstance(r, Substitution) for r in rules):
+        return _SingleSubstitution(routine, info, namedclasses)
+    if all(isinstance(r, Positioning) for r in rules):
+        if all(len(r.glyphs) == 1 for r in rules):
+            return _SinglePositioning(routine, info, namedclasses)
+        if all(len(r.glyphs) == 2 for r in rules):
+            return _PairPositioning(routine, info, namedclasses)
+    raise _Unsuitable
+
+
+def _column(array):
+    return numpy.frombuffer(array, dtype=array.typecode)
+
+
+def _deltas(vr):
+    from fontFeatures import ValueRecord
+
+    if not isinstance(vr, ValueRecord):
+        raise _Unsuitable
+    values = [vr.xPlacement, vr.yPlacement, vr.xAdvance, vr.yAdvance]
+    if not all(v is None or isinstance(v, int) for v in values):
+        raise _Unsuitable  # Variable values
+    return [v or 0 for v in values]
+
+
+class _Table:
+    stage = None
+
+    def __init__(self, routine, info, namedclasses):
+        self.routine = routine
+        self.flags = routine.rules[0].flags
+        self.glyph_count = len(info.glyph_ids)
+
+    def gids(self, info, glyphs):
+        gids = [info.gid(g) for g in glyphs]
+        if -1 in gids:
+            raise _Unsuitable
+        return gids
+
+    def apply(self, buf, stage, feature):
+        routine = self.routine
+        buf.clear_mask_cache()
+        buf.set_mask(self.flags, routine.markFilteringSet, routine.markAttachmentSet)
+        if feature:
+            buf.set_feature_mask(feature)
+        if stage and stage != self.stage:
+            return True
+        rows = _column(buf._order)[numpy.asarray(buf.mask, dtype=numpy.intp)]
+        gids = _column(buf._gid)[rows]
+        if (gids < 0).any() or not (_column(buf._flags)[rows] & _PREPARED).all():
+            return False
+        if buf._positions:
+            return False  # Some positions are not integers
+        matched = self.apply_rows(buf, rows, gids)
+        if matched is False:
+            return False
+        stats = buf.profile
+        if stats:
+            stats.positions += len(rows)
+            stats.rules_tested += matched
+            stats.rules_matched += matched
+        return True
+
+
+class _SingleSubstitution(_Table):
+    stage = "sub"
+
+    def __init__(self, routine, info, namedclasses):
+        super().__init__(routine, info, namedclasses)
+        mapping = {}
+        for r in routine.rules:
+            if len(r.input) != 1 or len(r.replacement) != 1:
+                raise _Unsuitable
+            inputs = _expand_slot(r.input[0], namedclasses)
+            replacements = _expand_slot(r.replacement[0], namedclasses)
+            if len(replacements) == 1:
+                replacements = replacements * len(inputs)
+            elif len(replacements) != len(inputs):
+                raise _Unsuitable
+            for g, replacement in zip(inputs, replacements):
+                if info.gid(g) != -1:
+                    mapping.setdefault(g, replacement)
+
+        sources = self.gids(info, mapping.keys())
+        targets = self.gids(info, mapping.values())
+        self.names = info.glyph_names
+        self.covered = numpy.zeros(self.glyph_count, dtype=bool)
+        self.covered[sources] = True
+        self.target = numpy.arange(self.glyph_count)
+        self.target[sources] = targets
+
+        # What prep_glyph would give the replacement glyphs
+        self.widths = numpy.zeros(self.glyph_count, dtype=numpy.int64)
+        self.categories = numpy.zeros(self.glyph_count, dtype=numpy.uint8)
+        for gid in set(targets):
+            name = self.names[gid]
+            try:
+                width = info.width(name)
+                category = info.category(name) or "unknown"
+            except Exception:
+                raise _Unsuitable
+            if not isinstance(width, int):
+                raise _Unsuitable
+            if category not in _category_codes:
+                _category_codes[category] = len(_categories)
+                _categories.append(category)
+            self.widths[gid] = width
+            self.categories[gid] = _category_codes[category]
+
+        # Substituting a glyph mustn't change whether the lookup sees it
+        self.check_categories = bool(self.flags & _CATEGORY_FLAGS)
+        for glyphset, bits in [
+            (routine.markFilteringSet, 0x10),
+            (routine.markAttachmentSet, 0xFF00),
+        ]:
+            if not self.flags & bits:
+                continue
+            glyphset = glyphset or []
+            for g, replacement in mapping.items():
+                if (g in glyphset) != (replacement in glyphset):
+                    raise _Unsuitable
+
+    def apply_rows(self, buf, rows, gids):
+        hit = self.covered[gids]
+        rows, new = rows[hit], self.target[gids[hit]]
+        if not len(rows):
+            return 0
+        category = _column(buf._category)
+        categories = self.categories[new]
+        changed = category[rows] != categories
+        if self.check_categories and changed.any():
+            return False
+        _column(buf._gid)[rows] = new
+        category[rows] = categories
+        flags = _column(buf._flags)
+        flags[rows] = (flags[rows] & _UNSAFE_TO_BREAK) | _PREPARED
+        _column(buf._x_placement)[rows] = 0
+        _column(buf._y_placement)[rows] = 0
+        _column(buf._x_advance)[rows] = self.widths[new]
+        _column(buf._y_advance)[rows] = 0
+        if buf._glyph_digest is not None:
+            buf._glyph_digest.update(self.names[g] for g in numpy.unique(new))
+        if changed.any():
+            buf.recompute_mask()
+        return len(rows)
+
+
+class _SinglePositioning(_Table):
+    stage = "pos"
+
+    def __init__(self, routine, info, namedclasses):
+        super().__init__(routine, info, namedclasses)
+        self.covered = numpy.zeros(self.glyph_count, dtype=bool)
+        self.deltas = numpy.zeros((4, self.glyph_count), dtype=numpy.int64)
+        for r in routine.rules:
+            if not r.valuerecords:
+                raise _Unsuitable
+            deltas = _deltas(r.valuerecords[0])
+            gids = [
+                gid
+                for gid in self.gids(info, _expand_slot(r.glyphs[0], namedclasses))
+                if not self.covered[gid]
+            ]
+            self.covered[gids] = True
+            for k in range(4):
+                self.deltas[k, gids] = deltas[k]
+
+    def apply_rows(self, buf, rows, gids):
+        hit = self.covered[gids]
+        rows, gids = rows[hit], gids[hit]
+        _add_deltas(buf, rows, self.deltas[:, gids])
+        return len(rows)
+
+
+class _PairPositioning(_Table):
+    stage = "pos"
+
+    def __init__(self, routine, info, namedclasses):
+        super().__init__(routine, info, namedclasses)
+        pairs = {}
+        for r in routine.rules:
+            # With a second value record, the interpreter skips the second
+            # glyph, so pairs would overlap; leave those to it.
+            if len(r.valuerecords) != 2 or r.valuerecords[1]:
+                raise _Unsuitable
+            _deltas(r.valuerecords[1])  # (It must at least be a ValueRecord)
+            deltas = _deltas(r.valuerecords[0])
+            left = self.gids(info, _expand_slot(r.glyphs[0], namedclasses))
+            right = self.gids(info, _expand_slot(r.glyphs[1], namedclasses))
+            if len(pairs) + len(left) * len(right) > MAX_PAIRS:
+                raise _Unsuitable
+            for l in left:
+                for g in right:
+                    pairs.setdefault(l * self.glyph_count + g, deltas)
+        self.keys = numpy.array(sorted(pairs), dtype=numpy.int64)
+        self.deltas = numpy.array(
+            [pairs[key] for key in self.keys.tolist()], dtype=numpy.int64
+        ).reshape(-1, 4).T
+
+    def apply_rows(self, buf, rows, gids):
+        if len(rows) < 2 or not len(self.keys):
+            return 0
+        keys = gids[:-1] * self.glyph_count + gids[1:]
+        found = numpy.searchsorted(self.keys, keys)
+        found[found == len(self.keys)] = 0
+        hit = self.keys[found] == keys
+        _add_deltas(buf, rows[:-1][hit], self.deltas[:, found[hit]])
+        _unsafe_to_break_pairs(buf, hit)
+        return int(hit.sum())
+
+
+class _PairKerning(_Table):
+    stage = "pos"
+
+    def __init__(self, routine, info, namedclasses):
+        super().__init__(routine, info, namedclasses)
+        self.matrices = []
+        for r in routine.rules:
+            columns = len(r.matrix[0]) if r.matrix else 0
+            if any(len(row) != columns for row in r.matrix):
+                raise _Unsuitable
+            first = self.classes(info, r.first_classes, len(r.matrix))
+            second = self.classes(info, r.second_classes, columns)
+            present = numpy.zeros((len(r.matrix), columns), dtype=bool)
+            deltas = numpy.zeros((4, len(r.matrix), columns), dtype=numpy.int64)
+            for c1, row in enumerate(r.matrix):
+                for c2, values in enumerate(row):
+                    if values is None:
+                        continue
+                    vr1, vr2 = values
+                    if vr2:
+                        raise _Unsuitable  # The second glyph is skipped
+                    present[c1, c2] = True
+                    if vr1:
+                        deltas[:, c1, c2] = _deltas(vr1)
+            self.matrices.append((first, second, present, deltas))
+
+    def classes(self, info, classes, count):
+        # Class of each glyph ID, or -1 for glyphs not in any class
+        array = numpy.full(self.glyph_count, -1, dtype=numpy.intp)
+        for g, c in classes.items():
+            if c >= count:
+                raise _Unsuitable
+            gid = info.gid(g)
+            if gid != -1:
+                array[gid] = c
+        return array
+
+    def apply_rows(self, buf, rows, gids):
+        if len(rows) < 2:
+            return 0
+        left, right, rows = gids[:-1], gids[1:], rows[:-1]
+        todo = numpy.ones(len(left), dtype=bool)
+        for first, second, present, deltas in self.matrices:
+            c1, c2 = first[left], second[right]
+            hit = todo & (c1 >= 0) & (c2 >= 0)
+            hit[hit] = present[c1[hit], c2[hit]]
+            _add_deltas(buf, rows[hit], deltas[:, c1[hit], c2[hit]])
+            _unsafe_to_break_pairs(buf, hit)
+            todo &= ~hit
+        return int(len(todo) - todo.sum())
+
+
+def _add_deltas(buf, rows, deltas):
+    for k, column in enumerate(
+        [buf._x_placement, buf._y_placement, buf._x_advance, buf._y_advance]
+    ):
+        _column(column)[rows] += deltas[k]
+
+
+def _unsafe_to_break_pairs(buf, hit):
+    # Each hit is a pair of glyphs at masked positions k and k + 1; flag
+    # everything after the first of them, up to the second
+    if not hit.any():
+        return
+    mask = numpy.asarray(buf.mask, dtype=numpy.intp)
+    first, second = mask[:-1][hit] + 1, mask[1:][hit]
+    order, flags = _column(buf._order), _column(buf._flags)
+    if (first == second).all():
+        flags[order[second]] |= _UNSAFE_TO_BREAK
+        return
+    for start, end in zip(first.tolist(), second.tolist()):
+        flags[order[start : end + 1]] |= _UNSAFE_TO_BREAK
@@ -1,4 +1,4 @@
-from youseedee import ucd_data
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, GENERAL_CATEGORY
 from .BaseShaper import BaseShaper
 import re
 from fontFeatures.shaperLib.Buffer import BufferItem
@@ -21,6 +21,13 @@ class IndicShaper(SyllabicShaper):
     def override_features(self, shaper):
         shaper.disable_feature("liga")
 
+    def consonant_position(self, consonant):
+        # Looked up once per consonant for each shape plan
+        positions = self.plan.shape_plan.cache.setdefault("consonant_positions", {})
+        if consonant not in positions:
+            positions[consonant] = self.consonant_position_from_face(consonant)
+        return positions[consonant]
+
     def consonant_position_from_face(self, consonant):
         virama = self.config["virama"]
         consonant_item = BufferItem.new_unicode(consonant)
@@ -52,7 +59,7 @@ class IndicShaper(SyllabicShaper):
         if self.config["base_pos"] == "last": # Not Sinhala
             for item in self.buffer.items:
                 if item.syllabic_position == IndicPosition.BASE_C:
-                    item.syllabic_position = self.consonant_position_from_face(item.codepoint)
+                    item.syllabic_position = self.consonant_position(item.codepoint)
                     pass
 
     def reassign_category(self, item):
@@ -347,7 +354,7 @@ class IndicShaper(SyllabicShaper):
         for i in range(start,end):
             self.buffer.items[i].feature_masks["init"] = True
         if pos(start) == IndicPosition.PRE_M:
-            if start == 0 or ucd_data(self.buffer.font.codepointForGlyph(self.buffer.items[start-1].glyph))["General_Category"] not in ["Cf", "Cn", "Co", "Cs", "Ll", "Lm", "Lo", "Lt", "Lu", "Mc", "Me", "Mn"]:
+            if start == 0 or unicode_properties(self.buffer.font.codepointForGlyph(self.buffer.items[start-1].glyph))[GENERAL_CATEGORY] not in ["Cf", "Cn", "Co", "Cs", "Ll", "Lm", "Lo", "Lt", "Lu", "Mc", "Me", "Mn"]:
                 self.buffer.items[start].feature_masks["init"] = False
 
 
@@ -378,7 +385,7 @@ class IndicShaper(SyllabicShaper):
             b = newunicodes[ix+1]
             s = chr(a) + chr(b)
             composed = unicodedata.normalize("NFC", s)
-            if ucd_data(a)["General_Category"][0] == "M":
+            if (unicode_properties(a)[GENERAL_CATEGORY] or "Cn")[0] == "M":
                 newstring = newstring + chr(a)
                 ix = ix + 1
                 continue
@@ -1,7 +1,7 @@
 from collections import OrderedDict
 from enum import IntEnum
 import re
-from youseedee import ucd_data
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, SCRIPT
 
 
 script_config = {
@@ -88,14 +88,8 @@ states = OrderedDict(
     broken_cluster = "reph? n? complex_syllable_tail",
 )
 
-def make_syllable_machine(states, additional_categories=[]):
-    categories = set(syllabic_category_map.values()) | set(additional_categories)
-    syllable_machine = {}
-    tail = r'\([^\)]+\)=\d+'
-    for value in categories:
-        syllable_machine[value] = f'<{value}>' + tail
-    syllable_machine["other"] = r'<[^\>]+>' + tail
-
+def _expand_states(states, atoms):
+    syllable_machine = dict(atoms)
     for category,definition in states.items():
         # Recursively replace any known states with their definitions:
         states = "\\b("+"|".join(sorted(syllable_machine.keys(),key=len, reverse=True))+")\\b"
@@ -104,6 +98,71 @@ def make_syllable_machine(states, additional_categories=[]):
         syllable_machine[category] = definition
     return syllable_machine
 
+class SyllableMachine(dict):
+    """The regular expressions for each syllable type of a script.
+
+    As a dictionary, this maps syllable types (and categories) to patterns
+    over a serialized string of items like ``<C>(x)=12``. For segmenting a
+    buffer, the same states are also expanded over a compact string with
+    one character per item, and the patterns for the syllable types are
+    combined into a single regular expression, so that each syllable is
+    found with one match."""
+
+    def __init__(self, states, categories):
+        tail = r'\([^\)]+\)=\d+'
+        atoms = {value: f'<{value}>' + tail for value in categories}
+        atoms["other"] = r'<[^\>]+>' + tail
+        super().__init__(_expand_states(states, atoms))
+
+        # Categories not in the machine are only matched by "other"
+        self.codes = {value: chr(0x100 + i) for i, value in enumerate(sorted(categories))}
+        self.unknown = chr(0xFF)
+        atoms = {value: re.escape(code) for value, code in self.codes.items()}
+        atoms["other"] = "."
+        self.compact = _expand_states(states, atoms)
+        self._segmenters = {}
+
+    def _segmenter(self, syllable_types):
+        # The combined expression, and for each syllable type the combined
+        # expression for the types after it, to carry on with when that
+        # type matches the empty string
+        syllable_types = tuple(syllable_types)
+        segmenter = self._segmenters.get(syllable_types)
+        if segmenter is None:
+            alternatives = [
+                f"(?P<{syllable_type}>{self.compact[syllable_type]})"
+                for syllable_type in syllable_types
+            ]
+            combined = [re.compile("|".join(alternatives[i:])) for i in range(len(alternatives))]
+            following = dict(zip(syllable_types, combined[1:]))
+            segmenter = (combined[0], following)
+            self._segmenters[syllable_types] = segmenter
+        return segmenter
+
+    def segment(self, categories, syllable_types):
+        """Splits a sequence of syllabic categories into syllables.
+
+        Yields a ``(syllable_type, start, end)`` tuple for each syllable,
+        where ``end`` is exclusive. At each position the first of
+        ``syllable_types`` with a non-empty match is used."""
+        combined, following = self._segmenter(syllable_types)
+        codes, unknown = self.codes, self.unknown
+        string = "".join([codes.get(c, unknown) for c in categories])
+        position = 0
+        while position < len(string):
+            m = combined.match(string, position)
+            while m and m.end() == position:
+                # Matched nothing; carry on with the types after this one
+                rest = following.get(m.lastgroup)
+                m = rest.match(string, position) if rest else None
+            assert(m)
+            yield m.lastgroup, position, m.end()
+            position = m.end()
+
+def make_syllable_machine(states, additional_categories=[]):
+    categories = set(syllabic_category_map.values()) | set(additional_categories)
+    return SyllableMachine(states, categories)
+
 syllable_machine_indic = make_syllable_machine(states)
 
 class IndicPosition(IntEnum):
@@ -194,7 +253,7 @@ matra_pos_bottom = {
 }
 
 def set_matra_position(item):
-    script = ucd_data(item.codepoint)["Script"]
+    script = unicode_properties(item.codepoint)[SCRIPT]
     u = item.codepoint
     if item.syllabic_position == IndicPosition.PRE_C:
         selector = matra_pos_left
@@ -0,0 +1,100 @@
+"""Splitting text into runs of one script and direction.
+
+A buffer is shaped with a single script and direction: left to itself,
+:py:meth:`Buffer.guess_segment_properties` uses the first script it finds
+in the text for all of it. Text which mixes scripts needs to be split
+into runs first, so that each run is shaped with the right complex
+shaper::
+
+    for run in itemize("Hello مرحبا नमस्ते"):
+        print(run.start, run.end, run.script, run.direction)
+
+Characters of the Common and Inherited scripts (spaces, punctuation,
+digits, combining marks) belong to the run of the character before them;
+at the start of the text, to the run of the first character after them
+which has a script. Directions are worked out in the same way from the
+characters' bidirectional classes: strong left-to-right characters start
+left-to-right runs, strong right-to-left characters (Hebrew, Arabic and
+so on) start right-to-left runs, and the others follow their neighbours.
+This is not the full Unicode Bidirectional Algorithm - there are no
+embedding levels, and runs are given in logical order - but it is enough
+to shape each run correctly.
+
+:py:meth:`Shaper.shape_runs` shapes the runs one at a time as they are
+found.
+"""
+import unicodedata
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, SCRIPT
+
+_NEUTRAL_SCRIPTS = set([None, "Common", "Inherited", "Unknown"])
+_STRONG_DIRECTIONS = {"L": "LTR", "R": "RTL", "AL": "RTL"}
+
+
+class Run:
+    """A piece of text in one script and direction.
+
+    Attributes:
+        text: The text of the run.
+        start: The offset of its first character in the text itemized.
+        script: Its script, as a Unicode script name (e.g. ``"Arabic"``),
+            or None if none of its characters belong to a particular
+            script.
+        direction: ``"LTR"`` or ``"RTL"``.
+    """
+
+    def __init__(self, text, start, script, direction):
+        self.text = text
+        self.start = start
+        self.script = script
+        self.direction = direction
+
+    @property
+    def end(self):
+        """The offset after its last character."""
+        return self.start + len(self.text)
+
+    def __repr__(self):
+        return "Run(%i-%i, %s, %s)" % (self.start, self.end, self.script, self.direction)
+
+
+def itemize(text):
+    """Splits text into runs of one script and direction, yielding
+    :py:class:`Run` objects in order.
+
+    The text may also be an iterable of strings, such as the lines of a
+    file. These are itemized one by one, so only one of them needs to be
+    in memory at a time, and no run spans two of them. Offsets count from
+    the start of the first string."""
+    if isinstance(text, str):
+        text = [text]
+    offset = 0
+    for string in text:
+        yield from _itemize_string(string, offset)
+        offset += len(string)
+
+
+def _itemize_string(text, offset):
+    start = 0
+    script = direction = None
+    for ix, char in enumerate(text):
+        char_script = unicode_properties(ord(char))[SCRIPT]
+        if char_script in _NEUTRAL_SCRIPTS:
+            char_script = None
+        char_direction = _STRONG_DIRECTIONS.get(unicodedata.bidirectional(char))
+        if (char_script and script and char_script != script) or (
+            char_direction and direction and char_direction != direction
+        ):
+            yield _run(text[start:ix], offset + start, script, direction)
+            start = ix
+        script = char_script or script
+        direction = char_direction or direction
+    if text:
+        yield _run(text[start:], offset + start, script, direction)
+
+
+def _run(text, start, script, direction):
+    if not direction:
+        # Nothing strong in it (e.g. only digits and punctuation)
+        from fontFeatures.shaperLib.Shaper import _script_direction
+        direction = _script_direction(script)
+    return Run(text, start, script, direction)
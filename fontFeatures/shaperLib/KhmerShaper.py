@@ -1,7 +1,7 @@
 from .IndicShaperData import IndicPosition, make_syllable_machine, syllabic_category_map
 from .SyllabicShaper import SyllabicShaper
 import unicodedata
-from youseedee import ucd_data
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, GENERAL_CATEGORY
 from collections import OrderedDict
 
 
@@ -131,7 +131,7 @@ class KhmerShaper(SyllabicShaper):
             b = newunicodes[ix+1]
             s = chr(a) + chr(b)
             composed = unicodedata.normalize("NFC", s)
-            if ucd_data(a)["General_Category"][0] == "M":
+            if (unicode_properties(a)[GENERAL_CATEGORY] or "Cn")[0] == "M":
                 newstring = newstring + chr(a)
                 ix = ix + 1
                 continue
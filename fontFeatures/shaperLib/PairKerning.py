@@ -0,0 +1,39 @@
+from fontFeatures.shaperLib.Trace import RuleTested
+
+
+def shaper_inputs(self):
+    return [self.first_classes.keys(), self.second_classes.keys()]
+
+
+def _values_at(self, buf, ix):
+    if ix + 1 >= len(buf):
+        return None
+    c1 = self.first_classes.get(buf[ix].glyph)
+    if c1 is None:
+        return None
+    c2 = self.second_classes.get(buf[ix + 1].glyph)
+    if c2 is None:
+        return None
+    return self.matrix[c1][c2]
+
+
+def would_apply_at_position(self, buf, ix, namedclasses={}):
+    values = _values_at(self, buf, ix)
+    if buf.trace:
+        if values is None:
+            buf.trace(RuleTested(self, ix, False, "there is no kerning pair here"))
+        else:
+            buf.trace(RuleTested(self, ix, True, "%s/%s is a kerning pair", buf[ix].glyph, buf[ix + 1].glyph))
+    return values is not None
+
+
+def _do_apply(self, buf, ix, namedclasses={}):
+    vr1, vr2 = _values_at(self, buf, ix)
+    buf.unsafe_to_break(ix, ix + 2)
+    if vr1:
+        buf[ix].add_position(vr1)
+    if vr2:
+        buf[ix + 1].add_position(vr2)
+    if not vr2:
+        return
+    return 1
@@ -3,6 +3,7 @@ def shaper_inputs(self):
 
 
 def _do_apply(self, buf, ix, namedclasses={}):
+    self.mark_unsafe_to_break(buf, ix)
     coverage = buf[ix : ix + len(self.glyphs)]
     for glyph, vr in zip(coverage, self.valuerecords):
     	glyph.add_position(vr)
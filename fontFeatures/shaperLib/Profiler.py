@@ -0,0 +1,76 @@
+"""Per-routine profiling for the shaper.
+
+Create a shaper with ``Shaper(ff, font, profile=True)`` and, after
+shaping, look at ``shaper.profiler.report()`` to see which routines the
+time went on. Counts from lookups called by chaining rules are included
+in the chaining routine's figures.
+"""
+import json
+import time
+
+
+class RoutineStats:
+    """Counters for one routine applied as part of one feature."""
+
+    __slots__ = ["routine", "feature", "calls", "time", "positions", "rules_tested", "rules_matched", "growth", "_started", "_length"]
+
+    def __init__(self, routine, feature):
+        self.routine = routine
+        self.feature = feature
+        self.calls = 0
+        self.time = 0.0
+        self.positions = 0
+        self.rules_tested = 0
+        self.rules_matched = 0
+        self.growth = 0
+
+    def asDict(self):
+        return {
+            "routine": self.routine.name,
+            "feature": self.feature,
+            "calls": self.calls,
+            "time": self.time,
+            "positions": self.positions,
+            "rules_tested": self.rules_tested,
+            "rules_matched": self.rules_matched,
+            "growth": self.growth,
+        }
+
+
+class Profiler:
+    """Collects :py:class:`RoutineStats` over any number of shaping runs."""
+
+    def __init__(self):
+        self.stats = {}
+
+    def reset(self):
+        self.stats = {}
+
+    def start(self, routine, feature, buf):
+        """Called before a routine is applied to a buffer."""
+        key = (id(routine), feature)
+        if key not in self.stats:
+            self.stats[key] = RoutineStats(routine, feature)
+        stats = self.stats[key]
+        stats.calls += 1
+        stats._length = len(buf.items)
+        buf.profile = stats
+        stats._started = time.perf_counter()
+        return stats
+
+    def stop(self, stats, buf):
+        """Called after a routine has been applied to a buffer."""
+        stats.time += time.perf_counter() - stats._started
+        stats.growth += len(buf.items) - stats._length
+        buf.profile = None
+
+    def report(self):
+        """Returns a list of dictionaries, one for each routine and feature,
+        slowest first. Times are in seconds; ``growth`` is the number of
+        glyphs the routine added to (or, if negative, removed from) the
+        buffer."""
+        stats = sorted(self.stats.values(), key=lambda s: -s.time)
+        return [s.asDict() for s in stats]
+
+    def asJSON(self):
+        return json.dumps(self.report(), indent=2)
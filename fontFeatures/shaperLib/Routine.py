@@ -1,23 +1,267 @@
-import logging
+from fontFeatures.shaperLib.Trace import RuleMatched
 
-__all__ = ["apply_to_buffer"]
+__all__ = ["apply_to_buffer", "could_apply"]
+
+
+def _first_glyph_index(self, namedclasses={}):
+    """Returns a mapping of glyph name to the rules which could start
+    matching on that glyph, plus a list of rules which could start
+    anywhere. Both are kept in rule order.
+
+    The index is rebuilt when rules are added or removed or when a named
+    class used in a first slot changes. Rules edited in place are not
+    noticed; delete the routine's ``_first_glyph_index`` attribute to
+    force a rebuild."""
+    from fontFeatures import Substitution, Positioning, PairKerning, Chaining
+    from fontFeatures.shaperLib.Rule import _class_signature
+
+    cached = self.__dict__.get("_first_glyph_index")
+    if (
+        cached
+        and cached[0] is self.rules
+        and cached[1] == len(self.rules)
+        and cached[2] is namedclasses
+        and cached[4] == _class_signature(namedclasses, cached[3])
+    ):
+        return cached[5], cached[6]
+
+    index = {}
+    anywhere = []
+    refs = set()
+    for r in self.rules:
+        if not isinstance(r, (Substitution, Positioning, PairKerning, Chaining)):
+            # We can't tell where these start, so try them everywhere
+            for candidates in index.values():
+                candidates.append(r)
+            anywhere.append(r)
+            continue
+        coverage = r.shaper_inputs()
+        if not coverage:
+            continue  # Never applies
+        first = r.compiled_slots("input", coverage, namedclasses)[0]
+        refs.update(g[1:] for g in coverage[0] if g.startswith("@"))
+        for g in first:
+            if g not in index:
+                index[g] = list(anywhere)
+            index[g].append(r)
+    self._first_glyph_index = (
+        self.rules,
+        len(self.rules),
+        namedclasses,
+        refs,
+        _class_signature(namedclasses, refs),
+        index,
+        anywhere,
+    )
+    return index, anywhere
+
+
+def _coverage_digest(self, namedclasses={}):
+    """Returns a frozenset of the glyphs at which this routine's rules
+    could start matching, or None if we can't tell."""
+    from fontFeatures import Attachment
+
+    index, anywhere = _first_glyph_index(self, namedclasses)
+    cached = self.__dict__.get("_coverage_digest")
+    if cached and cached[0] is index:
+        return cached[1]
+    digest = set(index)
+    for r in anywhere:
+        # An attachment applies at one of its marks
+        if not isinstance(r, Attachment) or any(g.startswith("@") for g in r.marks):
+            digest = None
+            break
+        digest.update(r.marks)
+    if digest is not None:
+        digest = frozenset(digest)
+    self._coverage_digest = (index, digest)
+    return digest
+
+
+# Routines whose trie would be bigger than this are matched rule by rule
+MAX_TRIE_NODES = 100000
+
+
+def _sequence_trie(self, namedclasses={}):
+    """Returns the routine's rules as a trie of input glyph sequences, or
+    None if the routine is not made of context-free substitutions with at
+    least one multi-glyph input (as ligature lookups are).
+
+    Each node is a list of ``[children, rule, first]``, where ``children``
+    maps a glyph to the next node, ``rule`` is the first-listed rule whose
+    input ends at this node (or None) and ``first`` is the lowest rule
+    number anywhere in the subtree, so that walks can stop early. The trie
+    is cached under the same conditions as the first glyph index."""
+    from fontFeatures.shaperLib.Rule import _class_signature, _slot_refs
+
+    cached = self.__dict__.get("_sequence_trie")
+    if (
+        cached
+        and cached[0] is self.rules
+        and cached[1] == len(self.rules)
+        and cached[2] is namedclasses
+        and cached[4] == _class_signature(namedclasses, cached[3])
+    ):
+        return cached[5]
+
+    refs = set()
+    for r in self.rules:
+        refs |= _slot_refs(r)
+    trie = _build_trie(self.rules, namedclasses)
+    if trie is not None and not any(len(r.input) > 1 for r in self.rules):
+        trie = None  # Nothing to gain over the first glyph index
+    self._sequence_trie = (
+        self.rules,
+        len(self.rules),
+        namedclasses,
+        refs,
+        _class_signature(namedclasses, refs),
+        trie,
+    )
+    return trie
+
+
+def _build_trie(rules, namedclasses):
+    from fontFeatures import Substitution
+
+    root = [{}, None, len(rules)]
+    nodes = 1
+    for k, r in enumerate(rules):
+        if (
+            not isinstance(r, Substitution)
+            or r.precontext
+            or r.postcontext
+            or not r.input
+        ):
+            return None
+        frontier = [root]
+        for slot in r.compiled_slots("input", r.input, namedclasses):
+            following = []
+            for node in frontier:
+                node[2] = min(node[2], k)
+                for g in slot:
+                    child = node[0].get(g)
+                    if child is None:
+                        child = node[0][g] = [{}, None, k]
+                        nodes += 1
+                    following.append(child)
+            if nodes > MAX_TRIE_NODES:
+                return None
+            frontier = following
+        for node in frontier:
+            node[2] = min(node[2], k)
+            if node[1] is None or node[1][0] > k:
+                node[1] = (k, r)
+    return root
+
+
+def _walk_trie(trie, items, mask, i):
+    # Returns the first-listed rule whose input matches at masked position
+    # i, following the trie only while it could still lead to one.
+    best = best_k = None
+    node = trie
+    while i < len(mask):
+        node = node[0].get(items[mask[i]].glyph)
+        if node is None or (best is not None and node[2] >= best_k):
+            break
+        if node[1] is not None and (best is None or node[1][0] < best_k):
+            best_k, best = node[1]
+        i += 1
+    return best
+
+
+def could_apply(self, buf, namedclasses={}):
+    """Returns False if none of the glyphs in the buffer could start a
+    match for any of this routine's rules, so it need not be applied."""
+    digest = _coverage_digest(self, namedclasses)
+    return digest is None or not digest.isdisjoint(buf.glyph_digest())
 
 
 def apply_to_buffer(self, buf, stage=None, feature=None, namedclasses={}):
+    # Items may have been changed behind the buffer's back since the last
+    # routine ran, so don't trust any masks it remembers.
+    buf.clear_mask_cache()
     buf.set_mask(self.flags, self.markFilteringSet, self.markAttachmentSet)
     if feature:
         buf.set_feature_mask(feature)
+    flags = set(r.flags for r in self.rules)
+    if len(flags) == 1:
+        # Which glyph sits at a given position depends on the mask, so we
+        # can only dispatch on the glyph when all rules share their flags.
+        trie = None if buf.trace else _sequence_trie(self, namedclasses)
+        if trie is not None:
+            return _apply_trie(self, buf, trie, flags.pop(), stage, namedclasses)
+        return _apply_dispatched(self, buf, flags.pop(), stage, namedclasses)
+    stats = buf.profile
     i = 0
     while i < len(buf): # (which may change!)
+        if stats:
+            stats.positions += 1
         for r in self.rules:
             if stage and r.stage != stage:
                 continue
+            if stats:
+                stats.rules_tested += 1
             buf.set_mask(r.flags, self.markFilteringSet, self.markAttachmentSet)
             if r.would_apply_at_position(buf, i,namedclasses=namedclasses):
-                logging.getLogger("fontFeatures.shaperLib").debug("Applying rule %s at position %i\n" % (r.asFea(), i))
+                if stats:
+                    stats.rules_matched += 1
+                if buf.trace:
+                    buf.trace(RuleMatched(r, i))
+                delta = r._do_apply(buf, i, namedclasses=namedclasses)
+                buf.update()
+                if delta:
+                    i = i + delta
+                break
+        i = i + 1
+
+
+def _apply_dispatched(self, buf, flags, stage, namedclasses):
+    index, anywhere = _first_glyph_index(self, namedclasses)
+    mask = (flags, self.markFilteringSet, self.markAttachmentSet)
+    buf.set_mask(*mask)
+    stats = buf.profile
+    i = 0
+    while i < len(buf): # (which may change!)
+        if stats:
+            stats.positions += 1
+        for r in index.get(buf[i].glyph, anywhere):
+            if stage and r.stage != stage:
+                continue
+            if stats:
+                stats.rules_tested += 1
+            if r.would_apply_at_position(buf, i,namedclasses=namedclasses):
+                if stats:
+                    stats.rules_matched += 1
+                if buf.trace:
+                    buf.trace(RuleMatched(r, i))
                 delta = r._do_apply(buf, i, namedclasses=namedclasses)
                 buf.update()
+                if (buf.flags, buf.markFilteringSet, buf.markAttachmentSet) != mask:
+                    # A chained lookup left its own mask behind
+                    buf.set_mask(*mask)
                 if delta:
                     i = i + delta
                 break
         i = i + 1
+
+
+def _apply_trie(self, buf, trie, flags, stage, namedclasses):
+    if stage and stage != "sub":
+        return
+    buf.set_mask(flags, self.markFilteringSet, self.markAttachmentSet)
+    stats = buf.profile
+    i = 0
+    while i < len(buf): # (which may change!)
+        if stats:
+            stats.positions += 1
+        r = _walk_trie(trie, buf.items, buf.mask, i)
+        if r is not None:
+            if stats:
+                stats.rules_tested += 1
+                stats.rules_matched += 1
+            delta = r._do_apply(buf, i, namedclasses=namedclasses)
+            buf.update()
+            if delta:
+                i = i + delta
+        i = i + 1
@@ -1,6 +1,6 @@
-import logging
+from fontFeatures.shaperLib.Trace import RuleTested
 
-__all__ = ["apply_to_buffer", "would_apply_at_position", "pre_post_context_matches", "_expand_slot"]
+__all__ = ["apply_to_buffer", "would_apply_at_position", "would_apply_at_unmasked", "pre_post_context_matches", "mark_unsafe_to_break", "_expand_slot", "compiled_slots"]
 
 
 def i2s(buffer_items):
@@ -15,50 +15,131 @@ def _expand_slot(slot, namedclasses={}):
             expanded.append(g)
     return expanded
 
-def glyphs_match(buffer_glyphs, routine_glyphs, namedclasses={}):
-    if len(buffer_glyphs) != len(routine_glyphs):
+def _class_signature(namedclasses, refs):
+    sig = []
+    for name in refs:
+        members = namedclasses.get(name, "")
+        sig.append((id(members), len(members)))
+    return sig
+
+def _slot_refs(rule):
+    refs = set()
+    for attr in ["input", "precontext", "postcontext", "replacement", "glyphs"]:
+        for slot in getattr(rule, attr, None) or []:
+            refs.update(g[1:] for g in slot if g.startswith("@"))
+    return refs
+
+
+def compiled_slots(self, name, slots, namedclasses={}):
+    """Returns a list of glyph slots as a list of frozensets.
+
+    Named classes are expanded once and the result is kept on the rule
+    (under ``name``, e.g. "input" or "precontext") until the slots or the
+    named classes they refer to change. (Replacing a glyph inside a slot
+    without changing the slot's length is not noticed.)"""
+    cache = self.__dict__.setdefault("_compiled_slots", {})
+    lengths = [len(slot) for slot in slots]
+    if name in cache:
+        c_slots, c_lengths, c_namedclasses, refs, c_sig, compiled = cache[name]
+        if (
+            c_slots is slots
+            and c_lengths == lengths
+            and c_namedclasses is namedclasses
+            and c_sig == _class_signature(namedclasses, refs)
+        ):
+            return compiled
+    refs = [g[1:] for slot in slots for g in slot if g.startswith("@")]
+    compiled = [frozenset(_expand_slot(slot, namedclasses)) for slot in slots]
+    cache[name] = (
+        slots,
+        lengths,
+        namedclasses,
+        refs,
+        _class_signature(namedclasses, refs),
+        compiled,
+    )
+    return compiled
+
+
+def glyphs_match_at(buf, start, compiled):
+    # Whether the glyphs at (masked) positions from ``start`` on are in
+    # the compiled slots, reading them through the mask rather than
+    # slicing them out of the buffer
+    if start < 0 or start + len(compiled) > len(buf.mask):
         return False
-    for a, b in zip(buffer_glyphs, routine_glyphs):
-        if a.glyph not in _expand_slot(b, namedclasses):
+    items, mask = buf.items, buf.mask
+    for offset, slot in enumerate(compiled):
+        if items[mask[start + offset]].glyph not in slot:
             return False
     return True
 
 def pre_post_context_matches(self, buf, ix, namedclasses={}):
     if hasattr(self, "precontext") and self.precontext:
         if ix < len(self.precontext):
-            logging.getLogger("fontFeatures.shaperLib").debug(" - No, not enough precontext")
+            if buf.trace:
+                buf.trace(RuleTested(self, ix, False, "not enough precontext"))
             return False
-        precontext = buf[ix - len(self.precontext) : ix]
-        if not glyphs_match(precontext, self.precontext, namedclasses):
-            logging.getLogger("fontFeatures.shaperLib").debug(" - No, precontext doesn't match %s != %s" % (i2s(precontext), self.precontext))
+        start = ix - len(self.precontext)
+        if not glyphs_match_at(buf, start, compiled_slots(self, "precontext", self.precontext, namedclasses)):
+            if buf.trace:
+                buf.trace(RuleTested(self, ix, False, "precontext doesn't match %s != %s", i2s(buf[start:ix]), self.precontext))
             return False
     if hasattr(self, "postcontext") and self.postcontext:
         coverage = self.shaper_inputs()
         coverage_l = len(coverage)
         end_of_coverage = ix + coverage_l
         if end_of_coverage + len(self.postcontext) > len(buf):
-            logging.getLogger("fontFeatures.shaperLib").debug(" - No, not enough postcontext")
+            if buf.trace:
+                buf.trace(RuleTested(self, ix, False, "not enough postcontext"))
             return False
-        postcontext = buf[end_of_coverage : end_of_coverage + len(self.postcontext)]
-        if not glyphs_match(postcontext, self.postcontext, namedclasses):
-            logging.getLogger("fontFeatures.shaperLib").debug(" - No, postcontext doesn't match %s != %s" % (i2s(postcontext), self.postcontext))
+        if not glyphs_match_at(buf, end_of_coverage, compiled_slots(self, "postcontext", self.postcontext, namedclasses)):
+            if buf.trace:
+                postcontext = buf[end_of_coverage : end_of_coverage + len(self.postcontext)]
+                buf.trace(RuleTested(self, ix, False, "postcontext doesn't match %s != %s", i2s(postcontext), self.postcontext))
             return False
     return True
 
 def would_apply_at_position(self, buf, ix, namedclasses={}):
-    logging.getLogger("fontFeatures.shaperLib").debug("Testing if %s would apply at position %i" % (self.asFea(), ix))
     coverage = self.shaper_inputs()
     coverage_l = len(coverage)
     if coverage_l < 1: return False
-    buffer_glyphs = buf[ix : ix + coverage_l]
 
-    if not glyphs_match(buffer_glyphs, coverage, namedclasses):
-        logging.getLogger("fontFeatures.shaperLib").debug(" - No! %s != %s" % (i2s(buffer_glyphs), coverage))
+    if not glyphs_match_at(buf, ix, compiled_slots(self, "input", coverage, namedclasses)):
+        if buf.trace:
+            buf.trace(RuleTested(self, ix, False, "%s != %s", i2s(buf[ix : ix + coverage_l]), coverage))
         return False
 
     if not pre_post_context_matches(self, buf, ix, namedclasses):
         return False
 
-    logging.getLogger("fontFeatures.shaperLib").debug(" - Yes! %s == %s" % (i2s(buffer_glyphs), coverage))
+    if buf.trace:
+        buf.trace(RuleTested(self, ix, True, "%s == %s", i2s(buf[ix : ix + coverage_l]), coverage))
+    return True
+
+def would_apply_at_unmasked(self, buf, ix, skippy, namedclasses={}):
+    """Like ``would_apply_at_position``, but ``ix`` is an unmasked position
+    and glyphs are skipped using the given ``SkippyIter`` rather than the
+    buffer's current mask."""
+    coverage = self.shaper_inputs()
+    if not coverage or not skippy.visible(ix):
+        return False
+    end = skippy.match(ix, compiled_slots(self, "input", coverage, namedclasses))
+    if end is None:
+        return False
+    if getattr(self, "precontext", None):
+        if not skippy.match_backwards(ix, compiled_slots(self, "precontext", self.precontext, namedclasses)):
+            return False
+    if getattr(self, "postcontext", None):
+        start = skippy.next(end)
+        if start is None or skippy.match(start, compiled_slots(self, "postcontext", self.postcontext, namedclasses)) is None:
+            return False
     return True
 
+
+def mark_unsafe_to_break(self, buf, ix):
+    """Tells the buffer that the rule, applying at (masked) position
+    ``ix``, looks at its input glyphs and the context around them, so the
+    text cannot be broken anywhere among them without shaping it again."""
+    before = len(getattr(self, "precontext", None) or [])
+    after = len(self.shaper_inputs()) + len(getattr(self, "postcontext", None) or [])
+    buf.unsafe_to_break(ix - before, ix + after)
@@ -0,0 +1,61 @@
+from fontFeatures import RoutineReference
+
+
+class ShapePlan:
+    """Everything about shaping a buffer which depends only on its segment
+    properties (script, language and direction) and the user's feature
+    selection: which complex shaper to use, and the stage-ordered list of
+    routines to apply.
+
+    Plans are made by :py:meth:`Shaper.plan_for` and cached there, so
+    shaping many strings with the same properties does this work once.
+    A plan may be used by several threads at a time, so nothing about it
+    changes once it is made, except that results are added to ``cache``.
+
+    Attributes:
+        complexshaper: The ``BaseShaper`` subclass which will shape the text.
+        user_features: The user's feature selection, parsed.
+        stages: A list of stages; each is either a list of feature tags or
+            a pause callback.
+        lookups: A list parallel to ``stages``. For feature stages, a list
+            of ``(routine, feature)`` pairs in application order, already
+            filtered by language; for pauses, a function taking the complex
+            shaper and the current stage.
+        cache: A dictionary in which complex shapers keep results that
+            depend only on the plan, such as the Indic shaper's table of
+            consonant positions.
+    """
+
+    def __init__(self, context, complexshaper):
+        self.complexshaper = type(complexshaper)
+        self.user_features = context.user_features
+        self.stages = context.stages
+        self.lookups = []
+        self.cache = {}
+        features = context.fontfeatures.features
+        for stage in self.stages:
+            if isinstance(stage, list):
+                lookups = []
+                for f in stage:
+                    if f not in features:
+                        continue
+                    routines = [
+                        x.routine if isinstance(x, RoutineReference) else x
+                        for x in features[f]
+                    ]
+                    lookups.extend(
+                        [(routine, f) for routine in complexshaper._filter_by_lang(routines)]
+                    )
+                self.lookups.append(lookups)
+            else:
+                # Pauses are methods of the complex shaper we planned with;
+                # keep the function so it can be called on another one.
+                self.lookups.append(getattr(stage, "__func__", stage))
+
+    @classmethod
+    def key_for(klass, buf, features):
+        """Returns a hashable key describing the properties of the buffer
+        and feature selection which a plan depends on."""
+        if not isinstance(features, str):
+            features = tuple((f["tag"], f["value"]) for f in features)
+        return (buf.script, buf.language, buf.direction, features)
@@ -9,40 +9,415 @@ from .MyanmarShaper import MyanmarShaper
 from .HangulShaper import HangulShaper
 from .KhmerShaper import KhmerShaper
 from .USEShaper import USEShaper
+from .ShapePlan import ShapePlan
+from .ShapingContext import ShapingContext
+from .ArrayBuffer import ArrayBuffer
+from .Profiler import Profiler
+from .WordCache import WordCache, space_attachment, segment_at_spaces, copy_items
+from .Itemizer import itemize
+from collections import OrderedDict
+import multiprocessing
+import threading
 import logging
 import re
 
 
+logger = logging.getLogger("fontFeatures.shaperLib")
+
+# The shaper used by each process of a shape_many worker pool
+_worker_shaper = None
+
+
+def _init_worker(ff, font):
+    global _worker_shaper
+    _worker_shaper = Shaper(ff, font)
+
+
+def _shape_in_worker(task):
+    return _worker_shaper._shape_one(*task)
+
+
+def _shape_chunk_in_worker(task):
+    buf = _worker_shaper._shape_chunk(*task)
+    # Send the glyphs back, not the font
+    buf.font = None
+    buf.clear_mask_cache()
+    buf.__dict__.pop("_attachment_scan", None)
+    return buf
+
+
 class Shaper:
-    def __init__(self, ff, font, message_function=None):
+    plan_cache_size = 64
+
+    def __init__(self, ff, font, message_function=None, trace=None, profile=False, compile_routines=False, word_cache=None):
+        """Shapes buffers using a font and its features.
+
+        Args:
+            ff: A ``FontFeatures`` object.
+            font: A Babelfont ``Font`` object.
+            message_function: Optional function called with progress
+                messages, the buffer (if any) and serialization options.
+            trace: Optional function called with each
+                :py:mod:`fontFeatures.shaperLib.Trace` event.
+            profile: If true, collect per-routine statistics in
+                ``self.profiler`` (a :py:class:`Profiler`).
+            compile_routines: If true, compile routines to Python code
+                before applying them (see
+                :py:mod:`fontFeatures.shaperLib.Compiler`).
+            word_cache: Optional maximum number of shaped words to cache,
+                or a :py:class:`WordCache` (see
+                :py:mod:`fontFeatures.shaperLib.WordCache`).
+
+        A shaper may be shared between threads: the state of each call to
+        ``execute`` is kept in a :py:class:`ShapingContext` of its own,
+        and the font's features are only changed (to resolve routine
+        references and hoist languages) when a plan is made, under a
+        lock. The features must not be changed while shaping. Trace and
+        message functions are called from whichever thread is shaping;
+        the profiler's figures are only reliable with one thread.
+        """
         assert isinstance(ff, FontFeatures)
         assert isinstance(font, Font)
         self.fontfeatures = ff
         self.babelfont = font
-        if message_function:
-            self.msg = message_function
-        else:
-            self.msg = self.default_message_function
+        self.plans = OrderedDict()
+        self._plans_lock = threading.Lock()
+        self._prepared_features = None
+        self._local = threading.local()
+        self.message_function = message_function
+        self.trace = trace
+        self.profiler = Profiler() if profile else None
+        self.compile_routines = compile_routines
+        if isinstance(word_cache, int):
+            word_cache = WordCache(word_cache)
+        self.word_cache = word_cache
 
     def execute(self, buf, features=[]):
-        # Choose complex shaper
-        self.complexshaper = self.categorize(buf)(self, self.babelfont, buf, features)
-        self.msg("Using %s" % type(self.complexshaper).__name__)
-        self.stages = [[]]
+        # Only build trace events if someone is going to look at them
+        tracing = bool(
+            self.trace or self.message_function or logger.isEnabledFor(logging.INFO)
+        )
+        buf.trace = self.emit if tracing else None
+        context = self._start(buf, features, tracing)
+        if (
+            self.word_cache is not None
+            and not tracing
+            and not self.profiler
+            and buf.items
+            and buf.is_all_unicodes
+            and not any(item.glyph for item in buf.items)
+            and space_attachment(context, self.babelfont)
+        ):
+            return self._execute_words(context, buf, features)
+        context.complexshaper.shape()
+        if hasattr(buf, "compact"):
+            buf.compact()
+        return buf
+
+    def _start(self, buf, features, tracing=False):
+        context = ShapingContext(self, self.plan_for(buf, features), tracing)
+        context.complexshaper = context.shape_plan.complexshaper(context, self.babelfont, buf, features)
+        self._local.context = context
+        context.msg("Using %s" % type(context.complexshaper).__name__)
+        return context
+
+    def _last(self, name):
+        context = getattr(self._local, "context", None)
+        return getattr(context, name, None)
+
+    @property
+    def shape_plan(self):
+        """The plan used by the last call to ``execute`` in this thread."""
+        return self._last("shape_plan")
+
+    @property
+    def complexshaper(self):
+        """The complex shaper used by the last call to ``execute`` in this
+        thread."""
+        return self._last("complexshaper")
+
+    @property
+    def stages(self):
+        return self._last("stages")
+
+    @property
+    def user_features(self):
+        return self._last("user_features")
+
+    def _execute_words(self, context, buf, features):
+        # Shape each word on its own, through the word cache, and put the
+        # results together.
+        plan_key = (
+            ShapePlan.key_for(buf, features),
+            self._features_signature(),
+            id(self.babelfont),
+            type(buf),
+        )
+        pieces = []
+        offset = 0
+        spaces = space_attachment(context, self.babelfont)
+        for start, end in segment_at_spaces(buf, spaces):
+            text = "".join(chr(item.codepoint) for item in buf.items[start:end])
+            key = (text, plan_key)
+            shaped = self.word_cache.get(key)
+            if shaped is None:
+                shaped = type(buf)(
+                    buf.font,
+                    unicodes=text,
+                    direction=buf.direction,
+                    script=buf.script,
+                    language=buf.language,
+                )
+                self._start(shaped, features).complexshaper.shape()
+                if hasattr(shaped, "compact"):
+                    shaped.compact()
+                self.word_cache.put(key, shaped)
+            pieces.append((offset, shaped))
+            offset += len(unicodedata.normalize("NFC", text))
+        return self._join(buf, pieces)
+
+    def _join(self, buf, pieces):
+        # Replaces the contents of the buffer with those of the shaped
+        # buffers in ``pieces``, a list of (offset, buffer) pairs. Clusters
+        # and syllable indices are rebased to where each piece starts in
+        # the normalized text, as that is what the clusters of a buffer
+        # shaped as a whole count.
+        buf.items = [item for _, shaped in pieces for item in copy_items(shaped)]
+        items = buf.items
+        ix = syllable_offset = 0
+        for start, shaped in pieces:
+            last_syllable = None
+            for item in items[ix : ix + len(shaped.items)]:
+                if hasattr(item, "cluster"):
+                    item.cluster += start
+                if hasattr(item, "syllable_index"):
+                    if last_syllable is None or item.syllable_index > last_syllable:
+                        last_syllable = item.syllable_index
+                    item.syllable_index += syllable_offset
+            if last_syllable is not None:
+                syllable_offset += last_syllable + 1
+            ix += len(shaped.items)
+        buf.clear_mask_cache()
+        buf.clear_glyph_digest()
+        if hasattr(buf, "compact"):
+            buf.compact()
+        return buf
+
+    def execute_parallel(self, buf, features=[], workers=None, chunk_length=4096):
+        """Shapes a long buffer of characters in pieces, optionally over a
+        process pool, giving the same result as ``execute``.
+
+        The text is cut into chunks of at least ``chunk_length``
+        characters at word boundaries which no rule in the font can match
+        across, as worked out for the word cache (see
+        :py:mod:`fontFeatures.shaperLib.WordCache`). The chunks are
+        shaped separately - by ``workers`` processes, if that is more than
+        one, set up as for ``shape_many`` - and put back together with
+        their clusters and syllable indices fixed up. Each chunk is
+        shaped with a buffer of its own, so the cost of skipping over and
+        masking glyphs does not grow with the length of the text.
+
+        If there is no such boundary, or the text is short, or the buffer
+        holds glyphs, or shaping is being traced or profiled, the buffer
+        is simply shaped with ``execute``.
+
+        Args:
+            buf: The buffer to shape.
+            features: A feature string or list, as for ``execute``.
+            workers: Number of processes to use.
+            chunk_length: The smallest number of characters in a chunk.
+        """
+        if (
+            self.trace
+            or self.message_function
+            or self.profiler
+            or len(buf.items) <= chunk_length
+            or not buf.is_all_unicodes
+            or any(item.glyph for item in buf.items)
+        ):
+            return self.execute(buf, features)
+        buf.trace = None
+        context = self._start(buf, features)
+        spaces = space_attachment(context, self.babelfont)
+        if not spaces:
+            return self.execute(buf, features)
+
+        chunks = []
+        start = 0
+        for _, end in segment_at_spaces(buf, spaces):
+            if end - start >= chunk_length:
+                chunks.append((start, end))
+                start = end
+        if start < len(buf.items):
+            chunks.append((start, len(buf.items)))
+        texts = [
+            "".join(chr(item.codepoint) for item in buf.items[start:end])
+            for start, end in chunks
+        ]
+        tasks = [
+            (text, type(buf), buf.direction, buf.script, buf.language, features)
+            for text in texts
+        ]
+        if not workers or workers < 2:
+            results = [self._shape_chunk(*task) for task in tasks]
+        else:
+            with multiprocessing.Pool(
+                workers, _init_worker, (self.fontfeatures, self.babelfont)
+            ) as pool:
+                results = pool.map(_shape_chunk_in_worker, tasks, 1)
+
+        pieces = []
+        offset = 0
+        for text, shaped in zip(texts, results):
+            shaped.font = buf.font
+            pieces.append((offset, shaped))
+            offset += len(unicodedata.normalize("NFC", text))
+        return self._join(buf, pieces)
+
+    def _shape_chunk(self, text, buffer_class, direction, script, language, features):
+        buf = buffer_class(
+            self.babelfont,
+            unicodes=text,
+            direction=direction,
+            script=script,
+            language=language,
+        )
+        return self.execute(buf, features=features)
+
+    def shape_many(self, texts, features=[], workers=None, arrays=False, chunksize=64, **serialize_options):
+        """Shapes many strings with the same features.
+
+        Results are yielded in the same order as the input. By default each
+        result is the serialized buffer, as ``ff-shape`` prints it (that is,
+        right-to-left runs are given in visual order); extra keyword
+        arguments are passed to ``Buffer.serialize``. If ``arrays`` is true,
+        each result is instead the dictionary returned by
+        ``ArrayBuffer.as_arrays``, in logical order.
+
+        If ``workers`` is more than one, the strings are shaped by a pool of
+        that many processes. Each process is given the font and features
+        once, when it starts; only the strings and results are sent back
+        and forth after that. Worker processes do not use this shaper's
+        message function, trace function or profiler; they log to the
+        ``fontFeatures.shaperLib`` logger.
+
+        Args:
+            texts: An iterable of strings.
+            features: A feature string or list, as for ``execute``.
+            workers: Number of processes to use.
+            arrays: Return arrays instead of serialized buffers.
+            chunksize: Number of strings to send to a worker at a time.
+        """
+        tasks = ((text, features, arrays, serialize_options) for text in texts)
+        if not workers or workers < 2:
+            for task in tasks:
+                yield self._shape_one(*task)
+            return
+        with multiprocessing.Pool(
+            workers, _init_worker, (self.fontfeatures, self.babelfont)
+        ) as pool:
+            yield from pool.imap(_shape_in_worker, tasks, chunksize)
+
+    def shape_runs(self, text, features=[], language=None, buffer_class=None):
+        """Splits text into runs of one script and direction (see
+        :py:mod:`fontFeatures.shaperLib.Itemizer`) and shapes them one at
+        a time, yielding a ``(run, buffer)`` pair for each, in logical
+        order. Each run is shaped with the complex shaper and cached plan
+        for its script and direction.
+
+        As runs are itemized and shaped only when asked for, long
+        documents - given as an iterable of strings, such as the lines of
+        a file - can be shaped without holding all of them in memory.
+
+        Args:
+            text: A string, or an iterable of strings.
+            features: A feature string or list, as for ``execute``.
+            language: The language of the text, if known.
+            buffer_class: The buffer class to use (``Buffer`` by default;
+                ``ArrayBuffer`` is more compact).
+        """
+        buffer_class = buffer_class or Buffer.Buffer
+        for run in itemize(text):
+            buf = buffer_class(
+                self.babelfont,
+                unicodes=run.text,
+                direction=run.direction,
+                script=run.script,
+                language=language,
+            )
+            self.execute(buf, features=features)
+            yield run, buf
+
+    def _shape_one(self, text, features, arrays, serialize_options):
+        if arrays:
+            buf = ArrayBuffer(self.babelfont, unicodes=text)
+            self.execute(buf, features=features)
+            return buf.as_arrays()
+        buf = Buffer.Buffer(self.babelfont, unicodes=text)
+        self.execute(buf, features=features)
+        if buf.direction == "RTL":
+            buf.items = list(reversed(buf.items))
+        return buf.serialize(**serialize_options)
+
+    def plan_for(self, buf, features=[]):
+        """Returns a :py:class:`ShapePlan` for shaping the given buffer.
+
+        Plans are cached by the buffer's script, language and direction and
+        the feature selection. The cache notices routines being added to
+        the font's features, but if you change the features in other ways
+        between calls to ``execute``, call :py:meth:`clear_plans`."""
+        key = (ShapePlan.key_for(buf, features), self._features_signature())
+        with self._plans_lock:
+            plan = self.plans.get(key)
+            if plan is not None:
+                self.plans.move_to_end(key)
+                return plan
+            if self._prepared_features != key[1]:
+                self.fontfeatures.resolveAllRoutines()
+                self.fontfeatures.hoist_languages()
+                self._prepared_features = key[1]
+        context = ShapingContext(self)
+        context.complexshaper = self.categorize(buf)(context, self.babelfont, buf, features)
         if isinstance(features, str):
-            self.user_features = self.parse_user_feature_string(features)
+            context.user_features = self.parse_user_feature_string(features)
         else:
-            self.user_features = features
-        self.collect_features(buf)
-        self.complexshaper.shape()
-        return buf
+            context.user_features = features
+        context.collect_features(buf)
+        plan = ShapePlan(context, context.complexshaper)
+        with self._plans_lock:
+            # Another thread may have made the same plan meanwhile
+            plan = self.plans.setdefault(key, plan)
+            if len(self.plans) > self.plan_cache_size:
+                self.plans.popitem(last=False)
+        return plan
+
+    def clear_plans(self):
+        """Forget all cached shape plans."""
+        with self._plans_lock:
+            self.plans = OrderedDict()
+            self._prepared_features = None
 
-    def default_message_function(self, msg, buffer=None, serialize_options=None):
-        ser = ""
-        if buffer:
-            ser = buffer.serialize(additional=serialize_options)
-            msg = msg + " : " + ser
-        logging.getLogger("fontFeatures.shaperLib").info(msg)
+    def _features_signature(self):
+        ff = self.fontfeatures
+        return (
+            len(ff.routines),
+            tuple((tag, len(routines)) for tag, routines in ff.features.items()),
+        )
+
+    def emit(self, event):
+        """Passes a trace event to the trace function, the message function
+        and the ``fontFeatures.shaperLib`` logger, as appropriate."""
+        if self.trace:
+            self.trace(event)
+        if self.message_function:
+            if event.level >= logging.INFO:
+                self.message_function(
+                    event.text,
+                    buffer=event.buffer,
+                    serialize_options=event.serialize_options,
+                )
+        elif logger.isEnabledFor(event.level):
+            logger.log(event.level, "%s", event)
 
     def parse_user_feature_string(self, features):
         features = features.split(",")
@@ -60,46 +435,6 @@ class Shaper:
                 outfeat.append({"tag": f, "value": True})
         return outfeat
 
-    def add_pause(self, thing = None):
-        if thing:
-            self.stages.append(thing)
-        self.stages.append([])
-
-    def add_features(self, *tags):
-        for t in tags:
-            if any([isinstance(x, list) and t in x for x in self.stages]):
-                continue
-            self.stages[-1].append(t)
-
-    def disable_feature(self, tag):
-        for s in self.stages:
-            if isinstance(s, list) and tag in s:
-                s.remove(tag)
-
-    def collect_features(self, buf):
-        self.add_features("rvrn")
-        self.add_pause()
-        if buf.direction == "LTR":
-            self.add_features("ltra", "ltrm")
-        elif buf.direction == "RTL":
-            self.add_features("rtla", "rtlm")
-        self.add_features("frac", "numr", "dnom", "rand")
-        # trak?
-        self.complexshaper.collect_features(self)
-        # common features
-        self.add_features("abvm", "blwm", "ccmp", "locl", "mark", "mkmk", "rlig")
-        if buf.direction == "LTR" or buf.direction == "RTL":
-            self.add_features("calt", "clig", "curs", "dist", "kern", "liga", "rclt")
-        else:
-            self.add_features("vert")
-        for uf in self.user_features:
-            if not uf["value"]:  # Turn it off if it's already on
-                self.disable_feature(uf["tag"])
-            else:
-                self.add_features(uf["tag"])
-        if hasattr(self.complexshaper, "override_features"):
-            self.complexshaper.override_features(self)
-
     def categorize(self, buf):
         if buf.script == "Arabic":
             return ArabicShaper
@@ -0,0 +1,95 @@
+"""The state of one call to the shaper.
+
+A :py:class:`Shaper` holds nothing which changes while a buffer is being
+shaped, so one shaper (and its font and features) can be shared by many
+threads. Everything which belongs to a single call to ``execute`` - the
+plan being followed, the complex shaper working on the buffer, whether
+trace events are wanted - lives instead in a ``ShapingContext`` made for
+that call. This is the ``plan`` which complex shapers are given.
+
+Shape plans are put together on a context of their own, which collects
+the stages of the plan through :py:meth:`add_features`,
+:py:meth:`add_pause` and :py:meth:`disable_feature`.
+"""
+from .Trace import Message
+
+
+class ShapingContext:
+    """The state of one call to ``Shaper.execute``, or of building one
+    shape plan.
+
+    Attributes:
+        shaper: The :py:class:`Shaper` doing the work.
+        fontfeatures: The shaper's ``FontFeatures`` object, which is not
+            changed while shaping.
+        profiler: The shaper's profiler, if any.
+        compile_routines: Whether routines are compiled before applying.
+        tracing: Whether trace events should be built.
+        shape_plan: The :py:class:`ShapePlan` being followed (None while a
+            plan is being built).
+        stages: The plan's stages.
+        user_features: The user's feature selection, parsed.
+        complexshaper: The complex shaper working on the buffer.
+    """
+
+    def __init__(self, shaper, shape_plan=None, tracing=False):
+        self.shaper = shaper
+        self.fontfeatures = shaper.fontfeatures
+        self.profiler = shaper.profiler
+        self.compile_routines = shaper.compile_routines
+        self.tracing = tracing
+        self.shape_plan = shape_plan
+        self.complexshaper = None
+        if shape_plan:
+            self.stages = shape_plan.stages
+            self.user_features = shape_plan.user_features
+        else:
+            self.stages = [[]]
+            self.user_features = []
+
+    def msg(self, msg, buffer=None, serialize_options=None):
+        if self.tracing:
+            self.emit(Message(msg, buffer, serialize_options))
+
+    def emit(self, event):
+        self.shaper.emit(event)
+
+    def add_pause(self, thing = None):
+        if thing:
+            self.stages.append(thing)
+        self.stages.append([])
+
+    def add_features(self, *tags):
+        for t in tags:
+            if any([isinstance(x, list) and t in x for x in self.stages]):
+                continue
+            self.stages[-1].append(t)
+
+    def disable_feature(self, tag):
+        for s in self.stages:
+            if isinstance(s, list) and tag in s:
+                s.remove(tag)
+
+    def collect_features(self, buf):
+        self.add_features("rvrn")
+        self.add_pause()
+        if buf.direction == "LTR":
+            self.add_features("ltra", "ltrm")
+        elif buf.direction == "RTL":
+            self.add_features("rtla", "rtlm")
+        self.add_features("frac", "numr", "dnom", "rand")
+        # trak?
+        self.complexshaper.collect_features(self)
+        # common features
+        self.add_features("abvm", "blwm", "ccmp", "locl", "mark", "mkmk", "rlig")
+        if buf.direction == "LTR" or buf.direction == "RTL":
+            self.add_features("calt", "clig", "curs", "dist", "kern", "liga", "rclt")
+        else:
+            self.add_features("vert")
+        for uf in self.user_features:
+            if not uf["value"]:  # Turn it off if it's already on
+                self.disable_feature(uf["tag"])
+            else:
+                self.add_features(uf["tag"])
+        if hasattr(self.complexshaper, "override_features"):
+            self.complexshaper.override_features(self)
@@ -7,6 +7,7 @@ def shaper_inputs(self):
 def _do_apply(self, buf, ix, namedclasses={}):
     from fontFeatures.shaperLib.Rule import _expand_slot
 
+    self.mark_unsafe_to_break(buf, ix)
     coverage = buf[ix : ix + len(self.input)]
     newstuff = []
     # Handle single subst first
@@ -18,6 +19,7 @@ def _do_apply(self, buf, ix, namedclasses={}):
             inputs = _expand_slot(self.input[0], namedclasses)
             buf[ix].glyph = replacements[inputs.index(buf[ix].glyph)]
         buf[ix].prep_glyph(buf.font)
+        buf.mark_changed(ix)
         return
 
     delta = len(self.replacement) - 1
@@ -1,6 +1,5 @@
-from youseedee import ucd_data
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, INDIC_SYLLABIC_CATEGORY, INDIC_POSITIONAL_CATEGORY
 from .BaseShaper import BaseShaper
-import re
 from fontFeatures.shaperLib.Buffer import BufferItem
 from fontFeatures.shaperLib.VowelConstraints import preprocess_text_vowel_constraints
 from .IndicShaperData import script_config, syllabic_category_map, IndicPositionalCategory2IndicPosition, IndicPosition
@@ -14,6 +13,7 @@ class SyllabicShaper(BaseShaper):
     after_syllable_features = [ "ccmp", "locl" ]
     other_features = [ "init", "pres", "abvs", "blws", "psts", "haln", "calt", "clig" ]
     repha = "Repha"
+    shapes_words_independently = False
 
     def collect_features(self, shaper):
         shaper.add_pause(self.setup_syllables)
@@ -33,38 +33,31 @@ class SyllabicShaper(BaseShaper):
 
     def assign_category(self, item):
         # Base behavior is Indic
-        ucd = ucd_data(item.codepoint)
-        item.syllabic_category = syllabic_category_map.get(ucd.get("Indic_Syllabic_Category", "Other"),"X")
-        item.positional_category = ucd.get("Indic_Positional_Category", "x")
+        props = unicode_properties(item.codepoint)
+        item.syllabic_category = syllabic_category_map.get(props[INDIC_SYLLABIC_CATEGORY] or "Other","X")
+        item.positional_category = props[INDIC_POSITIONAL_CATEGORY] or "x"
         item.syllabic_position = IndicPositionalCategory2IndicPosition(item.positional_category)
         self.reassign_category(item)
 
     def assign_categories(self):
-        serialized = []
-        for ix,item in enumerate(self.buffer.items):
+        categories = []
+        for item in self.buffer.items:
             self.assign_category(item)
-            serialized.append("<"+item.syllabic_category+">("+item.positional_category+")="+str(ix))
-        return "".join(serialized)
+            categories.append(item.syllabic_category)
+        return categories
 
     def setup_syllables(self, shaper):
-        syllable_index = 0
-        category_string = self.assign_categories()
-        self.plan.msg("Set up syllables: "+category_string)
-        while len(category_string) > 0:
-            state, end, matched_type = None, None, None
-            for syllable_type in self.syllable_types:
-                m = re.match(self.syllable_machine[syllable_type], category_string)
-                if m and len(m[0]):
-                    matched_type = syllable_type
-                    category_string = category_string[len(m[0]):]
-                    indexes = re.findall("=(\\d+)", m[0])
-                    start, end = int(indexes[0]), int(indexes[-1])
-                    break
-            assert(matched_type)
-            for i in range(start, end+1):
+        categories = self.assign_categories()
+        if self.plan.tracing:
+            self.plan.msg("Set up syllables: "+"".join(
+                "<"+item.syllabic_category+">("+item.positional_category+")="+str(ix)
+                for ix,item in enumerate(self.buffer.items)
+            ))
+        syllables = self.syllable_machine.segment(categories, self.syllable_types)
+        for syllable_index, (syllable_type, start, end) in enumerate(syllables):
+            for i in range(start, end):
                 self.buffer.items[i].syllable_index = syllable_index
                 self.buffer.items[i].syllable = syllable_type
-            syllable_index = syllable_index+1
         self.plan.msg("Syllables", self.buffer, ["syllable_index", "syllable"])
 
     def iterate_syllables(self):
@@ -111,3 +104,11 @@ class SyllabicShaper(BaseShaper):
     def final_reordering_syllable(self, start, end):
         pass
 
+    def postprocess_glyphs(self):
+        # Glyphs are reordered within syllables, so no syllable can be
+        # broken up
+        items = self.buffer.items
+        for index,syll_type,start,end in self.iterate_syllables():
+            for i in range(start + 1, end):
+                items[i].unsafe_to_break = True
+
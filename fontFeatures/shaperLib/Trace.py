@@ -0,0 +1,102 @@
+"""Events describing the progress of shaping.
+
+Pass a ``trace`` callable to :py:class:`Shaper` to receive these as they
+happen. Events which show the buffer take a serialized snapshot of it
+when they are made, so they can be kept and formatted later; other
+descriptions are only built when converted to strings. Events are only
+made while tracing, so none of this costs anything otherwise.
+"""
+import logging
+
+
+class TraceEvent:
+    """Base class for shaping trace events."""
+
+    level = logging.INFO
+    buffer = None
+    serialize_options = None
+    snapshot = None
+
+    def _take_snapshot(self, buffer, serialize_options=None):
+        # The buffer is kept too, for message functions, but it carries
+        # on changing after the event is delivered
+        self.buffer = buffer
+        self.serialize_options = serialize_options
+        if buffer is not None:
+            self.snapshot = buffer.serialize(additional=serialize_options)
+
+    def serialize(self):
+        """Returns the serialized buffer (if any) as it was when the
+        event was made."""
+        return self.snapshot
+
+    def __str__(self):
+        if self.snapshot is None:
+            return self.text
+        return self.text + " : " + self.snapshot
+
+
+class Message(TraceEvent):
+    """A message from the shaper, optionally with a buffer snapshot."""
+
+    def __init__(self, text, buffer=None, serialize_options=None):
+        self.text = text
+        self._take_snapshot(buffer, serialize_options)
+
+
+class RoutineStart(TraceEvent):
+    """A routine is about to be applied to the buffer."""
+
+    def __init__(self, routine, feature, buffer):
+        self.routine = routine
+        self.feature = feature
+        self._take_snapshot(buffer)
+
+    @property
+    def text(self):
+        return "Before %s (%s)" % (self.routine.name, self.feature)
+
+
+class RoutineEnd(RoutineStart):
+    """A routine has been applied to the buffer."""
+
+    @property
+    def text(self):
+        return "After %s (%s)" % (self.routine.name, self.feature)
+
+
+class RuleTested(TraceEvent):
+    """A rule was tested at a position of the buffer. ``reason`` is a
+    format string which is filled in with ``args`` when needed."""
+
+    level = logging.DEBUG
+
+    def __init__(self, rule, position, result, reason, *args):
+        self.rule = rule
+        self.position = position
+        self.result = result
+        self.reason = reason
+        self.args = args
+
+    @property
+    def text(self):
+        return "Testing if %s would apply at position %i: %s, %s" % (
+            self.rule.asFea(),
+            self.position,
+            "yes" if self.result else "no",
+            self.reason % self.args,
+        )
+
+
+class RuleMatched(TraceEvent):
+    """A rule is being applied at a position of the buffer."""
+
+    level = logging.DEBUG
+
+    def __init__(self, rule, position):
+        self.rule = rule
+        self.position = position
+
+    @property
+    def text(self):
+        return "Applying rule %s at position %i" % (self.rule.asFea(), self.position)
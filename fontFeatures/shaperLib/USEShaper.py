@@ -1,4 +1,5 @@
-from youseedee import ucd_data, database
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, GENERAL_CATEGORY, USE_CATEGORY
+from fontFeatures.shaperLib.UnicodePropertiesData import VALUES
 from .SyllabicShaper import SyllabicShaper
 from .IndicShaperData import make_syllable_machine
 from fontFeatures.shaperLib.Buffer import BufferItem
@@ -29,7 +30,7 @@ states = OrderedDict(
     hieroglyph_cluster="SB+ | SB* G SE* (J SE* (G SE*)?)*",
     independent_cluster="O",
 )
-use_categories = set([x[2] for x in database["USECategory.txt"]["data"]])
+use_categories = set(VALUES[USE_CATEGORY]) - set([None])
 
 
 class USEShaper(SyllabicShaper):
@@ -70,7 +71,7 @@ class USEShaper(SyllabicShaper):
         shaper.add_features(*self.other_features)
 
     def assign_category(self, item):
-        item.syllabic_category = ucd_data(item.codepoint).get("USE_Category", "X")
+        item.syllabic_category = unicode_properties(item.codepoint)[USE_CATEGORY] or "X"
         # Separate positional categories are not used, it's all in the syllabic_category
         item.positional_category = "x"
 
@@ -173,7 +174,7 @@ class USEShaper(SyllabicShaper):
             b = newunicodes[ix + 1]
             s = chr(a) + chr(b)
             composed = unicodedata.normalize("NFC", s)
-            if ucd_data(a)["General_Category"][0] == "M":
+            if (unicode_properties(a)[GENERAL_CATEGORY] or "Cn")[0] == "M":
                 newstring = newstring + chr(a)
                 ix = ix + 1
                 continue
@@ -0,0 +1,72 @@
+"""Unicode character properties used by the shapers.
+
+The properties the shapers need - script, general category, Arabic joining
+type and group, Indic syllabic and positional categories and USE category -
+are read from compact tables generated by
+``utils/gen-unicode-properties.py``, instead of asking ``youseedee`` for
+every property of every character. The tables are unpacked the first time
+they are used.
+
+``unicode_properties(codepoint)`` returns a tuple of property values,
+indexed by the constants below, with ``None`` for properties which the
+character does not have::
+
+    props = unicode_properties(0x0915)
+    props[SCRIPT]  # "Devanagari"
+"""
+import base64
+import sys
+import zlib
+from array import array
+
+SCRIPT = 0
+GENERAL_CATEGORY = 1
+JOINING_TYPE = 2
+JOINING_GROUP = 3
+INDIC_SYLLABIC_CATEGORY = 4
+INDIC_POSITIONAL_CATEGORY = 5
+USE_CATEGORY = 6
+
+_tables = None
+
+
+def _unpack(data, typecode):
+    data = zlib.decompress(base64.b64decode("".join(data)))
+    if typecode is None:
+        return data
+    unpacked = array(typecode, data)
+    if sys.byteorder != "little":
+        unpacked.byteswap()
+    return unpacked
+
+
+def _load():
+    global _tables
+    from fontFeatures.shaperLib import UnicodePropertiesData as data
+
+    values = data.VALUES
+    packed = _unpack(data.RECORDS, None)
+    width = len(data.PROPERTIES)
+    records = [
+        tuple(values[p][packed[r + p]] for p in range(width))
+        for r in range(0, len(packed), width)
+    ]
+    _tables = (
+        data.SHIFT,
+        (1 << data.SHIFT) - 1,
+        _unpack(data.INDEX, "H"),
+        _unpack(data.BLOCKS, "H"),
+        records,
+        (None,) * width,
+    )
+    return _tables
+
+
+def unicode_properties(codepoint):
+    """Returns the properties of a code point as a tuple. Code points
+    outside the Unicode range (or ``None``) have no properties."""
+    shift, mask, index, blocks, records, missing = _tables or _load()
+    if codepoint is None or not 0 <= codepoint < (len(index) << shift):
+        return missing
+    block = index[codepoint >> shift]
+    return records[blocks[(block << shift) | (codepoint & mask)]]
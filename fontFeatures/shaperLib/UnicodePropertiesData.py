@@ -0,0 +1,303 @@
+# The following tables are generated by running:
+# utils/gen-unicode-properties.py > fontFeatures/shaperLib/UnicodePropertiesData.py
+
+PROPERTIES = ('Script', 'General_Category', 'Joining_Type', 'Joining_Group', 'Indic_Syllabic_Category', 'Indic_Positional_Category', 'USE_Category')
+
+VALUES = (
+    # Script
+    (
+        None, 'Common', 'Latin', 'Bopomofo', 'Inherited', 'Greek',
+        'Coptic', 'Cyrillic', 'Armenian', 'Hebrew', 'Arabic', 'Syriac',
+        'Thaana', 'Nko', 'Samaritan', 'Mandaic', 'Devanagari', 'Bengali',
+        'Gurmukhi', 'Gujarati', 'Oriya', 'Tamil', 'Telugu', 'Kannada',
+        'Malayalam', 'Sinhala', 'Thai', 'Lao', 'Tibetan', 'Myanmar',
+        'Georgian', 'Hangul', 'Ethiopic', 'Cherokee',
+        'Canadian_Aboriginal', 'Ogham', 'Runic', 'Tagalog', 'Hanunoo',
+        'Buhid', 'Tagbanwa', 'Khmer', 'Mongolian', 'Limbu', 'Tai_Le',
+        'New_Tai_Lue', 'Buginese', 'Tai_Tham', 'Balinese', 'Sundanese',
+        'Batak', 'Lepcha', 'Ol_Chiki', 'Braille', 'Glagolitic',
+        'Tifinagh', 'Han', 'Hiragana', 'Katakana', 'Yi', 'Lisu', 'Vai',
+        'Bamum', 'Syloti_Nagri', 'Phags_Pa', 'Saurashtra', 'Kayah_Li',
+        'Rejang', 'Javanese', 'Cham', 'Tai_Viet', 'Meetei_Mayek',
+        'Linear_B', 'Lycian', 'Carian', 'Old_Italic', 'Gothic',
+        'Old_Permic', 'Ugaritic', 'Old_Persian', 'Deseret', 'Shavian',
+        'Osmanya', 'Osage', 'Elbasan', 'Caucasian_Albanian', 'Vithkuqi',
+        'Todhri', 'Linear_A', 'Cypriot', 'Imperial_Aramaic', 'Palmyrene',
+        'Nabataean', 'Hatran', 'Phoenician', 'Lydian',
+        'Meroitic_Hieroglyphs', 'Meroitic_Cursive', 'Kharoshthi',
+        'Old_South_Arabian', 'Old_North_Arabian', 'Manichaean',
+        'Avestan', 'Inscriptional_Parthian', 'Inscriptional_Pahlavi',
+        'Psalter_Pahlavi', 'Old_Turkic', 'Old_Hungarian',
+        'Hanifi_Rohingya', 'Garay', 'Yezidi', 'Old_Sogdian', 'Sogdian',
+        'Old_Uyghur', 'Chorasmian', 'Elymaic', 'Brahmi', 'Kaithi',
+        'Sora_Sompeng', 'Chakma', 'Mahajani', 'Sharada', 'Khojki',
+        'Multani', 'Khudawadi', 'Grantha', 'Tulu_Tigalari', 'Newa',
+        'Tirhuta', 'Siddham', 'Modi', 'Takri', 'Ahom', 'Dogra',
+        'Warang_Citi', 'Dives_Akuru', 'Nandinagari', 'Zanabazar_Square',
+        'Soyombo', 'Pau_Cin_Hau', 'Sunuwar', 'Bhaiksuki', 'Marchen',
+        'Masaram_Gondi', 'Gunjala_Gondi', 'Makasar', 'Kawi', 'Cuneiform',
+        'Cypro_Minoan', 'Egyptian_Hieroglyphs', 'Anatolian_Hieroglyphs',
+        'Gurung_Khema', 'Mro', 'Tangsa', 'Bassa_Vah', 'Pahawh_Hmong',
+        'Kirat_Rai', 'Medefaidrin', 'Miao', 'Tangut', 'Nushu',
+        'Khitan_Small_Script', 'Duployan', 'SignWriting',
+        'Nyiakeng_Puachue_Hmong', 'Toto', 'Wancho', 'Nag_Mundari',
+        'Ol_Onal', 'Mende_Kikakui', 'Adlam',
+    ),
+    # General_Category
+    (
+        None, 'Cc', 'Zs', 'Po', 'Sc', 'Ps', 'Pe', 'Sm', 'Pd', 'Nd', 'Lu',
+        'Sk', 'Pc', 'Ll', 'So', 'Lo', 'Pi', 'Cf', 'No', 'Pf', 'Lt', 'Lm',
+        'Mn', 'Me', 'Mc', 'Nl', 'Zl', 'Zp', 'Cs', 'Co',
+    ),
+    # Joining_Type
+    (
+        None, 'T', 'D', 'R', 'C', 'L',
+    ),
+    # Joining_Group
+    (
+        None, 'No_Joining_Group', 'ALAPH', 'DALATH RISH',
+    ),
+    # Indic_Syllabic_Category
+    (
+        None, 'Consonant_Placeholder', 'Number', 'Syllable_Modifier',
+        'Bindu', 'Visarga', 'Vowel_Independent', 'Consonant',
+        'Vowel_Dependent', 'Nukta', 'Avagraha', 'Virama',
+        'Cantillation_Mark', 'Consonant_Dead', 'Gemination_Mark',
+        'Consonant_Medial', 'Modifying_Letter', 'Consonant_With_Stacker',
+        'Pure_Killer', 'Consonant_Preceding_Repha', 'Tone_Mark',
+        'Consonant_Killer', 'Consonant_Head_Letter',
+        'Consonant_Subjoined', 'Invisible_Stacker', 'Register_Shifter',
+        'Consonant_Succeeding_Repha', 'Consonant_Final', 'Vowel',
+        'Tone_Letter', 'Consonant_Initial_Postfixed',
+        'Reordering_Killer', 'Non_Joiner', 'Joiner',
+        'Brahmi_Joining_Number', 'Number_Joiner', 'Consonant_Prefixed',
+    ),
+    # Indic_Positional_Category
+    (
+        None, 'Top', 'Right', 'Bottom', 'Left', 'Left_And_Right',
+        'Top_And_Right', 'Top_And_Left', 'Top_And_Left_And_Right',
+        'Top_And_Bottom', 'Visual_Order_Left', 'Top_And_Bottom_And_Left',
+        'Bottom_And_Right', 'Top_And_Bottom_And_Right', 'Overstruck',
+        'Bottom_And_Left',
+    ),
+    # USE_Category
+    (
+        None, 'GB', 'B', 'FMPst', 'VMAbv', 'CMBlw', 'VMPst', 'VAbv',
+        'VPst', 'VPre', 'VBlw', 'H', 'VMBlw', 'O', 'IND', 'FMAbv',
+        'CMAbv', 'MBlw', 'CS', 'R', 'FBlw', 'SUB', 'MPst', 'MPre',
+        'FAbv', 'FPst', 'FMBlw', 'MAbv', 'Sk', 'S', 'SMAbv', 'SMBlw',
+        'VMPre', 'ZWNJ', 'ZWJ', 'WJ', 'HVM', 'N', 'HN',
+    ),
+)
+
+SHIFT = 7
+
+# One byte per property for each record
+RECORDS = (
+    "eNpN2ol3Vdd1BvB773tPw9P8ZiEJMJMtKEhCbjzENgEk1CFTmzZt4wytHJK4Bge7UoRkhCQk"
+    "oaERAjmuHYOdxCG247+y957fXRitxdpr73P2/r69z3DPOY84jrK/OCEKRJEoEW1EO9GR/ovi"
+    "uDOKkihJyoxdRHcQSc+TmFnPXsY+xn5iIM6A40oUFaJCnDtUiOoTvNQ9qXGvMxIFeMVGiFJC"
+    "oiRKSVv+V+LQpktb3kUq7YztjO14tovZ3gyiQ5cOUTqUp4NDRwfBr0PNOrl3auvk0Cn38kCe"
+    "Ow2Jsi5l7mXByqKUVanclxDa+gqhdPViKhJtCWOiIEk5F52hchAS7gn0BFBSDoklXbooWdIV"
+    "YJOuvkKSiUauJbmxQGRat5jduvTA69GzJxiLPUrXI7Ee2fYg3yPpXon1SrqXQ6+efYD6xOwL"
+    "XUp92lBKRa4VVKkYRFdeSELM/tS9GBf7W2mMpK0/9WuLkky0pyJt64jbs7aOpCPTOgulrK2c"
+    "tmXGYmfoUihnoqvQ1d/3ZA52x8UgCt0GoKff6uhX1n5FHugLE3oAiYE0ZjFpG8BlAJcBXAag"
+    "D0AfQGkAiQEkDFVnMJaCMaWUOfREvQPQB4pgK0TvExLFVKhg5leI+yooVXCp4FLBpYJLBYkK"
+    "EhUkKmqGS3sFiYpKVJDItN64vyL3ipplxr7CQAWJKvQq9Cr0KvQq9KpKVJGoIlFFoopEMLa1"
+    "V5GoAqoiUTUOVQWpGrFqYBZEZ9xfQ6JmVGq41HCp4VLDpYZLDZca9BouNcyCaCdKREdnDbMa"
+    "njXMakalZuerI1FPEfrTdQC9Dr0Orw6vDqgOITN2xV11SdeFrucxLby6pdaA0JBmQ5oNQA1A"
+    "jZBm0Mq0FK8BPWid7Q14DUk3wqxLGmAbat0w6xrya5p1TehN6E3oTbOgiUQTiaZaN5FoQm/i"
+    "0lTBJhLNgB41cWkikRkHogqgqAW2BbYFtoVSC2wLbNazEre3wLbAtkLoXJRbKt9S+RYSmUM1"
+    "rrbUumUZtgxAC6VBJAaRGERiEPog9EHBBsEOynbw6fVeHoQ+aIINIjFogg3mQOp5KMQMItc6"
+    "kuhQiEkUgkjXYGgrR4fskZmxpkudKBKVVOShA1A0BGEIwhCEIQhDEIYgDIX1Hrr05T3L0RC8"
+    "IXiZiIgike7mQ4CGfWWGzaXhwlMiYoyGM/dCeVgJhitEFqVQ06U2bKEPO9QMO9QMt7JYHUEU"
+    "O4eNw3AgXwoiLg+b84y5CMZ0NIfDMPYOhzTLGaVyFLT0CJUFawjWLMg1qo9AGDHuI0Z6xEiP"
+    "CD1iiEcgZKJW6B4xXzKtFXWNmKaZsS9pBNHVHLGpjijBiPJkIiVDi7OetTSKmh02qQ47zRxG"
+    "8YjRPJoLn+Sjgh01oY9yf4b7M9yPOfAc43dMl2P8jjtYHNd23AAcNwAnGE8MBnFSXU6q0kl1"
+    "OakuJxX5ZJpDJYl0iU5xOMXhFIdTHE6FnuVndXlWl2d1eVaX57Q9p+05bc9pG2Uc1WVUJUaN"
+    "2Kieo3lPq3HUMhy1KEcN46hhHDV+mTaYaj67mTgUt0bDUutnDG0VodORHlXBUYMzahMftT2N"
+    "GulRO+1py8IJPjndkRvDsel0IRy3TjucnHb+pEWnO2kOWKfrRBiVWJd+onTGN/yMupxRgjNK"
+    "cEZdztiaM9FM6pkYSgazLsVCdyaGCjV+xTNhbR46Y6KckeYZGf0NhEwMEyNRcpbxbNhmiHIQ"
+    "Q4zpvD7L/azVf9Z2MUqc434O63MW8zljdA75c0iM6Tlm3MeyxVVsjllcYxLLtKG4lYnD8dCY"
+    "FT4WRmx4TLAxQGPKMwZozGQYC1teEBVdCrRCoXtMDmM5F+NedBkZ5z4OfdyUGsdzHOtxm9w4"
+    "EuNIjCMRjN3lcftZ0HqIYue4STtu/DLRlXSNm0vjKNEiIh4PZR0h4vGw5R0OonCEMZpAdwLd"
+    "CXQn0J1Ad0I9J1RwAt0JdCcwm5DKRFjMHROWxQRKExbChFlwXszzEM6rxHnu54U+j0tmPJKU"
+    "zstokt8kLpMcJqFPWtqTKE1yz4zF4tFJq3jSUWUyD4bZ81bV83a35w3j87pMFL6+OPR2p+lE"
+    "3UlbuDikWnBwjSjkWhQ7T8QONcEvKsZWY3v9SbCUS8lluZiu8KPRM8WBYvxMdCy2NceHiKGn"
+    "LuDHXbkLzvAFF/6CC3/BlbsQ2+cTO3R2m4/Tbcaq4pfwS/glYiZ/q8s3ykT4TOTvBUmSay5G"
+    "LueJy3nSxq/NnbLNHGwT07cqecGB4AXuL6jnC8Gh60WT70V1eRHrI60gXlLPl7S9THs5f1Kg"
+    "HeH+ch6F8Zu50POb2l5hfIXxFSReZXyV8dXcaDK0a2tnfI32GoKv2Yxf03bBFL5g0l5wLLxg"
+    "ml6wqi6YphdMzAsoXfCJ/FZfNjBJJoaJZiZKjOHY+y1AF51GL1qbF8FeBHTR6eIioItuLxeh"
+    "X8zd82uuC1W/0O7FySVtlwS7ZC+/lPYcjtsvOdRcEuWyLpelclnSly21yz4hl63+yxymkJjS"
+    "ZQr5KeSnBJuy+qeQnxJzCsKUpT1lS8+0vu5GEH1B6+rumsqB5EBLRgzqNKBpQNM+Z0T7NIRp"
+    "CNMqOO0TMh3whoiBaXvWtBympTkNb/ppvHBWzI5wPhpXwF6Bd8XX8ArYKz6KV77umX43rxiO"
+    "K4JdEXpGDjOCzaA7I8qM0DNKN6MSM2brjBLMKPmMzXhGKjMOlzPm4IxUHCeTdOyDGAnCqko8"
+    "oyUexxIPZ0mnHcXzTeJVLPEml9jIEq+MiUfKxEaWxN6ePEQmL+dvXZL+O1ppkLCVlGwzf6/t"
+    "H4h/zIUu36Z9m993aN/B5bu076rn92jfyzUO37etfV+a/6TLP+cC3R/o8gNd/kXbv+ZCsB/q"
+    "8kNd/k3bvxP/QfwoFxx+hPzrjK9L83XGHzP+mPYT2k9oP6X9NNcE+xnjz2j/SfuvXOg5axLN"
+    "ZtOmtzxrEs2aRLQOonvWQTATpbg4a4nO+nzOmkuzzm6z8N4A9AagNxh/zvhzxqvOrVc9E17V"
+    "drU3bysFo+Pr1Up4LbxaCc+EV83rX5jXv6D9kvZL95xf0X5FexPQm4DexOXNCq2iDaX/RuIt"
+    "A/eWgXtL2zWUrgl2TbBrXkqJ/mumxvVcCHbdTL4u5vUGYT1ch3A9XzmA3ub3dojZ/nbHU6+h"
+    "ya+1/VrPG7jcwOWGthvBr/uGxG5I84ak3+HwDod3rId3tL2r7d2+XAtd3gX0biXXdKmESvyP"
+    "Is/5EM3Z2efsL3MOPHM2qznzbM7MmjPP5sK38cSc8ZtLgY5FJ+fsPXMeLbhH/CJRgnY8OjUP"
+    "bx7ePKB5QPM2wHmb4zy8eejzvobz5u489Hn3Kj2j30jsN779C4AWTP0FQAuAFrwzLLiTLMBb"
+    "cEpfsCwWQir9CxJbUOsFBG/6tN4U7CZKN1G6icQi9EVpLkJf5LAoyiLYRWkuSnPRdWDRdWDR"
+    "aTsTJ+LqYh668JSIF93qFpFYRFfPRJdk0ApfQmIJiSUklqAvQV+CvoT8EhJLdo0lz8pL0Jcc"
+    "QASLhI4Ei94D9B6g95C4xXiL8RaEW0jcUolbuNzC5ZaMbvm43ZLYMr/lMHeDKKVC6GWhi/yW"
+    "c6GCy4CWhV6Gt+wGthzSPLGsusuOVMvy84ZUvC2/27K9HWJGt0NMoi263Qg/VgWtSJSCKOpS"
+    "SkKXdHXc9pySaS3BqnHQegtBS/9uK3Jm7NbWXYhWpLkizRUZrUhlRelW5Ldirawo1oo5uKIg"
+    "KwqyYoasGJwV1aVFK242KyqxYktYxWwViVUkVpFYRWIViVUkVt3jVhV5FZdVI7aK4CpKqyhB"
+    "SFZRWkVpDd4avDV4a/DW4K0BWgO05kloDd6a3NfgrcFbk+Ydoe8IfUfoO2LekcMdUe6IckeU"
+    "O1+7ZwLPdcHWBVvnt85vXbB1rNcBrQNat8bWMVuX+7qYG4JtOL5utFLR1QxaPLQhyobQG4Jt"
+    "QNgIW1dxI49i9W8IveE7vYnuJoRNwTa5bwq2KfSmVDalsqkEm+huqsRd19W7niXv2n7v+obf"
+    "VaUteFvwtuBtwdsycFuAttw7tuzCW3a+Lcf6LW/+W+4PW0hsIbEl221A24C2AW0D2pbYtsS2"
+    "ff+2JbYtsW1TcVvMbeR3xNzhtyPKDoQd2++OXWpHDjti7iC/Y/x2vAvv2LaJaEeauxB2IexC"
+    "2EV+F9CuYLue9HYB7QLatTXv5sGE3pUKLfFKnPwv8dtcaPutc88eEnvw9qDvobSH0h7YPbB7"
+    "arYHaA8sEe8Zjj2T7x6ge0Lf8/Z0z+vPPaHvGaN78O5BvwdvH7N97vu67PPbz7v4zO+bE/uG"
+    "Y19BMr9qUt03DvuY3Rfzvpj34d0X+r6Y96V5X5T7JsN97g/4PXBTfMDvAUoPpPJAzAfqcuBn"
+    "lgPb/YEvwoHvyoHvyoEPyoFj04GP6YEPyoGPxkHgEh3kMf1Yc5B+HzrjqM74Pp7ve+V4n/F3"
+    "jL+jfUD7INzjuojoA+8h/6ftQ8w+xOzD7OMWRx+GazWRBGOaUSb6CkFUUoHSR6J8ZC/4COzv"
+    "GX/P+DHtY7Af6/LQxHzoeP4wN3pqeegm/JD7w8pTDtGjevjQZiIt6yOsH/l9LDOmpXsk2CME"
+    "P7FnfWLP+kSwT3T5FIlPXWJovZ+G96wyY/enuPyB+GP+8sX9T47nLwaH5A+C/Ynw8pV4FUv+"
+    "SHyWC2l+Bvaz/P8FyTb2muYGHZXU7M+0P+cah2/QHov5WCEfg31soT/2DfiLLn9B93Pa5xw+"
+    "1/NzF/4vtH0hyhccvtDlS21fuud8mRutdz9pJX/NhTvJX7l/VQ53kq96CBexr+raRPlKRi9J"
+    "00tG9P/j7xfT"
+)
+
+# Block number for each block of code points (little-endian shorts)
+INDEX = (
+    "eNrt2mVwFDEUwPF/Cm2hlApSaKni7u5a3N3d3d3d3d3d3aG4u7u7uxNurjC0Qznm6E2hb37z"
+    "Ntlkk7zJzu5+WVBYEYawWGODLeEIjx0RsCciDjjihDORiEwUouJCNKLjihsxcMcDT7zwxoeY"
+    "WixiE4e4xCO+QQISkojEJCEpyUhOClKSitSkIS3pSE8GMpKJzGQhK9nITg4tJ7nITR58yUs+"
+    "8lOAghTSClNER2GKUozilKAkpShNGcpSjvJUoCKVqEwVquqR1SyiuoXW+f/VoGYAtait1aEu"
+    "9ahPAxrSiMY0oSnNaE6Lf0pLWv1Gawtoo7WlHe3pQEetE53pQle60Z0e9KQXvelDX/rRnwEM"
+    "ZBCDGaINZRjDGcFIRjGaMYxlHOOZwEQmMZkpTGUa05nBTGYxmznMZR7zWaDnWsgiFrNE15ay"
+    "jOWsYCWrWM0a1rKO9WzQPRvZxGa2/GQr2/RxO34m2sHOAHYFavkTu9ljtNfkHMy3L4i+/UYH"
+    "OMghDhvajug4yjGOc4KTwerUT2enDc5wVt+9kOEc57nARS5pl00acYWrZt0rX67p+OY6N7ip"
+    "y1vc5g53ucd93f+AhzziMU94yjOe88LoJa8CzfVaxxve8s6Q2Xtjhh90fDTWP/GZL6B+jFHK"
+    "SoXR52GVtaHVRtmqcCq8slPfcougfPFnryIqB+WonAxtziqSLiOrgDnIF0iETFGUuTNE1TO4"
+    "qODKL5qy/J5E/76mqzLtfeV/vZsKuv9viGH2jrgrP4QQQgghhBBCCCGEEEIIIYQQQgghhBBC"
+    "CCGEEL/iofzwVF7y360QoZC3EkKETj6yB0KE4uf/K5rjdvY="
+)
+
+# Record number for each code point of each block (little-endian shorts)
+BLOCKS = (
+    "eNrt3QeY1EQbAOBpOeSAox1NSgBBUIoKAirFo6MrHQsgig1Fmh17QxS7/ip2bFhRQbFgR8WC"
+    "HUWwoajYFUUBBSz/NzPJZpJMtiW7t3e39z6TTGaSycyk3F7KHkLhfjAiArXGDBkwLIJQTUxv"
+    "p0HEHEViLoKqZ4DBcgYqRjUg1MwAg3UbEML/1BJtl0ogXgzD2qgOlF0XYnyqCNUDxai+aG0x"
+    "KoX8BjDk0m19Q890uu0u8qVUz3GIYo5wwb0ud4o9rB7Pqa7NqelJ95atK89JqQl7gF1ObUt1"
+    "1Ejkq8Mo+sldWvWcb2+1p2tq+k6tWbLlylPtDJdr7NPEp9jSJEBxAk65Ttr2oIkorzipppVc"
+    "M9RchCaohRiboCWMOQIppqUF9EUzkdJMpMogl07G1KQ1j0Qza+iU2EwTWqHWgUEtaYd4e5xS"
+    "22RZ2yxrE0HYEbUDfG9ph9qDNhGVm1pIlNs2x3WJPphopwjxI3Vn1EHRMXIdUCexns5gFxjv"
+    "mjW7QegiYs7Q9OiaEe/SXYCptXtcN9Rd6AH2gDNhD7Qn2EuLoJ5iPoJ6od6oj6VXPNicnCB7"
+    "ozKXvmLYT6u/xgCNgRZZUl9hkDUuS6JvCsoi1DdgrWXxIHMHQnC3fDAa4preB/Cxk8qX0/WP"
+    "XPMQUIb2TSCG9kND0TA0XBgBRgrDLU5suCttRDxvBCydiRiQJQRtoeRbUe1hZ9q77KgIjdYa"
+    "JVoTZIzG/qEd4HMgOAiNFcaJI/8ANB4cnIYJlkPisQm+NDWPr+XQhEw0ER0WN1FMqSlqnsyf"
+    "iA4XeNlHQDgSHQVBOgpNguEk4Jzf+qTkaIGfy45xnb3k+dEpbbLvTKg7p8kye1vnPe/5L9HZ"
+    "kDs24JwbrFvaSzimCFPRtKSmR2YGOg4dj06A4YkQTrLMsBxnOVnknoJmolPRaWCGmMtbFq8Z"
+    "T+fXVk7XOAOdmbAVZ6Gz0TnoXNi253nwo1Mdn5+imGZaHut2Ct+TZqEL0Gx0IYSLLDz1QjAH"
+    "XAwuQZf6flvPjsfsknnN7KUv0+DzXQ6uUFwJ01ehq9H/xFLXgGthfJ3CPjvZcT6em6KYdlod"
+    "8rVeD+EGdCOEm4DdqpvBLYCPb7XS5nn6QC3XfS69TeMadDu6A9yJ7kLztZ+A7gb3wPhen5hr"
+    "fF+KYtppNZWv9X70AFqAHoTwkOVhaPfDYCHkLgCLxHyPBHxus/Ga8aV5/FGNxegxTy/dhx5H"
+    "T0B4UjDREvQUehrGz3jwedXxsymKaafVVF7X59Dz6AW0FMKLFp76EnpZ7P/L0CvoVU9Ll4LX"
+    "4lN2mbxm9tKvayyHed5Q6PrwTfQWDN9WyJ6y43L8jpX6joi9E4/FfDF33M9e77vgPTGU0yuE"
+    "Oeh94QORttJV03cT7gsfaqwSVis+guAs8zH6BHwK4888Yp7xmhTFUpgjhj5HX6C1wpcWU0x9"
+    "BUeBTP/a07q1aB0MnRK+EUNes3Uix0Tfarj3/e/Q9y4/oB/RT+hn9Ataj371iHnGv6UoljSV"
+    "13UD+h39gTaiTTCUTDG1CdrPhxvRZk/75TyOP0WpvGZ/AZ6yRcNEW8G2wH3mb/AP+hf9x2/l"
+    "uMSQexzlDwEUM8EARcBE1TA3B22Hueq4GNfAdj1rYo7hWi6yZnJpE5Vgv1o+NXBNhYlq4zq4"
+    "Lozr4eTkXlQfp0e3BE/zlyXbWhpvdQPMNQSNcGMIPKUJ3h5CU9wMQgOsbsvm2M8upQUOPG/g"
+    "7GmJW+HWEPhQ2gG0ideForbY1grvCPntLO3xTnhn3AF31OgATBSVTrgT5kMZk9R4arwlSJ3x"
+    "LnhXCHwo7Qa6wLgr3l20oRu2mag7hB5Y2gPvifeC6Z7Yz661XG84vXBvoY+wd4AyEbi+oEzR"
+    "T6O/RhkegAdCKMOD8GA8RIR98L445oViOBp2C/fDQ/EwPByPgKE01DISjxJ5I8FoPAbvDw6I"
+    "O1DroID09JmoDLsNcE3JfGcblCCJx6Pb+8fisMZpjAcHgwngEBHjDsUT8WH4cHwEPhIfhSeB"
+    "sfhojWPwZHwsmAwxdQ28VF6iveZJVhnj8RQwVsRkfEo8ZWx87cEtmARLyVpOUUyEnCna+vFc"
+    "3r6pYFqETDRN2bIyPh1nA0EzrNhxVdzxecdETsyJO3mJ8rO9/vJuTzbam+v+iKZOJjoBcyf6"
+    "nJQieZZJtqaTNdTfH6fgioPXdyZ28OlT8WkFBZXQ6fiMFOY6E5+VgbPxOdZZ4Fycj+SzqOdh"
+    "zpvn/vx7PuZmJXQBno0vxBdpPnXPwRcLlyR0Kb4MXy7q5C/hCsxdmdBV+OrAT/z/w9w1GjEk"
+    "xya6Fl8XuPxcHIXrk7oB3Ihvstws3IJvxfPwbcI8cDu+A+a5E9yF5+O7YXgPhHvxfTC8X3jA"
+    "Gi/AD0Iar/9D2E+94vcw9lPzF+KFeBHgw0fwo5hPL8aPCY/jJ/CTGmr/LcFReAovyRn39n8a"
+    "254BUZT/rGsd+XRG1O3/z+HnQzDRC/gFvBS/CF4CfOplwS5/GV6GX8HLFK/i1/Dr8fzlVuwN"
+    "/AZ+U+OtlLytJe5BYJv++YN3cXbY5b+HbSsEGXtP8b7LB0DdPiux34dW6avwKrw6pI/S8jH+"
+    "BH+KP4Mxr9savAZ/njVfKPj0Wvwl/gp/Ddbhbywm+hZ/h7+HwIfSD4APv8M/xn2Pf8I/x/2C"
+    "1wPegl/xbxrq/qHLV7fPBqz63TXF8xM9m/sHTvb0rpl1GzG3CW/GfybwV2hb8Fa8Dfwt/IP/"
+    "xf+JV2f4rZBtmBBKvEvEECOMGBpFpFpcEdmOVIdgk/FiUgOCqqZPkVCLlJDapI5L3bTUI/VB"
+    "KWlAGpJGMC4ljUkTkcZzt9doai3ZDDSPSAtgkpakFWgptBKhNdgBeLd7GyK1jciOoB1pD3aC"
+    "cTuyM+ng0hF0Ip2teuxCbLtqyCNPlrubRpcQuip2B/onqtWrkNnglNyNuHm300yBoO7kVGSb"
+    "KZ4JsuM9yB4ue1r2Ij0tvcBM1Jv0Jj1IH7C3spYo3xFxnttvq3nvI2ot4/wpwXUsI1G0NLo2"
+    "lM9bIX2JHSuv96EqYijvdwezEfxv3AS/x2N63vQR99zTWD6K8k3l7SQzzfL9ZfnL70fcoss3"
+    "XfXrR1rAVAshKN/Jc+rq9I07399+me+0UVe+6X3oxVIX9ScDSF0YV4sbSPgVnDqoAWIwtMfE"
+    "YxAZLJaTsC9flmDHawBivQ8t35zWKRJz6nIwGhJfm4m6WeoqSuEsy/ugHtqH2PYVYmQ/MlRM"
+    "1xNvKJfGyXezeX3MBOdu+wmOsBJ/Pk/014Nkx/RzzUxSPr+jPozY99ZlrD6MufpKzM4rslI4"
+    "eyl7yWbWmL/JKvPl8nyqPrI/jdRHch0yrwjZ5Po4vhY+T00IpUkMJ1HgZ0I7XirWbfePUz+n"
+    "repUkW9Y4snLXJFSbhRlFfh5+4kf9Tyku43cJZTkvaIc703R1z97ZYeVzvWXsCWUlpN83rcr"
+    "Szsqn6KUz0QjyMisGOUxslKr7O0r8BpNxgSG/UMYmfXjkddwVCi6Nidb5oAqblRBwJ4TFPKj"
+    "plGUk4vff6nXyDt3tPUQ36gQuozK9/viwCw7KMvGknEQxorxOGtqnJJqT9lD23jAcw8mEypF"
+    "mEAOUdiphwo85jzRMJFIh4nh4RGKocOV9cj4ESS33E/3HEmOIon+ep5E0n/u3C3x8/nZn24X"
+    "kn1F3rkqL2PqVXqHvAfAh3a+vA9guIIzfxPtVfuBRJZjl8UCrvtzJeJbRe1vVlXDQBLF8y9H"
+    "k/RltlT5irL9Bfm1DdO/vujA8ePsGNKTTCbeo8y+mu0/+viQ500mXva9p2PJsXCkO9/jWRKf"
+    "m6+LWFc6p5CKw74jx785dCqZCikDybQKiJ+Zp5PpEHP2lBkkG0xUkd+ONF3Xk3XHT9j+ye59"
+    "hxKUbE84LhQz8mvq/rISX78PV/+SHNwTCHf/4XiSTdkuPxs1jtYJpKA8lfcdqRNJqk4iJxZU"
+    "IfI36Mkkl/y/wU8h0ZqpOBWcVqB1OjlDSDbfmRo8PdW/z7L53eNnEfl97u3R2UR37edsUkYy"
+    "LbsMluVlnEPyx7ka54HzFd7+L06L/n9TJHtmvDyf726c4Kl13fzuFtXOsB3u/xyT2v9d8f+f"
+    "GL595FgG9/ypXwORz+vK9jQWPVI7bhaZRS4gs4TZ5ELLRfFYauaAi6GcOeQSy6XE/3wW/7xB"
+    "PX+nXUYyd7nFmb4CeOe6glxJriJXW3zvz5NryLVJXBeBueT6hG4gN/rqdhO5idysoc5zC0nu"
+    "VjDPcgbi+HgemYZmoNuI3+1pusNyZ9xdAkHzyd1puUe41xrfQ+4T7icPBPw+WUDCXNvgHiQP"
+    "kofIw2Rh3CJBjYf3CHkULAaPgcfBYvIEeZIsIU+RpwOZcDZ6hvjZd3eeJc8S51vMDsbPEf93"
+    "m+m+v8zJjaHnieOFSCwlLwovQXgZ8Ngy8gp5lbym2YqvE245ed1jOXlDzP0m8eNtf4tIyb6d"
+    "7m1rjncIN1V8Zxv/Xrd3ifx+uPdIdq0g70NYQT4gKwGPrYSUlWK4gnxIVokQQ+lZTVaTj8jH"
+    "4BPwqc9nZA35HIZfkLXgS/IV+Jqs0x5F3vt7yabTu/+Xnf/G5fzfK/XtS/vdRP4bPP7+KM5v"
+    "n5Jgctvqtu83Hl+Az8VwjRiuJd+S78TW/p74qXvSD6QgCkFHamal5K6+P5Kq7acq7ueCSosf"
+    "35W1XVEZ53oqLmiuX4jNSVtPfiXrNX7Tpkp8KTUup9Wh1yBU8W0gySTbSoMKKiH+JPcQlFh5"
+    "1zHXe597vx8S+vwWtJ7frZ7vl8QirOJPzS9yfT9YomX/IH/A3BvJRrIJJHuvwClf2iSWkvFY"
+    "vB4bfcsswqNgDfKZeT7fZiKX8La/cBbx72l/ErtnNxN1C48S241P/0X8ZJ9zPDaWpG80LDmG"
+    "bIHtu4WMy8BoWPcY6y0OZ6/ZSvy2ka1Zsw1E8VeYNyW1abnsZrIZ+mELGUl4jL+hob4/ojsj"
+    "/Ek4O/dvoheck0iqS8n5ks2dqH52fliZtLLic9pvn1+l/Um2yPL979/8kzP/Wv5Lypkr0RtP"
+    "skX/RfrXiF/23nzqh2IFKPMvLpLLY5ptievfD4U5HmOI0HDsH3/NZD5LytCkOKUU0ehUi3PK"
+    "345mLoaq0+KI2PXxptegNeOysf/XotEqiVjtLKsTAu+/utRP7d96NBp2efVpNOzySmm0vPtX"
+    "A5ob+r27IW2kFUONaCLefDkdQ42pTlB6UL6cljVsQnMj6PjfnhbkTrj+T2X7pXv+H08c7qmo"
+    "6ErNn89/TalDTrvToiRLttcrh83SEEPNaQsPMy0tQSuX1qF4e3MH6pXt7deGpkLO5yzVltp2"
+    "TEM7hSynPd0pA049dqblvf93oOF0TJO93k60k5julIQ9b7Z0prvQXYGJdoOY81xTF9qV7k67"
+    "Qb4UQ+5xJni53WkPYK9lD7qnj3v77EW93Pk9aaZ6gd60T8b2FsLuf2XU1pf2g9AfAo/1owNE"
+    "TLLnGUDV+Z3l+JIDgd2vg6g0mA5x8T+/tg/NHbnGfakqlgbx34yp29CUOO0dRt2G0xEijBDj"
+    "4da0k8qHnitSVAraoqOoNBqMofl+/Wd/mm9y2/4DaC4Er/9AmgvudR5EHWPpuNDGQzhYmOA7"
+    "wxxC/dS6HEr9JloOg3B4GmSJR1DbkVDCUWnwbptJdBItXCHOb0fTMGLoGBo9E02mk+mx4ljg"
+    "06k9o5DbfptC+yNuKs3UNI2pvrZOp9wMOj2p4+jxWicIJ9KT4tJp58lUOgWcHGCm5VRLlP18"
+    "Gj2dngbOEE63YjKFD52UMy1n0bPpOTTVd9vOpenwL38ePZ/OoheA2QlcGJmLLHMUdtrF9BIX"
+    "u46X0tRcpnE5vQJcCa7StP5q+j9wDb1W47pIzKXXQ7gB3AjmgpvozfQWcKsYcvO0W/tWkXob"
+    "TZe7lNupn5p/B72D3knvsswP6W7hHnAvjO8Dcup++gCsdQH1e9Aynz4E5vuOvYepbWEIi+gj"
+    "4FFNPy+mi+lj9PEEnojAk3QJhKcUTwvP0Gfpc/R58AJdKrxIX6IvQ85TEF8CdVum8Qp9VQQu"
+    "hl6jqdGfn16nbss1Ymg5Tdcbwpv0LfA2eIe+S9+jK+j7ig/oSvohXUVNVH5WU+kjIYZkcKYS"
+    "0ed/7OrpT6jfp5H5jK6hn0P4Aqy1fEm/Unr0a+qntn8dXUe/od9C2nfUjddeHX+fohjSTaup"
+    "JvqB/kh/oj+DX8SQ47VZT9fTOWgO+pX+Sn8TKRtctf1ZmdpAfwe8ZvbSf1DVRsGZ1m//TdSP"
+    "p8o8mb85Iib6k/5Ft4CtChNtE2vjw7/p3zDHPxD7h/5L/6OIYUYYZYwZwERy6FbEqrHM9//t"
+    "WLDqkSpmNSDUVNQCxaCE1QZ1WF1Wj9UXSuMaaDQEJmrIGrHGrAkIc/xvz5om0Cy05qwFBFPR"
+    "grVkrVhrSG3NdgBtWFu2I2vH2rOdIHjPzzszv0ivf7NgHUPrxDpD2MXC+7sz25XtxrqwrmB3"
+    "1o11Zz3SYtfNLi+sPViwPSOwl9BT0QvwtN6sD9sb4mVC34DW9GN+6vZbiIOktv37M78BoQ1k"
+    "g9hgNoTtw/YFgy0xth/kDXXVfxjzc/19j1OT6f4/nGWCb5kRbCQbxUaDMWB/cIAY86kD41vz"
+    "IOY3FowTxnvKzf31k4OZ34QIHMIOhTDRcpjlcHYEO5IdxSax8vzMF6WjWTjHhDRZ41ifoNpP"
+    "YVNd+B4hh9OYm0zxpyczPW4Gm4NmsONEXY5nx7MT2InsJHYyO4XNZKey0wR/DU9nfvl0/fEM"
+    "5qamnRmJs9jZEM6xiGs+7FxIOYudx85ns9gFbDa7EObJbP+9iM1hF4M5iovZJRG7lF3GLrdc"
+    "wa5kV1muZv+Lu5pdw671teI6NpddD+YKN4DrhRsjdpPi5gC3sFvZPHYbu124g90ZF7x/3MUS"
+    "m59znv1Xo3BXIXfuZmHdk/B8eC/zU/PvY15O2v2hPcAWgAfjTLSASQ+Bh9lCtog9IjwKdOen"
+    "xczvsZTI9j3OHmdPhMDr8CRL3UF4iWv6KfY0hGfYs+w5kH+fX55nqhiyhy9EZmnci1b7l7Jb"
+    "EJ/mw5fYy2wZxF9hr7LX2Ou+HlrO/NT99w3mkFNy+GYIb8WZ6G32Ngx5/B32LnuPrfDU8H3m"
+    "Vzir5c4HLLmV7EO2iq1mH7GPgXv7fcI+YZ+yz9iaQCb6nIX3BVgLvhTkur9iX0HK12wd+ybQ"
+    "txrfVaC/nk5J8k24q1K22uMjy+qkgtf+PfuhIG2V5W937kdWmZnoJ2bTt7+wTxUk8jOr6H4B"
+    "we1bzwqy6VeX33w2uObekFBh+0XF6b/fWUH+yP35/Q+2MWObAmwGf7K/2Ba2lW3TyKffb/n0"
+    "/yuqBnf//83CMNE/zM8u+1/2L/svr5lI/BNND7V/sJE5vjwxbNTQ7f/iwaIscv8UxVWzbGfh"
+    "Kbr6VTf8TFRsqExUw0iVU3K68xdkQ02jplHLKAmptkcdUFeop5FP7a9vhFMaUoO0NLRUnv2v"
+    "kZGP4v+5yGhibJ9T7t5pakjNApX39mtutDBM4xjS0tDfH2hltDIS3T9obRRUJb5v7DAKKoro"
+    "7x7ukMIeUlCRtTEkJ6ZOx9BW0tYoKMiU/CbsxPtg2xDnFLkWHku8Fvs7ub3pOxoFBX72/tHO"
+    "qIyc/T/ZPImWDVqe/93R3tgJ7GzURVJF/fu3pJLrYPiVR/vzdfs3zaL0y696+2d57x8lVUj2"
+    "21+ePdrR6GjIo8iZttm/pWze447P70/JVBRl5Opo6mSUv85Cpyp5r6k0RdlavqKfwUrT5l5+"
+    "GElffZS+8Osxc7SeVNsj+072od2Tao/6+1Ztibc1Zrm3R62xbs/wppgoivW4y9ftk5mvp2Ls"
+    "14X1VIb1yGM4k/NpUQZrKgrZxsI683udcl/SXbuI2i5V3K45lcu1+luauB/4cLe4xJ/anbWo"
+    "cZ28f/5Mo7Y2VSeopIrz91cXQ+Wd1glaSk11yi8j5Sd877Sr9H9/dzWyRZa/u6Hq5sLvr3Q3"
+    "/Ox7L12NHuX+NMYeRub2TKH2exnZ0dPSS8NZe++8f9qlj5GJvY0yS1+NivT8Sj8jc/1BP2OA"
+    "hl36wAr/tNMgQ+VMy5g33yuGBhsF+YFvzSGG1z4u0e8/+xrhxSKwn8vQeEuHGX727+7hxvDC"
+    "+ymR3WGIVok1pknvQFTe/inJ8J5MLvW2OLH0mPGhaQ2D53Lm7O2pgxrr7SpHV75/Pidf3xoz"
+    "QU0S1TZRu909aGa8fHZ1B+Xx/ENle74is/5LZY5w+WHbkOjsVVCxnmnKpI4jjMQ1zf35wb/+"
+    "VNtceP4rVcVxFfWYSnXOzPMr8xmp8pxXk7c0s+O/vHoqlfpl8/wV5fkx1f4tPP+fnc+fmZ7/"
+    "zDzZ+zPduxKXkcn2r7hnzGTvf5xAKrawx39517mi931F33+yvQ8Weqd8zwBVt+XZP/9Vhrsj"
+    "+b5lC/tottUNuXTF1rSgUku2/440Cqoqvv3/Dy4+MxI="
+)
@@ -0,0 +1,284 @@
+"""A cache of shaped words.
+
+Real text repeats the same words over and over. Create a shaper with
+``Shaper(ff, font, word_cache=1000)`` (or pass a :py:class:`WordCache`)
+and ``execute`` will split each buffer at spaces, shape each word and
+run of spaces on its own, remember the results, and stitch them back
+together.
+
+This is only done when it cannot change the result. Each run of spaces
+is shaped with the word after it if no lookup matching more than one
+glyph has a slot for the space glyph after a slot for some other glyph,
+or with the word before it if none has a slot for the space glyph before
+one for some other glyph; otherwise the text is not split. Glyphs which
+the space glyph can be substituted by count as the space glyph here. Nor
+is it split if a space can be deleted or ligated with something, if a
+lookup matching more than one glyph could skip over a space (because of
+its lookup flags, or because the complex shaper masks the feature on
+some glyphs), or if the complex shaper works on the whole buffer at
+once, as the syllabic shapers do. A word which starts with a
+combining mark is kept together with what comes before it. Buffers are
+not split while tracing or profiling either.
+"""
+from collections import OrderedDict
+from copy import copy
+import threading
+
+from fontFeatures import Substitution, Positioning, PairKerning, Attachment, RoutineReference
+from fontFeatures.glyphInfoCache import GlyphInfoCache
+from fontFeatures.shaperLib.Rule import _expand_slot
+from fontFeatures.shaperLib.UnicodeProperties import unicode_properties, GENERAL_CATEGORY
+
+SPACE = 0x20
+
+
+class WordCache:
+    """A size-bounded cache of shaped pieces of text.
+
+    Args:
+        size: The largest number of entries to keep.
+        policy: Which entry to drop when the cache is full: ``"lru"``
+            drops the least recently used entry, ``"fifo"`` the oldest.
+
+    Attributes:
+        hits: The number of lookups which found an entry.
+        misses: The number of lookups which did not.
+        evictions: The number of entries dropped to make room.
+
+    A cache may be used by several threads at once.
+    """
+
+    policies = ["lru", "fifo"]
+
+    def __init__(self, size=4096, policy="lru"):
+        if policy not in self.policies:
+            raise ValueError("Unknown eviction policy %s" % policy)
+        self.size = size
+        self.policy = policy
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.policy == "lru":
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, value):
+        with self._lock:
+            self.entries[key] = value
+            if self.policy == "lru":
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Forget all entries and reset the counters."""
+        with self._lock:
+            self.entries = OrderedDict()
+            self.hits = self.misses = self.evictions = 0
+
+
+def _looks_at_one_glyph(rule):
+    if getattr(rule, "precontext", None) or getattr(rule, "postcontext", None):
+        return False
+    if isinstance(rule, Substitution):
+        return len(rule.input) == 1 and not rule.reverse
+    if isinstance(rule, Positioning):
+        return len(rule.glyphs) == 1
+    return False
+
+
+def _nested_rules(rule, seen):
+    # A rule and the rules of the lookups it calls
+    yield rule
+    for lookups in getattr(rule, "lookups", None) or []:
+        for routine in lookups or []:
+            if isinstance(routine, RoutineReference):
+                routine = routine.routine
+            if routine is None or id(routine) in seen:
+                continue
+            seen.add(id(routine))
+            for r in routine.rules:
+                yield from _nested_rules(r, seen)
+
+
+def _sequences(rule, namedclasses, seen):
+    # The sequences of glyph slots which a rule, and the lookups it
+    # calls, match
+    for rule in _nested_rules(rule, seen):
+        yield from _slots(rule, namedclasses)
+
+
+def _slots(rule, namedclasses):
+    if isinstance(rule, PairKerning):
+        yield [set(rule.first_classes), set(rule.second_classes)]
+    elif isinstance(rule, Attachment):
+        # Marks attaching across a space are dealt with when segmenting;
+        # cursive attachment joins each glyph to the one before it
+        if rule.is_cursive:
+            yield [
+                set(_expand_slot(rule.bases.keys(), namedclasses)),
+                set(_expand_slot(rule.marks.keys(), namedclasses)),
+            ]
+    else:
+        middle = getattr(rule, "input", None) or getattr(rule, "glyphs", None) or []
+        slots = (
+            list(getattr(rule, "precontext", None) or [])
+            + list(middle)
+            + list(getattr(rule, "postcontext", None) or [])
+        )
+        yield [set(_expand_slot(slot, namedclasses)) for slot in slots]
+
+
+def _space_glyphs(rules, space, namedclasses, font):
+    # The glyphs which the space glyph can become, whether the space
+    # glyph can only come from a space character, and whether any of
+    # them can be deleted or ligated away
+    substitutions = []
+    seen = set()
+    for rule in rules:
+        for r in _nested_rules(rule, seen):
+            if isinstance(r, Substitution):
+                substitutions.append((
+                    set(_expand_slot([g for slot in r.input for g in slot], namedclasses)),
+                    set(_expand_slot([g for slot in r.replacement for g in slot], namedclasses)),
+                    len(r.replacement) < len(r.input),
+                ))
+    glyphs = set([space])
+    changed = True
+    while changed:
+        changed = False
+        for inputs, outputs, _ in substitutions:
+            if inputs & glyphs and not outputs <= glyphs:
+                glyphs |= outputs
+                changed = True
+    unicodes = [SPACE]
+    if space in font:
+        unicodes = getattr(font[space], "unicodes", None) or unicodes
+    only_from_space = list(unicodes) == [SPACE] and not any(
+        space in outputs and inputs - set([space]) for inputs, outputs, _ in substitutions
+    )
+    removable = any(shrinks and inputs & glyphs for inputs, _, shrinks in substitutions)
+    return glyphs, only_from_space, removable
+
+
+def _skips(flags, category):
+    # Whether a lookup with these flags skips glyphs of this category
+    if flags & 0x2 and category == "base":
+        return True
+    if flags & 0x4 and category == "ligature":
+        return True
+    if category == "mark" and flags & (0x8 | 0x10 | 0xFF00):
+        return True
+    return False
+
+
+def space_attachment(context, font):
+    """Returns how the text of a buffer can be split for the plan of a
+    :py:class:`ShapingContext`: ``"following"`` if runs of spaces can be
+    shaped with the word after them, ``"preceding"`` if with the word
+    before them, or None if the text must be shaped as a whole. The
+    answer is kept in the plan."""
+    cache = context.shape_plan.cache
+    if "space_attachment" not in cache:
+        cache["space_attachment"] = _space_attachment(context, font)
+    return cache["space_attachment"]
+
+
+def _space_attachment(context, font):
+    complexshaper = context.complexshaper
+    if not complexshaper.shapes_words_independently:
+        return None
+    space = font.glyphForCodepoint(SPACE)
+    namedclasses = context.fontfeatures.namedClasses
+    masked = set(complexshaper.masked_features)
+    routines = [
+        (routine, feature)
+        for lookups in context.shape_plan.lookups
+        if isinstance(lookups, list)
+        for routine, feature in lookups
+    ]
+    spaces, only_from_space, removable = _space_glyphs(
+        [rule for routine, _ in routines for rule in routine.rules], space, namedclasses, font
+    )
+    if removable:
+        # With a space gone, the words either side of it meet
+        return None
+    # Runs of spaces stay together, so a space next to a space is no
+    # trouble - unless something else can become the space glyph too
+    unsplit = set([space]) if only_from_space else set()
+    info = GlyphInfoCache.for_font(font)
+    categories = set(info.category(g) or "unknown" for g in spaces)
+    before_space = after_space = False
+    for routine, feature in routines:
+        for rule in routine.rules:
+            if _looks_at_one_glyph(rule):
+                continue
+            # A lookup which can skip a space could match around it
+            if feature in masked:
+                return None
+            flags = getattr(rule, "flags", 0) or 0
+            if any(_skips(routine.flags, c) or _skips(flags, c) for c in categories):
+                return None
+            for slots in _sequences(rule, namedclasses, set()):
+                for this, following in zip(slots, slots[1:]):
+                    if following & spaces and this - unsplit:
+                        before_space = True
+                    if this & spaces and following - unsplit:
+                        after_space = True
+    if not before_space:
+        return "following"
+    if not after_space:
+        return "preceding"
+    return None
+
+
+def segment_at_spaces(buf, spaces="following"):
+    """Returns a list of ``(start, end)`` pairs splitting a buffer of
+    characters into words, each with the run of spaces before it (or,
+    if ``spaces`` is ``"preceding"``, after it). A word starting with a
+    combining mark is kept with the word before it."""
+    items = buf.items
+    is_space = [item.codepoint == SPACE for item in items]
+    if spaces == "following":
+        breaks = [ix for ix in range(1, len(items)) if is_space[ix] and not is_space[ix - 1]]
+    else:
+        breaks = [ix for ix in range(1, len(items)) if is_space[ix - 1] and not is_space[ix]]
+    segments = []
+    for start, end in zip([0] + breaks, breaks + [len(items)]):
+        word = start
+        while word < end and is_space[word]:
+            word += 1
+        if segments and word < end and (unicode_properties(items[word].codepoint)[GENERAL_CATEGORY] or "")[:1] == "M":
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+    return segments
+
+
+def copy_items(buf):
+    """Returns copies of the items of a buffer which can be put into
+    another buffer without sharing their positions or feature masks."""
+    if hasattr(buf, "compact"):
+        # Array buffers copy rows from other buffers themselves
+        return list(buf.items)
+    items = []
+    for item in buf.items:
+        new = copy(item)
+        new.position = copy(item.position)
+        new.feature_masks = dict(item.feature_masks)
+        items.append(new)
+    return items
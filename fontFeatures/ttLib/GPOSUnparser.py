@@ -139,29 +139,35 @@ class GPOSUnparser(GTableUnparser):
                         )
                         b.addRule(spos)
             else:
-                class1 = self._invertClassDef(subtable.ClassDef1.classDefs, self.font)
-                class2 = self._invertClassDef(subtable.ClassDef2.classDefs, self.font)
-                for ix1, c1 in enumerate(subtable.Class1Record):
-                    if ix1 not in class1:
-                        continue  # XXX
-                    for ix2, c2 in enumerate(c1.Class2Record):
-                        if ix2 not in class2:
-                            continue  # XXX
-                        vr1 = self.makeValueRecord(c2.Value1, subtable.ValueFormat1)
-                        vr2 = self.makeValueRecord(c2.Value2, subtable.ValueFormat2)
-                        if not vr1 and not vr2:
-                            continue
-                        firstClass = list(
-                            set(class1[ix1]) & set(subtable.Coverage.glyphs)
-                        )
-                        spos = fontFeatures.Positioning(
-                            [firstClass, class2[ix2]], [vr1, vr2],
-                            address=self.currentLookup,
-                            flags=lookup.LookupFlag,
-                        )
-                        b.addRule(spos)
+                b.addRule(self._pairKerning(subtable, lookup))
         return b, []
 
+    def _pairKerning(self, subtable, lookup):
+        # A format 2 subtable is a kerning matrix; the first glyph must be
+        # in the coverage, and glyphs not in ClassDef2 are in class 0.
+        classDef1 = subtable.ClassDef1.classDefs
+        classDef2 = subtable.ClassDef2.classDefs
+        first_classes = {g: classDef1.get(g, 0) for g in subtable.Coverage.glyphs}
+        second_classes = dict(classDef2)
+        matrix = []
+        for c1 in subtable.Class1Record:
+            row = []
+            for c2 in c1.Class2Record:
+                vr1 = self.makeValueRecord(c2.Value1, subtable.ValueFormat1)
+                vr2 = self.makeValueRecord(c2.Value2, subtable.ValueFormat2)
+                row.append((vr1, vr2) if vr1 or vr2 else None)
+            matrix.append(row)
+        if any(row and row[0] is not None for row in matrix):
+            for g in self.font.getGlyphOrder():
+                second_classes.setdefault(g, 0)
+        return fontFeatures.PairKerning(
+            first_classes,
+            second_classes,
+            matrix,
+            address=self.currentLookup,
+            flags=lookup.LookupFlag,
+        )
+
     def unparseCursiveAttachment(self, lookup):
         b = fontFeatures.Routine(name=self.getname("CursiveAttachment" + self.gensym()))
         self._fix_flags(b, lookup)
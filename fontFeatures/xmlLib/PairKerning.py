@@ -0,0 +1,44 @@
+from lxml import etree
+from fontFeatures import ValueRecord
+from fontFeatures.xmlLib.Positioning import _valuerecord_fromXML, _valuerecord_toXML
+
+
+def _classes_fromXML(klass, el):
+    classes = {}
+    for c, glyphs in enumerate(klass._slotArray(klass, el) or []):
+        for g in glyphs:
+            classes[g] = c
+    return classes
+
+
+def _toXML(self, root):
+    self._makeglyphslots(root, "first", self.classGlyphs(self.first_classes, len(self.matrix)))
+    self._makeglyphslots(root, "second", self.classGlyphs(self.second_classes, self.columns))
+    matrix = etree.SubElement(root, "matrix")
+    for row in self.matrix:
+        xmlrow = etree.SubElement(matrix, "row")
+        for values in row:
+            cell = etree.SubElement(xmlrow, "cell")
+            if values is not None:
+                for vr in values:
+                    cell.append(_valuerecord_toXML(vr or ValueRecord()))
+    return root
+
+
+@classmethod
+def fromXML(klass, el):
+    matrix = []
+    for xmlrow in el.find("matrix").findall("row"):
+        row = []
+        for cell in xmlrow.findall("cell"):
+            values = [_valuerecord_fromXML(x) for x in cell.findall("valuerecord")]
+            row.append(tuple(values) if values else None)
+        matrix.append(row)
+    return klass(
+        _classes_fromXML(klass, el.find("first")),
+        _classes_fromXML(klass, el.find("second")),
+        matrix,
+        address=el.get("address"),
+        languages=el.get("languages"),
+        flags=int(el.get("flags") or 0),
+    )
@@ -5,7 +5,12 @@ from lxml import etree
 def fromXML(klass, el):
     import fontFeatures
 
-    subklass = getattr(fontFeatures, el.tag.title())
+    subklass = getattr(fontFeatures, el.tag.title(), None)
+    if subklass is None:
+        # Names with more than one capital, e.g. "pairkerning"
+        subklass = next(
+            k for k in klass.__subclasses__() if k.__name__.lower() == el.tag
+        )
     assert subklass
     return subklass.fromXML(el)
 
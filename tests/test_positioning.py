@@ -1,4 +1,4 @@
-from fontFeatures import Positioning, ValueRecord
+from fontFeatures import Positioning, PairKerning, ValueRecord
 from lxml import etree
 
 import unittest
@@ -26,3 +26,15 @@ class TestPositioning(unittest.TestCase):
         v = ValueRecord(xAdvance=120)
         s = Positioning(["a", "b"], [v, ValueRecord()])
         self.assertEqual(s.asFea(), "pos a b 120;")
+
+    def test_pair_kerning(self):
+        s = PairKerning()
+        self.assertTrue(s.addClassPair(["a", "b"], ["c"], ValueRecord(xAdvance=-20), ValueRecord()))
+        self.assertTrue(s.addClassPair(["d"], ["c"], ValueRecord(xAdvance=-10), ValueRecord()))
+        self.assertTrue(s.addClassPair(["a", "b"], ["c"], ValueRecord(xAdvance=99), ValueRecord()))
+        self.assertFalse(s.addClassPair(["a"], ["e"], ValueRecord(xAdvance=5), ValueRecord()))
+        self.assertEqual(
+            [x.strip() for x in s.asFea().splitlines()],
+            ["pos [a b] c -20;", "pos [d] [c] -10;"],
+        )
+        self.roundTrip(s)
@@ -1,5 +1,5 @@
 from fontFeatures import FontFeatures, Substitution, Routine
-from fontFeatures.shaperLib.Buffer import Buffer
+from fontFeatures.shaperLib.Buffer import Buffer, BufferItem
 from fontFeatures.shaperLib.Shaper import Shaper
 from babelfont import Babelfont
 import pytest
@@ -29,3 +29,548 @@ def test_namedclass_in_slot():
     r.addRule( Substitution( [["G", "@AB"]], [["X"]] ) )
     r.apply_to_buffer(buf, namedclasses={"AB": ["A","B"]})
     assert buf.serialize(position=False) == "X|X|C"
+
+
+def test_namedclass_change_recompiles_slot():
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    namedclasses = {"AB": ("A",)}
+    r = Routine()
+    r.addRule( Substitution( [["@AB"]], [["X"]] ) )
+    buf = Buffer(font, glyphs=["A", "B", "C"])
+    r.apply_to_buffer(buf, namedclasses=namedclasses)
+    assert buf.serialize(position=False) == "X|B|C"
+    namedclasses["AB"] = ("A", "B")
+    buf = Buffer(font, glyphs=["A", "B", "C"])
+    r.apply_to_buffer(buf, namedclasses=namedclasses)
+    assert buf.serialize(position=False) == "X|X|C"
+
+
+def test_dispatch_keeps_rule_order():
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    buf = Buffer(font, glyphs=["A", "B", "C"])
+    r = Routine()
+    r.addRule( Substitution( [["B"]], [["Y"]], precontext=[["X"]] ) )
+    r.addRule( Substitution( [["A"], ["B"]], [["Z"]] ) )
+    r.addRule( Substitution( [["A"]], [["X"]] ) )
+    r.apply_to_buffer(buf)
+    assert buf.serialize(position=False) == "Z|C"
+
+
+def test_mask_follows_substitutions():
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    buf = Buffer(font, glyphs=["f", "acutecomb", "i", "A", "acutecomb", "B"])
+    r = Routine(flags=0x8)
+    r.addRule( Substitution( [["f"], ["i"]], [["f_i"]], flags=0x8 ) )
+    r.addRule( Substitution( [["A"]], [["A"], ["acutecomb"]], flags=0x8 ) )
+    r.apply_to_buffer(buf)
+    assert buf.serialize(position=False) == "f_i|acutecomb|A|acutecomb|acutecomb|B"
+    incremental = list(buf.mask)
+    buf.recompute_mask()
+    assert incremental == list(buf.mask) == [0, 2, 5]
+
+
+def test_array_buffer_matches_buffer():
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    r = Routine()
+    r.addRule( Substitution( [["f"], ["t"]], [["f_t"]] ) )
+    r.addRule( Substitution( [["A"]], [["B"], ["C"]] ) )
+    ff.addFeature("liga", [r])
+    results = []
+    for klass in [Buffer, ArrayBuffer]:
+        buf = klass(font, unicodes="ftAx")
+        Shaper(ff, font).execute(buf)
+        results.append(buf.serialize())
+    assert results[0] == results[1]
+    assert results[1].startswith("f_t=0")
+    arrays = buf.as_arrays()
+    assert list(arrays["gid"]) == [font.glyphOrder.index(x.glyph) for x in buf.items]
+
+
+def test_array_buffer_fractional_positions():
+    from fontFeatures import Positioning, ValueRecord
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    ff.addFeature("dist", [Routine(rules=[Positioning([["A"], ["V"]], [ValueRecord(xAdvance=-12.5), ValueRecord()])])])
+    ff.addFeature("kern", [Routine(rules=[Positioning([["A"]], [ValueRecord(xAdvance=-10, xPlacement=3)])])])
+    results = []
+    for klass in [Buffer, ArrayBuffer]:
+        buf = klass(font, unicodes="AVA")
+        Shaper(ff, font).execute(buf)
+        results.append([
+            (i.glyph, i.position.xPlacement or 0, i.position.xAdvance) for i in buf.items
+        ])
+    assert results[0] == results[1]
+    assert results[1][0][2] == 629 - 12.5 - 10
+    assert buf.as_arrays()["x_advance"][0] == 629 - 12.5 - 10
+
+
+def test_glyph_info_cache():
+    from fontFeatures.glyphInfoCache import GlyphInfoCache
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    info = GlyphInfoCache.for_font(font)
+    assert GlyphInfoCache.for_font(font) is info
+    assert info.gid("A") == font.glyphOrder.index("A")
+    assert info.gid("nonexistent") == -1
+    assert info.width("A") == font["A"].width
+    assert info.category("acutecomb") == "mark"
+    GlyphInfoCache.invalidate(font)
+    assert GlyphInfoCache.for_font(font) is not info
+
+
+def test_glyph_info_cache_shared_between_threads():
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+    from types import SimpleNamespace
+    from fontFeatures.glyphInfoCache import GlyphInfoCache
+
+    class Font(dict):
+        glyphOrder = ["g%i" % i for i in range(400)]
+
+    font = Font((g, SimpleNamespace(category="c%i" % (i % 100), width=i)) for i, g in enumerate(Font.glyphOrder))
+    info = GlyphInfoCache(font)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            categories = list(pool.map(info.category, font.glyphOrder))
+    finally:
+        sys.setswitchinterval(interval)
+    # Each new category gets a code of its own
+    assert categories == [font[g].category for g in font.glyphOrder]
+
+
+def test_shape_plans_are_reused():
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    r = Routine()
+    r.addRule( Substitution( [["A"]], [["B"]] ) )
+    ff.addFeature("liga", [r])
+    shaper = Shaper(ff, font)
+    shaper.execute(Buffer(font, unicodes="AC"))
+    plan = shaper.shape_plan
+    buf = Buffer(font, unicodes="CA")
+    shaper.execute(buf)
+    assert shaper.shape_plan is plan
+    assert buf.serialize(position=False) == "C|B"
+    r2 = Routine()
+    r2.addRule( Substitution( [["C"]], [["D"]] ) )
+    ff.addFeature("liga", [r2])
+    buf = Buffer(font, unicodes="CA")
+    shaper.execute(buf)
+    assert shaper.shape_plan is not plan
+    assert buf.serialize(position=False) == "D|B"
+
+
+def test_shape_many():
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    r = Routine()
+    r.addRule( Substitution( [["A"]], [["B"]] ) )
+    ff.addFeature("liga", [r])
+    shaper = Shaper(ff, font)
+    texts = ["AC", "CA", "A"] * 5
+    expected = ["B|C", "C|B", "B"] * 5
+    assert list(shaper.shape_many(texts, position=False)) == expected
+    assert list(shaper.shape_many(texts, workers=2, chunksize=2, position=False)) == expected
+    arrays = list(shaper.shape_many(["CA"], arrays=True))[0]
+    assert list(arrays["gid"]) == [font.glyphOrder.index(g) for g in ["C", "B"]]
+
+
+def test_trace_events():
+    from fontFeatures.shaperLib.Trace import RoutineStart, RoutineEnd, RuleMatched
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    r = Routine(name="AtoB")
+    r.addRule( Substitution( [["A"]], [["B"]] ) )
+    ff.addFeature("liga", [r])
+    events = []
+    Shaper(ff, font, trace=events.append).execute(Buffer(font, unicodes="CA"))
+    ours = [e for e in events if getattr(e, "routine", None) is r or isinstance(e, RuleMatched)]
+    # (By the positioning stage there is no "A" left, so it is skipped)
+    assert [type(e) for e in ours] == [RoutineStart, RuleMatched, RoutineEnd]
+    assert ours[1].position == 1
+    assert str(ours[0]).startswith("Before AtoB (liga) : ")
+    # Events keep the buffer as it was when they were made
+    assert str(ours[0]) == "Before AtoB (liga) : C=0+677|A=1+629"
+    assert str(ours[2]) == "After AtoB (liga) : C=0+677|B=1+616"
+
+    buf = Buffer(font, unicodes="CA")
+    Shaper(ff, font).execute(buf)
+    assert buf.trace is None
+
+
+def test_skippy_iter():
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    buf = Buffer(font, glyphs=["A", "acutecomb", "B", "acutecomb", "C"])
+    skippy = buf.skippy_iter(0x8)
+    assert skippy.next(0) == 2
+    assert skippy.prev(4) == 2
+    assert not skippy.visible(3)
+    assert skippy.match(0, [{"A"}, {"B"}, {"C"}]) == 4
+    assert skippy.match(0, [{"A"}, {"C"}]) is None
+    assert skippy.match_backwards(4, [{"A"}, {"B"}])
+    rule = Substitution( [["B"]], [["X"]], precontext=[["A"]], postcontext=[["C"]], flags=0x8 )
+    assert rule.would_apply_at_unmasked(buf, 2, skippy)
+    assert not rule.would_apply_at_unmasked(buf, 2, buf.skippy_iter(0))
+    # The buffer's own mask is untouched
+    assert list(buf.mask) == [0, 1, 2, 3, 4]
+
+
+def test_profiler():
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    r = Routine(name="AtoBC")
+    r.addRule( Substitution( [["A"]], [["B"], ["C"]] ) )
+    ff.addFeature("liga", [r])
+    shaper = Shaper(ff, font, profile=True)
+    shaper.execute(Buffer(font, unicodes="CAA"))
+    report = [x for x in shaper.profiler.report() if x["routine"] == "AtoBC"]
+    assert len(report) == 1
+    assert report[0]["feature"] == "liga"
+    assert report[0]["rules_matched"] == 2
+    assert report[0]["growth"] == 2
+
+
+def test_routines_skipped_by_coverage():
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    r = Routine(name="AtoB")
+    r.addRule( Substitution( [["A"]], [["B"]] ) )
+    ff.addFeature("liga", [r])
+    buf = Buffer(font, glyphs=["C", "D"])
+    assert not r.could_apply(buf)
+    buf[1:2] = [BufferItem.new_glyph("A", font)]
+    assert r.could_apply(buf)
+    shaper = Shaper(ff, font, profile=True)
+    shaper.execute(Buffer(font, unicodes="CD"))
+    assert not [x for x in shaper.profiler.report() if x["routine"] == "AtoB"]
+
+
+def test_compiled_routines_match_interpreter():
+    from fontFeatures import Positioning, ValueRecord
+    from fontFeatures.shaperLib.Compiler import compile_routine
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    r = Routine(name="subs")
+    r.addRule( Substitution( [["f"], ["t"]], [["f_t"]] ) )
+    r.addRule( Substitution( [["A"]], [["B"], ["C"]], precontext=[["D"]] ) )
+    r.addRule( Substitution( [["@lower"]], [["@upper"]], postcontext=[["B"]] ) )
+    ff.addFeature("liga", [r])
+    p = Routine(name="kern")
+    p.addRule( Positioning( [["T"], ["o"]], [ValueRecord(xAdvance=-50), ValueRecord()] ) )
+    ff.addFeature("kern", [p])
+    ff.namedClasses["lower"] = ("x", "y")
+    ff.namedClasses["upper"] = ("X", "Y")
+    results = []
+    for compiled in [False, True]:
+        buf = Buffer(font, unicodes="ftDAyBTo")
+        Shaper(ff, font, compile_routines=compiled).execute(buf)
+        results.append(buf.serialize())
+    assert results[0] == results[1]
+    assert results[1].startswith("f_t=0+")
+    assert "|Y=" in results[1]
+    compiled = compile_routine(r, ff.namedClasses)
+    assert compile_routine(r, ff.namedClasses) is compiled
+    ff.namedClasses["upper"] = ("Z", "Y")
+    assert compile_routine(r, ff.namedClasses) is not compiled
+
+
+def test_fast_path_matches_interpreter():
+    from fontFeatures import Positioning, ValueRecord
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    from fontFeatures.shaperLib.FastPath import fast_path_for, numpy
+    if numpy is None:
+        pytest.skip("NumPy not installed")
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    smcp = Routine(name="smcp")
+    smcp.addRule( Substitution( [["@lower"]], [["@upper"]] ) )
+    smcp.addRule( Substitution( [["x"]], [["Z"]] ) )
+    ff.addFeature("smcp", [smcp])
+    kern = Routine(name="kern")
+    kern.addRule( Positioning( [["T"], ["@lower"]], [ValueRecord(xAdvance=-50), ValueRecord()] ) )
+    kern.addRule( Positioning( [["T"], ["o"]], [ValueRecord(xAdvance=-80), ValueRecord()] ) )
+    ff.addFeature("kern", [kern])
+    ff.namedClasses["lower"] = ("x", "y", "o")
+    ff.namedClasses["upper"] = ("X", "Y", "O")
+    results = []
+    for klass in [Buffer, ArrayBuffer]:
+        buf = klass(font, unicodes="TxoyTo")
+        Shaper(ff, font).execute(buf)
+        buf2 = klass(font, unicodes="TxoyTo")
+        Shaper(ff, font).execute(buf2, features="smcp")
+        results.append((buf.serialize(), buf2.serialize()))
+    assert results[0] == results[1]
+    assert "X=1" in results[1][1]
+    assert fast_path_for(smcp, buf) is not None
+    assert fast_path_for(kern, buf) is not None
+
+
+def test_sequence_trie_keeps_rule_order():
+    from fontFeatures.shaperLib.Routine import _sequence_trie
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    r = Routine()
+    r.addRule( Substitution( [["A"], ["B"]], [["X"]] ) )
+    r.addRule( Substitution( [["A"], ["B"], ["C"]], [["Y"]] ) )
+    r.addRule( Substitution( [["B"], ["@CD"], ["D"]], [["Z"]] ) )
+    namedclasses = {"CD": ["C", "D"]}
+    assert _sequence_trie(r, namedclasses) is not None
+    buf = Buffer(font, glyphs=["A", "B", "C", "B", "D", "D", "A"])
+    r.apply_to_buffer(buf, namedclasses=namedclasses)
+    assert buf.serialize(position=False) == "X|C|Z|A"
+    r.rules.insert(0, Substitution( [["A"], ["B"], ["C"]], [["Y"]] ))
+    buf = Buffer(font, glyphs=["A", "B", "C", "A", "B"])
+    r.apply_to_buffer(buf, namedclasses=namedclasses)
+    assert buf.serialize(position=False) == "Y|X"
+
+
+def test_pair_kerning_matches_positioning():
+    from fontFeatures import Positioning, PairKerning, ValueRecord
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    pairs = [
+        (["T", "V"], ["o", "a"], ValueRecord(xAdvance=-50)),
+        (["T", "V"], ["y"], ValueRecord(xAdvance=-30)),
+        (["o"], ["T"], ValueRecord(xPlacement=10, xAdvance=-20)),
+    ]
+    kerning = PairKerning()
+    rules = Routine(name="kern")
+    for first, second, vr in pairs:
+        kerning.addClassPair(first, second, vr, ValueRecord())
+        rules.addRule( Positioning( [first, second], [vr, ValueRecord()] ) )
+    matrix = Routine(name="kern", rules=[kerning])
+    results = []
+    for routine in [rules, matrix]:
+        ff = FontFeatures()
+        ff.addFeature("kern", [routine])
+        for klass in [Buffer, ArrayBuffer]:
+            buf = klass(font, unicodes="ToVaTyoTx")
+            Shaper(ff, font).execute(buf)
+            results.append(buf.serialize())
+    assert len(set(results)) == 1
+    assert "T=0+" in results[0]
+
+
+def test_attachment_anchor_index():
+    from fontFeatures import Attachment
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    r = Routine()
+    r.addRule( Attachment("top", "top_", {"@bases": (300, 600), "B": (250, 700)}, {"@marks": (50, 10)}) )
+    namedclasses = {"bases": ["A"], "marks": ["acutecomb", "gravecomb"]}
+    for klass in [Buffer, ArrayBuffer]:
+        buf = klass(font, glyphs=["A", "acutecomb", "gravecomb", "x", "B", "gravecomb"])
+        r.apply_to_buffer(buf, namedclasses=namedclasses)
+        assert buf.serialize() == "A=0+629|acutecomb=1@250,590+0|gravecomb=2@250,590+0|x=3+455|B=4+616|gravecomb=5@200,690+0"
+
+
+def test_attachment_anchors_with_contour_points():
+    from fontTools.ttLib import TTFont
+    from fontFeatures.ttLib import unparse
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    path = "tests/data/Amiri-Regular.ttf"
+    font = Babelfont.load(path)
+    shaper = Shaper(unparse(TTFont(path)), font)
+    for klass in [Buffer, ArrayBuffer]:
+        buf = shaper.execute(klass(font, unicodes="كتبَ"))
+        assert buf.serialize() == "uni0643.init=0+659|uni062A.medi=1+244|uni0628.fina=2+883|uni064E=3@190,0+0"
+        buf = shaper.execute(klass(font, unicodes="أمّه"))
+        assert buf.serialize() == "uni0623=0+234|uni0645.init=1+389|uni0651=2@-13,0+0|uni0647.fina=3+379"
+
+
+def test_long_cursive_chain():
+    from fontFeatures.shaperLib.BaseShaper import BaseShaper
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    buf = Buffer(font, glyphs=["A"] * 5000)
+    for item in buf.items:
+        item.position.yPlacement = 1
+        item.attach_type = "cursive"
+        item.attach_chain = 1
+    BaseShaper(None, font, buf).propagate_attachment_offsets()
+    assert [item.position.yPlacement for item in buf.items] == list(range(5000, 0, -1))
+
+
+def test_syllable_segmentation():
+    from fontFeatures.shaperLib.IndicShaper import IndicShaper
+    categories = ["M", "C", "H", "C", "M", "X", "V", "N", "M"]
+    syllables = IndicShaper.syllable_machine.segment(categories, IndicShaper.syllable_types)
+    assert list(syllables) == [
+        ("broken_cluster", 0, 1),
+        ("consonant_syllable", 1, 5),
+        ("other", 5, 6),
+        ("vowel_syllable", 6, 9),
+    ]
+
+
+def test_indic_consonant_positions_cached_in_plan():
+    from fontFeatures.shaperLib.IndicShaperData import IndicPosition
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    ff.addFeature("blwf", [Routine(rules=[Substitution([[".notdef"], [".notdef"]], [["A"]])])])
+    shaper = Shaper(ff, font)
+    for _ in range(2):
+        buf = Buffer(font, unicodes="क्षि")
+        shaper.execute(buf)
+        assert buf.serialize(position=False) == ".notdef|A|.notdef"
+    cache = shaper.shape_plan.cache
+    assert cache["consonant_positions"][0x0915] == IndicPosition.BELOW_C
+    assert cache["would_substitute"][("blwf", (".notdef", ".notdef"))]
+
+
+def test_unicode_properties_match_ucd():
+    from youseedee import ucd_data
+    from fontFeatures.shaperLib.UnicodeProperties import unicode_properties
+    from fontFeatures.shaperLib.UnicodePropertiesData import PROPERTIES
+    for codepoint in [0x41, 0x628, 0x710, 0x915, 0x94D, 0x1780, 0x1A60, 0x11013, 0xE0001, 0x10FFFF]:
+        data = ucd_data(codepoint)
+        assert unicode_properties(codepoint) == tuple(data.get(p) for p in PROPERTIES)
+    assert unicode_properties(None) == (None,) * len(PROPERTIES)
+
+
+def test_word_cache():
+    from fontTools.ttLib import TTFont
+    from fontFeatures.ttLib import unparse
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    from fontFeatures.shaperLib.WordCache import WordCache, space_attachment
+    path = "tests/data/LibertinusSans-Regular.otf"
+    font = Babelfont.load(path)
+    ff = unparse(TTFont(path))
+    plain = Shaper(ff, font)
+    cached = Shaper(ff, font, word_cache=100)
+    for text in ["To ffi office", "To ffi office", " Ta á b ́c  "]:
+        for klass in [Buffer, ArrayBuffer]:
+            expected = plain.execute(klass(font, unicodes=text))
+            got = cached.execute(klass(font, unicodes=text))
+            assert got.serialize() == expected.serialize()
+            if klass is ArrayBuffer:
+                assert [i.cluster for i in got.items] == [i.cluster for i in expected.items]
+    assert space_attachment(cached, font) == "following"
+    assert cached.word_cache.hits == 6
+
+    # A space which is substituted can still be matched by later lookups
+    ff = FontFeatures()
+    ff.addFeature("ccmp", [Routine(rules=[Substitution([["space"]], [["A"]])])])
+    ff.addFeature("liga", [Routine(rules=[Substitution([["B"], ["A"]], [["C"]])])])
+    for text in ["B B", "B B B"]:
+        expected = Shaper(ff, font).execute(Buffer(font, unicodes=text)).serialize()
+        assert Shaper(ff, font, word_cache=100).execute(Buffer(font, unicodes=text)).serialize() == expected
+    assert expected.startswith("C=0+")
+
+    # So can the glyphs either side of a space which is deleted
+    ff = FontFeatures()
+    ff.addFeature("ccmp", [Routine(rules=[Substitution([["space"]], [])])])
+    ff.addFeature("liga", [Routine(rules=[Substitution([["B"], ["A"]], [["C"]])])])
+    expected = Shaper(ff, font).execute(Buffer(font, unicodes="B A")).serialize()
+    cached = Shaper(ff, font, word_cache=10)
+    assert cached.execute(Buffer(font, unicodes="B A")).serialize() == expected == "C=0+677"
+    assert space_attachment(cached, font) is None
+
+    cache = WordCache(2, policy="lru")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert list(cache.entries) == ["a", "c"]
+    cache = WordCache(2, policy="fifo")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert list(cache.entries) == ["b", "c"] and cache.evictions == 1
+
+
+def test_unsafe_to_break():
+    from fontFeatures import Positioning, ValueRecord
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    ff = FontFeatures()
+    ff.addFeature("calt", [Routine(rules=[Substitution([["A"]], [["B"]], precontext=[["C"]])])])
+    ff.addFeature("kern", [Routine(rules=[Positioning([["D"], ["E"]], [ValueRecord(xAdvance=-10), ValueRecord()])])])
+    for klass in [Buffer, ArrayBuffer]:
+        for compile_routines in [False, True]:
+            buf = klass(font, unicodes="CADEAC")
+            Shaper(ff, font, compile_routines=compile_routines).execute(buf)
+            assert [item.unsafe_to_break for item in buf.items] == [False, True, False, True, False, False]
+            assert buf.serialize(flags=True) == "C=0+677|B=1+616#1|D=2+700|E=3+538#1|A=4+629|C=5+677"
+
+    # A later single substitution keeps the flag
+    ff.addFeature("rclt", [Routine(rules=[Substitution([["B"]], [["D"]])])])
+    for klass in [Buffer, ArrayBuffer]:
+        buf = klass(font, unicodes="CA")
+        Shaper(ff, font).execute(buf)
+        assert buf.serialize(flags=True) == "C=0+677|D=1+710#1"
+
+
+def test_itemize():
+    from fontFeatures.shaperLib.Itemizer import itemize
+    runs = [(r.text, r.start, r.script, r.direction) for r in itemize("Hello مرحبا 123, नमस्ते!")]
+    assert runs == [
+        ("Hello ", 0, "Latin", "LTR"),
+        ("مرحبا 123, ", 6, "Arabic", "RTL"),
+        ("नमस्ते!", 17, "Devanagari", "LTR"),
+    ]
+    runs = [(r.start, r.end, r.script, r.direction) for r in itemize(["(1) abc", "12 שלום"])]
+    assert runs == [(0, 7, "Latin", "LTR"), (7, 14, "Hebrew", "RTL")]
+
+    font = Babelfont.load("tests/data/LibertinusSans-Regular.otf")
+    shaper = Shaper(FontFeatures(), font)
+    shaped = [(run.script, buf.script, buf.direction) for run, buf in shaper.shape_runs("ab بسم")]
+    assert shaped == [("Latin", "Latin", "LTR"), ("Arabic", "Arabic", "RTL")]
+    assert type(shaper.complexshaper).__name__ == "ArabicShaper"
+
+
+def test_execute_parallel():
+    from fontTools.ttLib import TTFont
+    from fontFeatures.ttLib import unparse
+    from fontFeatures.shaperLib.ArrayBuffer import ArrayBuffer
+    path = "tests/data/LibertinusSans-Regular.otf"
+    font = Babelfont.load(path)
+    shaper = Shaper(unparse(TTFont(path)), font)
+    text = "To ffi office, AVATAR Ta b ́c á. " * 20
+    for klass in [Buffer, ArrayBuffer]:
+        expected = shaper.execute(klass(font, unicodes=text))
+        for workers in [None, 2]:
+            buf = shaper.execute_parallel(klass(font, unicodes=text), workers=workers, chunk_length=100)
+            assert buf.serialize(flags=True) == expected.serialize(flags=True)
+            if klass is ArrayBuffer:
+                assert [i.cluster for i in buf.items] == [i.cluster for i in expected.items]
+
+    ff = FontFeatures()
+    ff.addFeature("ccmp", [Routine(rules=[Substitution([["space"]], [["A"]])])])
+    ff.addFeature("liga", [Routine(rules=[Substitution([["B"], ["A"]], [["C"]])])])
+    shaper = Shaper(ff, font)
+    expected = shaper.execute(Buffer(font, unicodes="B B" * 50))
+    buf = shaper.execute_parallel(Buffer(font, unicodes="B B" * 50), chunk_length=10)
+    assert buf.serialize(flags=True) == expected.serialize(flags=True)
+
+    ff = FontFeatures()
+    ff.addFeature("ccmp", [Routine(rules=[Substitution([["space"]], [])])])
+    ff.addFeature("liga", [Routine(rules=[Substitution([["B"], ["A"]], [["C"]])])])
+    shaper = Shaper(ff, font)
+    expected = shaper.execute(Buffer(font, unicodes="B A" * 40))
+    buf = shaper.execute_parallel(Buffer(font, unicodes="B A" * 40), chunk_length=5)
+    assert buf.serialize(flags=True) == expected.serialize(flags=True)
+
+
+def test_shaper_shared_between_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from fontTools.ttLib import TTFont
+    from fontFeatures.ttLib import unparse
+    path = "tests/data/LibertinusSans-Regular.otf"
+    font = Babelfont.load(path)
+    ff = unparse(TTFont(path))
+    texts = ["To ffi office", "AVATAR", "कि क्षि", "Ta b ́c"] * 10
+    expected = [Shaper(ff, font).execute(Buffer(font, unicodes=t)).serialize() for t in texts]
+    shaper = Shaper(ff, font, word_cache=100)
+
+    def shape(text):
+        buf = shaper.execute(Buffer(font, unicodes=text))
+        return buf.serialize(), type(shaper.complexshaper).__name__
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(shape, texts))
+    assert [r[0] for r in results] == expected
+    assert [r[1] for r in results[:4]] == ["BaseShaper", "BaseShaper", "IndicShaper", "BaseShaper"]
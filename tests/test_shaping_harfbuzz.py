@@ -81,6 +81,12 @@ def test_shaping(request, fontname, hb_args, input_string, expectation):
         buf.script = script_map[m[1]]
 
     shaper.execute(buf, features=feature_string)
+    if "FONTFEATURES_CHECK_COMPILED" in os.environ:
+        # Cross-check the routine compiler against the interpreter
+        compiled_buf = Buffer(bbf, unicodes=tounicode(input_string))
+        compiled_buf.script = buf.script
+        Shaper(ff, bbf, compile_routines=True).execute(compiled_buf, features=feature_string)
+        assert compiled_buf.serialize() == buf.serialize()
     serialize_options = {}
     if "--no-glyph-names" in hb_args:
         serialize_options["names"] = False
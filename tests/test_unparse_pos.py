@@ -1,4 +1,4 @@
-from fontFeatures import Substitution, FontFeatures
+from fontFeatures import Substitution, FontFeatures, PairKerning
 from fontTools.ttLib import TTFont
 from fontFeatures.ttLib.GPOSUnparser import GPOSUnparser
 from fontFeatures.ttLib import unparseLanguageSystems
@@ -39,12 +39,14 @@ class TestUnparse(unittest.TestCase):
 
     def test_pair_f2(self):
         g, _ = self.unparser.unparseLookup(self.lookups[76], 76)  # kerns
+        self.assertIsInstance(g.rules[0], PairKerning)
+        lines = [x.strip() for x in g.rules[0].asFea().splitlines()]
         self.assertEqual(
-            g.rules[0].asFea(),
+            lines[0],
             "pos [zero zero.prop] [A Aacute Abreve Acircumflex Adieresis Agrave Amacron Aogonek Aring Atilde] -10;",
         )
         self.assertEqual(
-            g.rules[1].asFea(),
+            lines[1],
             "pos [zero zero.prop] [Y Yacute Ycircumflex Ydieresis Ygrave] -21;",
         )
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""Generator of the Unicode property tables used by the shapers.
+
+It writes the data module read by ``fontFeatures.shaperLib.UnicodeProperties``,
+which holds the properties below for every code point. Each distinct
+combination of values is stored once as a record, and code points are
+mapped to records through a two-level table of blocks, as HarfBuzz does
+for its own Unicode data.
+
+usage: ./gen-unicode-properties.py > fontFeatures/shaperLib/UnicodePropertiesData.py
+
+"""
+
+import base64
+import sys
+import zlib
+from array import array
+
+import youseedee
+
+if len (sys.argv) != 1:
+    sys.exit (__doc__)
+
+PROPERTIES = (
+    "Script",
+    "General_Category",
+    "Joining_Type",
+    "Joining_Group",
+    "Indic_Syllabic_Category",
+    "Indic_Positional_Category",
+    "USE_Category",
+)
+SHIFT = 7
+MAX_UNICODE = 0x10FFFF
+
+values = [[None] for _ in PROPERTIES]
+value_indexes = [{None: 0} for _ in PROPERTIES]
+records = {}
+codepoint_records = array ("H")
+
+for u in range (MAX_UNICODE + 1):
+    data = youseedee.ucd_data (u)
+    record = []
+    for p, name in enumerate (PROPERTIES):
+        value = data.get (name)
+        if value not in value_indexes[p]:
+            value_indexes[p][value] = len (values[p])
+            values[p].append (value)
+        record.append (value_indexes[p][value])
+    record = tuple (record)
+    if record not in records:
+        records[record] = len (records)
+    codepoint_records.append (records[record])
+
+assert all (len (v) < 256 for v in values), "Too many values to store in bytes"
+assert len (records) < 65536, "Too many records to store in shorts"
+
+block_size = 1 << SHIFT
+blocks = {}
+index = array ("H")
+block_data = array ("H")
+for start in range (0, len (codepoint_records), block_size):
+    block = tuple (codepoint_records[start:start + block_size])
+    if block not in blocks:
+        blocks[block] = len (blocks)
+        block_data.extend (block)
+    index.append (blocks[block])
+
+record_data = bytes (v for record in records for v in record)
+
+def packed (data):
+    if isinstance (data, array):
+        if sys.byteorder != "little":
+            data = array (data.typecode, data)
+            data.byteswap ()
+        data = data.tobytes ()
+    encoded = base64.b64encode (zlib.compress (data, 9)).decode ("ascii")
+    lines = [encoded[i:i + 72] for i in range (0, len (encoded), 72)]
+    return "(\n" + "".join ('    "%s"\n' % line for line in lines) + ")"
+
+print ('# The following tables are generated by running:')
+print ('# %s > fontFeatures/shaperLib/UnicodePropertiesData.py' % sys.argv[0])
+print ()
+print ('PROPERTIES = %r' % (PROPERTIES,))
+print ()
+print ('VALUES = (')
+for name, v in zip (PROPERTIES, values):
+    print ('    # %s' % name)
+    print ('    (')
+    line = ""
+    for x in v:
+        if line and len (line) + len (repr (x)) > 64:
+            print ('       ' + line)
+            line = ""
+        line += " %r," % x
+    print ('       ' + line)
+    print ('    ),')
+print (')')
+print ()
+print ('SHIFT = %i' % SHIFT)
+print ()
+print ('# One byte per property for each record')
+print ('RECORDS = %s' % packed (record_data))
+print ()
+print ('# Block number for each block of code points (little-endian shorts)')
+print ('INDEX = %s' % packed (index))
+print ()
+print ('# Record number for each code point of each block (little-endian shorts)')
+print ('BLOCKS = %s' % packed (block_data))